@@ -8,27 +8,69 @@ Color is critical for:
 - State detection (on/off indicators)
 """
 
+import array
 import cv2
 import json
+import os
 import numpy as np
+from multiprocessing import Pool
 from pathlib import Path
-from collections import Counter
+from scipy.cluster.vq import kmeans
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Label tables for the vectorized classifiers (index = integer code)
+COLOR_NAMES = ('black', 'white', 'gray', 'red', 'brown', 'green',
+               'blue', 'yellow', 'magenta', 'cyan', 'mixed')
+SKIN_TONES = ('light', 'medium', 'dark')
+COLOR_CODES = {name: code for code, name in enumerate(COLOR_NAMES)}
+SKIN_TONE_CODES = {name: code for code, name in enumerate(SKIN_TONES)}
+
+
+def _dumps(obj):
+    """
+    Serialize to a JSON string (orjson when available)
+    """
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
 
 class ColorAnalyzer:
     """
     Extract color information from video frames
     """
 
-    def __init__(self):
+    # Regions smaller than this report their mean as the dominant color
+    MIN_DOMINANT_PIXELS = 64
+
+    def __init__(self, stride=1, num_workers=None):
+        """
+        Args:
+            stride: Analyze every Nth frame (skipped frames are grabbed, not decoded)
+            num_workers: Worker processes for frame extraction (default: CPU count)
+        """
         print("🎨 Initializing Color Analyzer...")
+        self.stride = max(1, int(stride))
+        self.num_workers = max(1, num_workers or os.cpu_count() or 1)
 
-    def process(self, video_path, extraction_file):
+    def process(self, video_path, extraction_file, output_file):
         """
         Add color analysis to existing extraction
 
+        Enhanced frames are streamed to output_file as they are produced;
+        only the per-frame values needed for the summary stay in memory.
+
         Args:
             video_path: Path to video
             extraction_file: Path to full extraction JSON
+            output_file: Path to write the extraction with colors
+
+        Returns:
+            Output metadata and analysis (without frames)
         """
         print(f"\n{'='*70}")
         print(f"ADDING COLOR ANALYSIS")
@@ -49,65 +91,161 @@ class ColorAnalyzer:
         if not cap.isOpened():
             raise ValueError(f"Cannot open video: {video_path}")
 
-        print(f"\n🎨 EXTRACTING COLOR INFORMATION...")
+        cap.release()
 
-        enhanced_frames = []
-        frame_idx = 0
+        print(f"\n🎨 EXTRACTING COLOR INFORMATION...")
+        if self.stride > 1:
+            print(f"   Stride: every {self.stride} frames")
+
+        # Contiguous, stride-aligned frame ranges - one per worker
+        num_frames = len(frames_data)
+        chunk_size = -(-num_frames // self.num_workers)
+        chunk_size = max(self.stride, -(-chunk_size // self.stride) * self.stride)
+        tasks = [
+            (video_path, start, min(start + chunk_size, num_frames),
+             frames_data[start:start + chunk_size:self.stride])
+            for start in range(0, num_frames, chunk_size)
+        ]
+        print(f"   Workers: {min(self.num_workers, len(tasks))} ({len(tasks)} chunks)")
+
+        output_metadata = {
+            **metadata,
+            'color_analysis_enabled': True,
+            'color_space': 'HSV + RGB + gray',
+            'color_stride': self.stride
+        }
+        stats = {
+            'brightness': array.array('d'),
+            'saturation': array.array('d'),
+            'object_colors': [],
+            'hand_tones': array.array('b'),       # SKIN_TONES codes
+            'clothing_colors': array.array('b')   # COLOR_NAMES codes
+        }
 
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                break
+        print(f"   Streaming to: {output_file}")
+        with open(output_file, 'w') as out:
+            out.write('{"metadata": ' + _dumps(output_metadata) + ',\n"frames": [')
 
-            if frame_idx % 100 == 0:
-                print(f"   Frame {frame_idx}/{len(frames_data)}")
+            if self.num_workers == 1 or len(tasks) <= 1:
+                results = map(self._process_frame_range, tasks)
+                self._collect_chunks(results, tasks, out, stats)
+            else:
+                with Pool(min(self.num_workers, len(tasks))) as pool:
+                    results = pool.imap(self._process_frame_range, tasks)
+                    self._collect_chunks(results, tasks, out, stats)
 
-            # Get corresponding extraction data
-            frame_data = frames_data[frame_idx]
+            print(f"\n✅ Processed {len(stats['brightness'])} frames with color")
 
-            # Extract colors
-            color_info = self._extract_frame_colors(frame, frame_data)
+            # Analyze color patterns
+            print(f"\n📊 ANALYZING COLOR PATTERNS...")
+            color_analysis = self._analyze_colors(stats)
 
-            # Add to frame data
-            enhanced_frame = {
-                **frame_data,
-                'colors': color_info
+            output_analysis = {
+                **data.get('analysis', {}),
+                'colors': color_analysis
             }
+            out.write('\n],\n"analysis": ' + _dumps(output_analysis) + '}\n')
 
-            enhanced_frames.append(enhanced_frame)
-            frame_idx += 1
+        return {
+            'metadata': output_metadata,
+            'analysis': output_analysis
+        }
 
-        cap.release()
+    def _collect_chunks(self, results, tasks, out, stats):
+        """
+        Write per-chunk results to out in frame order and accumulate the
+        per-frame values _analyze_colors needs
+        """
+        first = True
+        for (_, start, end, _), chunk in zip(tasks, results):
+            for enhanced_frame in chunk:
+                out.write(('\n' if first else ',\n') + _dumps(enhanced_frame))
+                first = False
+                self._accumulate_stats(stats, enhanced_frame['colors'])
+            print(f"   Frames {start}-{end - 1} done ({len(chunk)} analyzed)")
+
+    def _accumulate_stats(self, stats, colors):
+        """
+        Keep only the compact per-frame values used by the summary
+        """
+        stats['brightness'].append(colors['scene_colors']['brightness'])
+        stats['saturation'].append(colors['scene_colors']['saturation'])
 
-        print(f"\n✅ Processed {frame_idx} frames with color")
+        for obj_color in colors['object_colors']:
+            stats['object_colors'].append((obj_color['class'], obj_color['color_name']))
 
-        # Analyze color patterns
-        print(f"\n📊 ANALYZING COLOR PATTERNS...")
-        color_analysis = self._analyze_colors(enhanced_frames)
+        for hand in colors['hand_colors']:
+            stats['hand_tones'].append(SKIN_TONE_CODES[hand['skin_tone_estimate']])
 
-        return {
-            'metadata': {
-                **metadata,
-                'color_analysis_enabled': True,
-                'color_space': 'HSV + RGB'
-            },
-            'frames': enhanced_frames,
-            'analysis': {
-                **data.get('analysis', {}),
-                'colors': color_analysis
-            }
-        }
+        if 'upper_body_color_name' in colors['person_clothing']:
+            stats['clothing_colors'].append(COLOR_CODES[colors['person_clothing']['upper_body_color_name']])
+
+    def _process_frame_range(self, task):
+        """
+        Extract colors for frames [start, end) with a private VideoCapture
+
+        Runs in a worker process; frames_slice holds the extraction data for
+        the stride-sampled frames of this range.
+        """
+        video_path, start, end, frames_slice = task
+
+        cap = cv2.VideoCapture(video_path)
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        if start > 0:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+            if int(cap.get(cv2.CAP_PROP_POS_FRAMES)) != start:
+                # Seek landed elsewhere (e.g. on a keyframe of a long-GOP
+                # stream): reopen and grab forward so frames line up with
+                # frames_slice
+                cap.release()
+                cap = cv2.VideoCapture(video_path)
+                for _ in range(start):
+                    if not cap.grab():
+                        break
+
+        enhanced = []
+        frame = None  # decode buffer, reused by retrieve() every frame
+
+        for frame_idx in range(start, end):
+            # grab() only demuxes; skipped frames are never decoded
+            if not cap.grab():
+                break
+
+            if (frame_idx - start) % self.stride == 0:
+                ret, frame = cap.retrieve(frame)
+                if not ret:
+                    break
+
+                # Get corresponding extraction data
+                frame_data = frames_slice[(frame_idx - start) // self.stride]
+
+                # Extract colors
+                color_info = self._extract_frame_colors(frame, frame_data)
+
+                # Add to frame data
+                enhanced.append({
+                    **frame_data,
+                    'colors': color_info
+                })
+
+        cap.release()
+        return enhanced
 
     def _extract_frame_colors(self, frame, frame_data):
         """
         Extract color information from a single frame
+
+        Region means come from one integral image of the frame (four lookups
+        per bbox) instead of slicing and averaging each region.
         """
         height, width = frame.shape[:2]
 
-        # Convert to different color spaces
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        frame_hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-        frame_lab = cv2.cvtColor(frame, cv2.COLOR_BGR2LAB)
+        # Regions are read straight from the BGR frame and flipped to RGB on
+        # output; HSV is only needed for saturation, grayscale for brightness
+        frame_hsv, frame_gray = self._convert_for_stats(frame)
+
+        # Summed-area table (BGR), shape (H+1, W+1, 3)
+        integral = cv2.integral(frame, sdepth=cv2.CV_64F)
 
         color_info = {
             'scene_colors': {},
@@ -116,50 +254,26 @@ class ColorAnalyzer:
             'person_clothing': {}
         }
 
-        # 1. Scene-level color statistics
+        # 1. Scene-level color statistics (cv2.mean: single-pass reductions)
+        mean_b, mean_g, mean_r, _ = cv2.mean(frame)
         color_info['scene_colors'] = {
-            'dominant_rgb': self._get_dominant_color(frame_rgb),
-            'mean_rgb': frame_rgb.mean(axis=(0, 1)).tolist(),
-            'brightness': float(frame_lab[:, :, 0].mean()),  # L channel
-            'saturation': float(frame_hsv[:, :, 1].mean())   # S channel
+            'dominant_rgb': self._get_dominant_color(frame)[::-1],
+            'mean_rgb': [mean_r, mean_g, mean_b],
+            'brightness': float(cv2.mean(frame_gray)[0]),  # Luma
+            'saturation': float(cv2.mean(frame_hsv)[1])   # S channel
         }
 
-        # 2. Hand region colors (if hand detected)
+        # 2. Hand region bboxes (if hand detected)
+        hands = []
+        hand_boxes = []
         if frame_data['hands'].get('detected'):
-            hand_colors = []
-            for hand in frame_data['hands']['hands']:
-                # Get bounding box of hand landmarks
-                landmarks = hand['landmarks']
-                x_coords = [landmarks[lm]['x'] for lm in landmarks]
-                y_coords = [landmarks[lm]['y'] for lm in landmarks]
-
-                x_min = int(min(x_coords) * width)
-                x_max = int(max(x_coords) * width)
-                y_min = int(min(y_coords) * height)
-                y_max = int(max(y_coords) * height)
+            hands, hand_boxes = self._hand_boxes(frame_data['hands']['hands'], width, height)
 
-                # Clamp to valid range
-                x_min = max(0, x_min)
-                x_max = min(width, x_max)
-                y_min = max(0, y_min)
-                y_max = min(height, y_max)
-
-                if x_max > x_min and y_max > y_min:
-                    hand_region = frame_rgb[y_min:y_max, x_min:x_max]
-
-                    if hand_region.size > 0:
-                        hand_colors.append({
-                            'label': hand['label'],
-                            'mean_rgb': hand_region.mean(axis=(0, 1)).tolist(),
-                            'dominant_rgb': self._get_dominant_color(hand_region),
-                            'skin_tone_estimate': self._estimate_skin_tone(hand_region)
-                        })
-
-            color_info['hand_colors'] = hand_colors
-
-        # 3. Object region colors (if objects detected)
-        if frame_data['objects'].get('detected') and 'objects' in frame_data['objects']:
-            object_colors = []
+        # 3. Object region bboxes (if objects detected)
+        objects_detected = frame_data['objects'].get('detected') and 'objects' in frame_data['objects']
+        objects = []
+        object_boxes = []
+        if objects_detected:
             for obj in frame_data['objects']['objects']:
                 bbox = obj['bbox']
                 x1 = int(bbox['x1'])
@@ -174,41 +288,113 @@ class ColorAnalyzer:
                 y2 = max(0, min(height, y2))
 
                 if x2 > x1 and y2 > y1:
-                    obj_region = frame_rgb[y1:y2, x1:x2]
+                    objects.append(obj)
+                    object_boxes.append((x1, y1, x2, y2))
 
-                    if obj_region.size > 0:
-                        object_colors.append({
-                            'class': obj['class'],
-                            'mean_rgb': obj_region.mean(axis=(0, 1)).tolist(),
-                            'dominant_rgb': self._get_dominant_color(obj_region),
-                            'color_name': self._rgb_to_color_name(
-                                obj_region.mean(axis=(0, 1))
-                            )
-                        })
+        # 4. Torso region bbox (for clothing colors)
+        torso_box = None
+        if frame_data['pose'].get('detected'):
+            torso_box = self._torso_box(frame_data['pose'], width, height)
+        torso_boxes = [torso_box] if torso_box else []
 
-            color_info['object_colors'] = object_colors
+        # All region means in one vectorized gather, then one classifier
+        # call per label type instead of one Python call per region
+        region_means = self._region_means(integral, hand_boxes + object_boxes + torso_boxes)
+        hand_means = region_means[:len(hand_boxes)]
+        named_means = region_means[len(hand_boxes):]
 
-        # 4. Person clothing colors (extract from torso region)
-        if frame_data['pose'].get('detected'):
-            clothing_colors = self._extract_clothing_colors(frame_rgb, frame_data['pose'], width, height)
-            color_info['person_clothing'] = clothing_colors
+        skin_tones = self._estimate_skin_tones(hand_means)
+        color_names = self._rgb_to_color_names(named_means)
+
+        if frame_data['hands'].get('detected'):
+            color_info['hand_colors'] = [
+                {
+                    'label': hand['label'],
+                    'mean_rgb': mean_rgb.tolist(),
+                    'dominant_rgb': self._get_region_dominant_color(frame, box, mean_rgb),
+                    'skin_tone_estimate': skin_tone
+                }
+                for hand, box, mean_rgb, skin_tone in zip(hands, hand_boxes, hand_means, skin_tones)
+            ]
+
+        if objects_detected:
+            color_info['object_colors'] = [
+                {
+                    'class': obj['class'],
+                    'mean_rgb': mean_rgb.tolist(),
+                    'dominant_rgb': self._get_region_dominant_color(frame, box, mean_rgb),
+                    'color_name': color_name
+                }
+                for obj, box, mean_rgb, color_name in zip(objects, object_boxes, named_means, color_names)
+            ]
+
+        if torso_box:
+            x_min, y_min, x_max, y_max = torso_box
+            mean_rgb = named_means[-1]
+            color_info['person_clothing'] = {
+                'upper_body_mean_rgb': mean_rgb.tolist(),
+                'upper_body_dominant_rgb': self._get_region_dominant_color(frame, torso_box, mean_rgb),
+                'upper_body_color_name': color_names[-1],
+                'region_size': (y_max - y_min, x_max - x_min)
+            }
 
         return color_info
 
+    def _convert_for_stats(self, frame):
+        """
+        HSV + grayscale conversions via the T-API (cv2.UMat)
+
+        Only their cv2.mean values are used, which come back as host floats,
+        so the converted images never need a .get(). Falls back to plain
+        ndarrays if this OpenCV build lacks UMat support.
+        """
+        try:
+            umat = cv2.UMat(frame)
+            return cv2.cvtColor(umat, cv2.COLOR_BGR2HSV), cv2.cvtColor(umat, cv2.COLOR_BGR2GRAY)
+        except (cv2.error, AttributeError):
+            return cv2.cvtColor(frame, cv2.COLOR_BGR2HSV), cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+    def _region_means(self, integral, boxes):
+        """
+        Mean RGB of each (x1, y1, x2, y2) box from a BGR integral image
+        """
+        boxes = np.asarray(boxes, dtype=np.intp).reshape(-1, 4)
+        x1, y1, x2, y2 = boxes.T
+
+        sums = integral[y2, x2] - integral[y1, x2] - integral[y2, x1] + integral[y1, x1]
+        area = ((x2 - x1) * (y2 - y1))[:, None]
+
+        return (sums / area)[:, ::-1]
+
+    def _get_region_dominant_color(self, frame, box, mean_rgb):
+        """
+        Dominant RGB color of a bbox in a BGR frame; tiny regions just use their mean
+        """
+        x1, y1, x2, y2 = box
+        if (x2 - x1) * (y2 - y1) < self.MIN_DOMINANT_PIXELS:
+            return mean_rgb.astype(int).tolist()
+        return self._get_dominant_color(frame[y1:y2, x1:x2])[::-1]
+
     def _get_dominant_color(self, region, k=1):
         """
-        Get dominant color in region using k-means clustering
+        Get dominant color in region
+
+        For k=1 this is the mode of a 5-bit-per-channel RGB histogram
+        (single bincount + argmax). k-means is only used for k > 1.
         """
         # Reshape to list of pixels
         pixels = region.reshape(-1, 3)
 
-        # Sample if too large (for performance)
-        if len(pixels) > 1000:
-            indices = np.random.choice(len(pixels), 1000, replace=False)
-            pixels = pixels[indices]
+        if k == 1:
+            # Quantize each channel to 5 bits and pack into one 15-bit key
+            q = (pixels >> 3).astype(np.uint32)
+            keys = (q[:, 0] << 10) | (q[:, 1] << 5) | q[:, 2]
+            key = int(np.bincount(keys).argmax())
+            return [(key >> 10 & 0x1F) << 3, (key >> 5 & 0x1F) << 3, (key & 0x1F) << 3]
 
-        # Use k-means to find dominant color
-        from scipy.cluster.vq import kmeans, vq
+        # Subsample to ~1000 pixels with a strided view (no copy)
+        step = max(1, len(pixels) // 1000)
+        pixels = pixels[::step]
 
         try:
             pixels_float = pixels.astype(np.float32)
@@ -220,136 +406,133 @@ class ColorAnalyzer:
 
         return dominant
 
-    def _estimate_skin_tone(self, hand_region):
+    def _estimate_skin_tones(self, rgb):
         """
-        Estimate skin tone category
+        Estimate skin tone category for each row of an (N, 3) mean-RGB array
         """
-        mean_color = hand_region.mean(axis=(0, 1))
-        r, g, b = mean_color
+        rgb = np.asarray(rgb, dtype=np.float64).reshape(-1, 3)
+        r, g = rgb[:, 0], rgb[:, 1]
 
         # Simple heuristic for skin tone classification
         # Based on RGB ratios typical of human skin
-        if r > 200 and g > 180:
-            return "light"
-        elif r > 150 and g > 100:
-            return "medium"
-        else:
-            return "dark"
-
-    def _extract_clothing_colors(self, frame_rgb, pose_data, width, height):
+        codes = np.select(
+            [(r > 200) & (g > 180), (r > 150) & (g > 100)],
+            [0, 1],
+            default=2
+        )
+        return [SKIN_TONES[c] for c in codes]
+
+    def _hand_boxes(self, hands, width, height):
         """
-        Extract clothing colors from torso region
+        Clamped (x1, y1, x2, y2) landmark bboxes for all hands at once
+
+        Returns:
+            (hands with a non-empty bbox, their bboxes)
         """
-        if 'landmarks' not in pose_data:
-            return {}
+        if not hands:
+            return [], []
 
-        landmarks = pose_data['landmarks']
+        # (num_hands, num_landmarks, 2) normalized coords, scaled to pixels
+        coords = np.array(
+            [[(lm['x'], lm['y']) for lm in hand['landmarks'].values()] for hand in hands],
+            dtype=np.float32
+        )
+        coords *= np.array([width, height], dtype=np.float32)
 
-        # Define torso region using shoulders and hips
-        try:
-            # Get key landmarks
-            left_shoulder = landmarks.get('LEFT_SHOULDER', {})
-            right_shoulder = landmarks.get('RIGHT_SHOULDER', {})
-            left_hip = landmarks.get('LEFT_HIP', {})
-            right_hip = landmarks.get('RIGHT_HIP', {})
-
-            if not all([left_shoulder, right_shoulder, left_hip, right_hip]):
-                return {}
-
-            # Calculate torso bounding box
-            x_coords = [
-                left_shoulder['x'] * width,
-                right_shoulder['x'] * width,
-                left_hip['x'] * width,
-                right_hip['x'] * width
-            ]
-            y_coords = [
-                left_shoulder['y'] * height,
-                right_shoulder['y'] * height,
-                left_hip['y'] * height,
-                right_hip['y'] * height
-            ]
+        # Truncate like int(), then clamp to valid range
+        boxes = np.concatenate([coords.min(axis=1), coords.max(axis=1)], axis=1).astype(np.intp)
+        np.maximum(boxes[:, :2], 0, out=boxes[:, :2])
+        np.minimum(boxes[:, 2:], (width, height), out=boxes[:, 2:])
+
+        valid = (boxes[:, 2] > boxes[:, 0]) & (boxes[:, 3] > boxes[:, 1])
+        return [hand for hand, ok in zip(hands, valid) if ok], [tuple(box) for box in boxes[valid].tolist()]
 
-            x_min = int(max(0, min(x_coords) - 20))  # Add margin
-            x_max = int(min(width, max(x_coords) + 20))
-            y_min = int(max(0, min(y_coords)))
-            y_max = int(min(height, max(y_coords)))
+    def _torso_box(self, pose_data, width, height):
+        """
+        Torso (x1, y1, x2, y2) bbox from shoulder and hip landmarks, or None
+        """
+        landmarks = pose_data.get('landmarks')
+        if not landmarks:
+            return None
+
+        # Define torso region using shoulders and hips
+        torso = [landmarks.get(name) for name in ('LEFT_SHOULDER', 'RIGHT_SHOULDER', 'LEFT_HIP', 'RIGHT_HIP')]
+        if not all(torso):
+            return None
 
-            if x_max > x_min and y_max > y_min:
-                torso_region = frame_rgb[y_min:y_max, x_min:x_max]
+        try:
+            coords = np.array([(lm['x'], lm['y']) for lm in torso], dtype=np.float32)
+        except (KeyError, TypeError, ValueError):
+            return None
+        coords *= np.array([width, height], dtype=np.float32)
 
-                if torso_region.size > 0:
-                    mean_rgb = torso_region.mean(axis=(0, 1))
-                    dominant = self._get_dominant_color(torso_region)
+        # Calculate torso bounding box (with horizontal margin), clamped
+        (x_lo, y_lo), (x_hi, y_hi) = coords.min(axis=0), coords.max(axis=0)
+        x_min = int(max(0, x_lo - 20))
+        x_max = int(min(width, x_hi + 20))
+        y_min = int(max(0, y_lo))
+        y_max = int(min(height, y_hi))
 
-                    return {
-                        'upper_body_mean_rgb': mean_rgb.tolist(),
-                        'upper_body_dominant_rgb': dominant,
-                        'upper_body_color_name': self._rgb_to_color_name(mean_rgb),
-                        'region_size': torso_region.shape[:2]
-                    }
-        except Exception as e:
-            pass
+        if x_max > x_min and y_max > y_min:
+            return (x_min, y_min, x_max, y_max)
 
-        return {}
+        return None
 
-    def _rgb_to_color_name(self, rgb):
+    def _rgb_to_color_names(self, rgb):
         """
-        Convert RGB to basic color name
+        Convert each row of an (N, 3) RGB array to a basic color name
         """
-        r, g, b = rgb
+        rgb = np.asarray(rgb, dtype=np.float64).reshape(-1, 3)
+        r, g, b = rgb[:, 0], rgb[:, 1], rgb[:, 2]
 
         # Simple color classification
-        max_channel = max(r, g, b)
-        min_channel = min(r, g, b)
-
-        # Check if grayscale
-        if max_channel - min_channel < 30:
-            if max_channel < 50:
-                return "black"
-            elif max_channel > 200:
-                return "white"
-            else:
-                return "gray"
-
-        # Check dominant channel
-        if r > g and r > b:
-            if r > 200:
-                return "red"
-            else:
-                return "brown"
-        elif g > r and g > b:
-            return "green"
-        elif b > r and b > g:
-            return "blue"
-        elif r > 150 and g > 150:
-            return "yellow"
-        elif r > 150 and b > 150:
-            return "magenta"
-        elif g > 150 and b > 150:
-            return "cyan"
-        else:
-            return "mixed"
-
-    def _analyze_colors(self, frames):
+        max_channel = rgb.max(axis=1)
+        min_channel = rgb.min(axis=1)
+        grayscale = max_channel - min_channel < 30
+
+        # Conditions in priority order (first match wins), codes index COLOR_NAMES
+        codes = np.select(
+            [
+                grayscale & (max_channel < 50),
+                grayscale & (max_channel > 200),
+                grayscale,
+                (r > g) & (r > b) & (r > 200),
+                (r > g) & (r > b),
+                (g > r) & (g > b),
+                (b > r) & (b > g),
+                (r > 150) & (g > 150),
+                (r > 150) & (b > 150),
+                (g > 150) & (b > 150),
+            ],
+            list(range(10)),
+            default=10
+        )
+        return [COLOR_NAMES[c] for c in codes]
+
+    def _analyze_colors(self, stats):
         """
         Analyze color patterns across all frames
+
+        Args:
+            stats: Per-frame values collected by _accumulate_stats
         """
         print(f"\n{'='*70}")
         print(f"COLOR ANALYSIS")
         print(f"{'='*70}\n")
 
-        # Collect scene brightness over time
-        brightness = [f['colors']['scene_colors']['brightness'] for f in frames]
-        saturation = [f['colors']['scene_colors']['saturation'] for f in frames]
+        # Scene brightness over time (zero-copy views of the accumulators)
+        brightness = np.frombuffer(stats['brightness'], dtype=np.float64)
+        saturation = np.frombuffer(stats['saturation'], dtype=np.float64)
+        brightness_mean = brightness.mean()
+        saturation_mean = saturation.mean()
 
         print(f"📊 SCENE LIGHTING:")
-        print(f"   Average brightness: {np.mean(brightness):.1f}/255")
-        print(f"   Brightness range: {np.min(brightness):.1f} to {np.max(brightness):.1f}")
-        print(f"   Average saturation: {np.mean(saturation):.1f}/255")
+        print(f"   Average brightness: {brightness_mean:.1f}/255")
+        print(f"   Brightness range: {brightness.min():.1f} to {brightness.max():.1f}")
+        print(f"   Average saturation: {saturation_mean:.1f}/255")
 
         # Lighting consistency
-        brightness_std = np.std(brightness)
+        brightness_std = brightness.std()
         if brightness_std < 10:
             lighting = "Consistent (good for robots)"
         elif brightness_std < 30:
@@ -360,57 +543,44 @@ class ColorAnalyzer:
         print(f"   Lighting consistency: {lighting}")
 
         # Analyze object colors if available
-        object_colors = []
-        for frame in frames:
-            if frame['colors']['object_colors']:
-                for obj_color in frame['colors']['object_colors']:
-                    object_colors.append({
-                        'class': obj_color['class'],
-                        'color_name': obj_color['color_name'],
-                        'rgb': obj_color['mean_rgb']
-                    })
+        object_colors = stats['object_colors']
 
         if object_colors:
             print(f"\n🎨 OBJECT COLORS DETECTED:")
             # Count color occurrences per object class
             color_counts = {}
-            for obj in object_colors:
-                key = f"{obj['class']} ({obj['color_name']})"
+            for obj_class, color_name in object_colors:
+                key = f"{obj_class} ({color_name})"
                 color_counts[key] = color_counts.get(key, 0) + 1
 
             for obj_color, count in sorted(color_counts.items(), key=lambda x: x[1], reverse=True)[:5]:
                 print(f"   • {obj_color}: {count} frames")
 
-        # Hand skin tone
-        hand_tones = []
-        for frame in frames:
-            if frame['colors']['hand_colors']:
-                for hand in frame['colors']['hand_colors']:
-                    hand_tones.append(hand['skin_tone_estimate'])
+        # Hand skin tone (label codes -> bincount)
+        hand_tones = np.frombuffer(stats['hand_tones'], dtype=np.int8)
 
-        if hand_tones:
-            most_common_tone = Counter(hand_tones).most_common(1)[0][0]
+        if len(hand_tones):
+            tone_counts = np.bincount(hand_tones, minlength=len(SKIN_TONES))
+            most_common_tone = SKIN_TONES[tone_counts.argmax()]
             print(f"\n✋ HAND SKIN TONE: {most_common_tone}")
 
         # Analyze clothing colors
-        clothing_colors = []
-        for frame in frames:
-            if frame['colors']['person_clothing']:
-                clothing = frame['colors']['person_clothing']
-                if 'upper_body_color_name' in clothing:
-                    clothing_colors.append(clothing['upper_body_color_name'])
-
-        if clothing_colors:
-            clothing_counter = Counter(clothing_colors)
-            most_common_clothing = clothing_counter.most_common(3)
+        clothing_colors = np.frombuffer(stats['clothing_colors'], dtype=np.int8)
+
+        if len(clothing_colors):
+            clothing_counts = np.bincount(clothing_colors, minlength=len(COLOR_NAMES))
+            most_common_clothing = np.argsort(-clothing_counts, kind='stable')[:3]
             print(f"\n👕 OUTFIT COLORS DETECTED:")
-            for color, count in most_common_clothing:
+            for code in most_common_clothing:
+                count = clothing_counts[code]
+                if count == 0:
+                    break
                 freq = count / len(clothing_colors) * 100
-                print(f"   • {color}: {count} frames ({freq:.1f}%)")
+                print(f"   • {COLOR_NAMES[code]}: {count} frames ({freq:.1f}%)")
 
         return {
-            'scene_brightness_mean': float(np.mean(brightness)),
-            'scene_saturation_mean': float(np.mean(saturation)),
+            'scene_brightness_mean': float(brightness_mean),
+            'scene_saturation_mean': float(saturation_mean),
             'lighting_consistency': lighting,
             'object_colors_detected': len(object_colors) > 0,
             'clothing_colors_detected': len(clothing_colors) > 0
@@ -418,16 +588,21 @@ class ColorAnalyzer:
 
 
 def main():
-    import sys
+    import argparse
 
-    if len(sys.argv) < 3:
-        print("Usage: python add_color_analysis.py <video_file> <full_extraction.json>")
-        print("\nExample:")
-        print("  python add_color_analysis.py test_video.mp4 test_video_full_extraction.json")
-        return
+    parser = argparse.ArgumentParser(
+        description='Add color analysis to a full extraction',
+        epilog='Example: python add_color_analysis.py test_video.mp4 test_video_full_extraction.json'
+    )
+    parser.add_argument('video_file', help='Video the extraction was made from')
+    parser.add_argument('extraction_file', help='Full extraction JSON')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Worker processes for frame extraction (default: CPU count)')
+
+    args = parser.parse_args()
 
-    video_path = sys.argv[1]
-    extraction_file = sys.argv[2]
+    video_path = args.video_file
+    extraction_file = args.extraction_file
 
     if not Path(video_path).exists():
         print(f"❌ Video not found: {video_path}")
@@ -437,18 +612,14 @@ def main():
         print(f"❌ Extraction file not found: {extraction_file}")
         return
 
-    # Process
-    analyzer = ColorAnalyzer()
-    results = analyzer.process(video_path, extraction_file)
-
-    # Save output
+    # Process (frames are streamed straight to the output file)
     output_file = Path(extraction_file).stem + '_with_colors.json'
 
-    print(f"\n💾 SAVING RESULTS...")
-    print(f"   Output: {output_file}")
+    analyzer = ColorAnalyzer(num_workers=args.workers)
+    analyzer.process(video_path, extraction_file, output_file)
 
-    with open(output_file, 'w') as f:
-        json.dump(results, f, indent=2)
+    print(f"\n💾 SAVED RESULTS")
+    print(f"   Output: {output_file}")
 
     print(f"\n✅ COLOR ANALYSIS COMPLETE")
     print(f"\n{'='*70}")
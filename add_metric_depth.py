@@ -8,6 +8,10 @@ Output: Enhanced timestep data with metric 3D coordinates
 
 import cv2
 import json
+import os
+import queue
+import tempfile
+import threading
 import numpy as np
 import torch
 from pathlib import Path
@@ -19,15 +23,25 @@ class MetricDepthAdder:
     Add metric depth estimation to timestep data
     """
 
-    def __init__(self, encoder='vits'):
+    # ImageNet normalization used by Depth-Anything V2
+    MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+    STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+
+    def __init__(self, encoder='vits', stride=1, batch_size=8, input_size=518):
         """
         Args:
             encoder: 'vits' (small, fast), 'vitb' (medium), 'vitl' (large, accurate)
+            stride: Run depth on every Nth frame (skipped frames are grabbed, not decoded)
+            batch_size: Frames per model forward pass
+            input_size: Model input resolution (shorter side, multiple of 14)
         """
         print(f"🔧 Initializing Metric Depth Adder...")
 
         # Model configuration
         self.encoder = encoder
+        self.stride = max(1, int(stride))
+        self.batch_size = max(1, int(batch_size))
+        self.input_size = input_size
         model_configs = {
             'vits': {'encoder': 'vits', 'features': 64, 'out_channels': [48, 96, 192, 384]},
             'vitb': {'encoder': 'vitb', 'features': 128, 'out_channels': [96, 192, 384, 768]},
@@ -51,8 +65,48 @@ class MetricDepthAdder:
         self.model = self.model.to(self.device)
         self.model.eval()
 
+        # Mixed precision: fp16 on MPS, bf16 on CPU (CPU autocast has no fp16)
+        self.autocast_dtype = torch.float16 if self.device == 'mps' else torch.bfloat16
+
+        self._compile_model()
+
         print(f"   ✅ Model loaded")
 
+    def _compile_model(self):
+        """
+        Wrap the model with torch.compile (compiled on the first batch)
+
+        dynamic=True lets one compiled graph serve every video's aspect
+        ratio and the partial last batch instead of recompiling per shape.
+        MPS support in torch.compile is limited, so MPS keeps the eager
+        model; a compile failure falls back to it in _forward.
+        """
+        self.eager_model = self.model
+
+        if self.device == 'mps' or not hasattr(torch, 'compile'):
+            print(f"   Compile: skipped (eager)")
+            return
+
+        try:
+            self.model = torch.compile(self.eager_model, dynamic=True)
+            print(f"   Compile: torch.compile (on first batch)")
+        except Exception as e:
+            print(f"   Compile: failed, using eager model ({e})")
+
+    def _forward(self, batch):
+        """
+        Model forward pass, falling back to the eager model if the compiled
+        one fails (compilation happens inside its first calls)
+        """
+        try:
+            return self.model(batch)
+        except Exception as e:
+            if self.model is self.eager_model:
+                raise
+            print(f"   Compile: failed, using eager model ({e})")
+            self.model = self.eager_model
+            return self.model(batch)
+
     def process(self, video_path, timestep_file):
         """
         Add metric depth to timestep data
@@ -83,54 +137,74 @@ class MetricDepthAdder:
         if not cap.isOpened():
             raise ValueError(f"Cannot open video: {video_path}")
 
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
         video_fps = cap.get(cv2.CAP_PROP_FPS)
         video_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
         video_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
 
         print(f"   Resolution: {video_width}x{video_height}")
         print(f"   FPS: {video_fps}")
+        if self.stride > 1:
+            print(f"   Stride: every {self.stride} frames")
 
-        # Process all frames
+        # Process frames
         print(f"\n🎬 PROCESSING FRAMES WITH DEPTH MODEL...")
 
-        depth_maps = []
-        frame_idx = 0
-
-        with torch.no_grad():
-            while cap.isOpened():
-                ret, frame = cap.read()
-                if not ret:
-                    break
-
-                if frame_idx % 30 == 0:
-                    print(f"   Frame {frame_idx}/{len(timesteps)}")
-
-                # Run depth estimation
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                depth_map = self.model.infer_image(frame_rgb)
-
-                depth_maps.append(depth_map)
-                frame_idx += 1
-
-        cap.release()
-
-        print(f"\n✅ Processed {len(depth_maps)} frames")
-
-        # Extract depth at wrist positions
-        print(f"\n🎯 EXTRACTING DEPTH AT WRIST POSITIONS...")
-        enhanced_timesteps = self._add_depth_to_timesteps(
-            timesteps, depth_maps, video_width, video_height
-        )
-
-        # Analyze depth distribution
-        print(f"\n📊 ANALYZING DEPTH DISTRIBUTION...")
-        analysis = self._analyze_depth(enhanced_timesteps, depth_maps)
+        # Depth maps are stored as uint8, normalized per frame to [min, max],
+        # in a disk-backed memmap so RSS stays flat for long videos;
+        # depth_stats holds (min, max, mean, std) of the full-precision map
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        capacity = max(1, -(-frame_count // self.stride))
+        depth_height, depth_width = self._model_input_shape(video_height, video_width)
+
+        fd, depth_file = tempfile.mkstemp(suffix='_depth.bin')
+        os.close(fd)
+
+        try:
+            depth_maps = np.memmap(depth_file, dtype=np.uint8, mode='w+',
+                                   shape=(capacity, depth_height, depth_width))
+            depth_frames = []  # video frame index of each processed frame
+            depth_stats = []   # (min, max, mean, std)
+
+            with torch.no_grad():
+                for frame_idx, depth_map, stats in self._iter_depth_maps(cap, len(timesteps)):
+                    slot = len(depth_frames)
+                    if slot == len(depth_maps):
+                        # Container frame count was an underestimate
+                        depth_maps = self._grow_memmap(depth_maps, depth_file, 2 * len(depth_maps))
+                    depth_maps[slot] = depth_map
+                    depth_frames.append(frame_idx)
+                    depth_stats.append(stats)
+
+            depth_maps.flush()
+            depth_frames = np.array(depth_frames, dtype=np.int64)
+            depth_stats = np.array(depth_stats, dtype=np.float64).reshape(-1, 4)
+
+            print(f"\n✅ Processed {len(depth_frames)} frames")
+
+            # Extract depth at wrist positions
+            print(f"\n🎯 EXTRACTING DEPTH AT WRIST POSITIONS...")
+            enhanced_timesteps = self._add_depth_to_timesteps(
+                timesteps, depth_frames, depth_maps[:len(depth_frames)], depth_stats,
+                video_width, video_height
+            )
+
+            # Analyze depth distribution
+            print(f"\n📊 ANALYZING DEPTH DISTRIBUTION...")
+            analysis = self._analyze_depth(enhanced_timesteps, depth_stats)
+        finally:
+            cap.release()
+            # Drop the mapping before deleting its backing file
+            depth_maps = None
+            os.remove(depth_file)
 
         return {
             'metadata': {
                 **metadata,
                 'depth_model': self.encoder,
                 'depth_device': self.device,
+                'depth_stride': self.stride,
                 'video_resolution': [video_width, video_height]
             },
             'timesteps': enhanced_timesteps,
@@ -140,57 +214,257 @@ class MetricDepthAdder:
             }
         }
 
-    def _add_depth_to_timesteps(self, timesteps, depth_maps, width, height):
+    def _grow_memmap(self, depth_maps, depth_file, capacity):
         """
-        Add depth values to each timestep
+        Re-open the depth memmap with room for `capacity` frames
+        """
+        shape = (capacity,) + depth_maps.shape[1:]
+        depth_maps.flush()
+
+        with open(depth_file, 'r+b') as f:
+            f.truncate(int(np.prod(shape)))
+
+        return np.memmap(depth_file, dtype=np.uint8, mode='r+', shape=shape)
+
+    def _iter_depth_maps(self, cap, total):
+        """
+        Run batched depth inference on frames decoded by a background thread
+
+        Decode + preprocessing overlap with the model forward pass.
+        Yields (frame_idx, depth_map, stats) as each batch completes; depth
+        maps are at model resolution (see _model_input_shape). An exception
+        in the decode thread is re-raised here; if this side fails or is
+        closed early, the decode thread is stopped before returning.
+        """
+        frame_queue = queue.Queue(maxsize=2 * self.batch_size)
+        stop = threading.Event()
+        worker = threading.Thread(
+            target=self._decode_worker,
+            args=(cap, frame_queue, total, stop),
+            daemon=True
+        )
+        worker.start()
+
+        batch_indices = []
+        batch_images = []
+
+        try:
+            while True:
+                item = frame_queue.get()
+                if item is None:  # EOF sentinel
+                    break
+
+                if isinstance(item, Exception):
+                    # Decode failed: don't pass the truncated video off as complete
+                    raise item
+
+                frame_idx, image = item
+                batch_indices.append(frame_idx)
+                batch_images.append(image)
+
+                if len(batch_images) == self.batch_size:
+                    yield from self._infer_batch(batch_indices, batch_images)
+                    batch_indices = []
+                    batch_images = []
+
+            if batch_images:
+                yield from self._infer_batch(batch_indices, batch_images)
+        finally:
+            # Unblock a producer waiting on a full queue, then wait for it
+            stop.set()
+            while True:
+                try:
+                    frame_queue.get_nowait()
+                except queue.Empty:
+                    break
+            worker.join()
+
+    def _decode_worker(self, cap, out_queue, total, stop):
+        """
+        Producer: grab/retrieve frames, preprocess, and queue model-ready tensors
+
+        Decode, resize and color-conversion outputs reuse the same buffers
+        every frame; only the normalized tensor put on the queue is new.
+        Returns once `stop` is set, even if the queue is full.
+        """
+        def put(item):
+            while not stop.is_set():
+                try:
+                    out_queue.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        try:
+            frame = None
+            buffers = {}
+            frame_idx = 0
+            while not stop.is_set():
+                # grab() only demuxes; skipped frames are never decoded
+                if not cap.grab():
+                    break
+
+                if frame_idx % self.stride == 0:
+                    ret, frame = cap.retrieve(frame)
+                    if not ret:
+                        break
+
+                    if frame_idx % 30 < self.stride:
+                        print(f"   Frame {frame_idx}/{total}")
+
+                    if not put((frame_idx, self._preprocess(frame, buffers))):
+                        break
+
+                frame_idx += 1
+        except Exception as e:
+            put(e)  # Re-raised by _iter_depth_maps
+        finally:
+            put(None)
+
+    def _preprocess(self, frame, buffers=None):
+        """
+        Resize + normalize a BGR frame into a (1, 3, H, W) model input tensor
+
+        Resizes before the color conversion so BGR->RGB only touches the
+        small model-resolution image. If a buffers dict is given, the
+        resize/RGB intermediates are allocated once and reused.
+        """
+        new_h, new_w = self._model_input_shape(*frame.shape[:2])
+
+        if buffers is None:
+            buffers = {}
+        if buffers.get('resized') is None or buffers['resized'].shape[:2] != (new_h, new_w):
+            buffers['resized'] = np.empty((new_h, new_w, 3), dtype=np.uint8)
+            buffers['rgb'] = np.empty((new_h, new_w, 3), dtype=np.uint8)
+
+        resized = cv2.resize(frame, (new_w, new_h), dst=buffers['resized'], interpolation=cv2.INTER_AREA)
+        resized = cv2.cvtColor(resized, cv2.COLOR_BGR2RGB, dst=buffers['rgb'])
+        image = (resized.astype(np.float32) / 255.0 - self.MEAN) / self.STD
+
+        return torch.from_numpy(np.ascontiguousarray(image.transpose(2, 0, 1)))[None]
+
+    def _model_input_shape(self, height, width):
+        """
+        Model input (and depth output) size for a frame
+
+        Matches Depth-Anything V2's transform: keep aspect ratio, shorter
+        side >= input_size, both sides a multiple of 14.
+        """
+        scale = max(self.input_size / height, self.input_size / width)
+        return self._multiple_of_14(height * scale), self._multiple_of_14(width * scale)
+
+    def _multiple_of_14(self, x):
+        """
+        Round to the nearest multiple of 14, rounding up if below input_size
+        """
+        y = int(np.round(x / 14) * 14)
+        if y < self.input_size:
+            y = int(np.ceil(x / 14) * 14)
+        return y
+
+    def _infer_batch(self, indices, images):
         """
-        enhanced = []
+        Run one mixed-precision forward pass over a batch and quantize each
+        depth map to uint8
 
-        for i, ts in enumerate(timesteps):
-            if i >= len(depth_maps):
-                break
+        Maps stay at model resolution: the wrist readout needs a single
+        pixel per frame, so neither upsampling to video size nor 8-bit
+        storage (with the per-frame min/max to de-quantize) loses anything
+        useful.
+        """
+        batch = torch.cat(images).to(self.device, non_blocking=True)
+        with torch.autocast(device_type=self.device, dtype=self.autocast_dtype):
+            depth = self._forward(batch)
+        depth = depth.float()
+
+        # Per-frame stats on the full-precision maps
+        d_min = depth.amin(dim=(1, 2))
+        d_max = depth.amax(dim=(1, 2))
+        d_mean = depth.mean(dim=(1, 2))
+        d_std = depth.std(dim=(1, 2), unbiased=False)
+
+        scale = (d_max - d_min).clamp_min(1e-12)[:, None, None]
+        quantized = ((depth - d_min[:, None, None]) / scale * 255).round().to(torch.uint8)
 
-            depth_map = depth_maps[i]
+        stats = torch.stack([d_min, d_max, d_mean, d_std], dim=1).cpu().numpy()
 
-            # Get normalized wrist position
-            wrist_pos = ts['observations']['end_effector_pos']
-            x_norm, y_norm, z_relative = wrist_pos
+        for frame_idx, depth_map, frame_stats in zip(indices, quantized.cpu().numpy(), stats):
+            yield frame_idx, depth_map, tuple(float(v) for v in frame_stats)
 
-            # Convert normalized to pixel coordinates
-            x_pixel = int(x_norm * width)
-            y_pixel = int(y_norm * height)
+    def _add_depth_to_timesteps(self, timesteps, depth_frames, depth_maps, depth_stats, width, height):
+        """
+        Add depth values to each timestep
 
-            # Clamp to valid range
-            x_pixel = int(np.clip(x_pixel, 0, width - 1))
-            y_pixel = int(np.clip(y_pixel, 0, height - 1))
+        All wrist depths are read with one fancy-index gather over the
+        (F, H, W) depth stack. Timesteps whose frame was skipped by the
+        stride use the closest preceding processed frame; only the wrist
+        pixels are de-quantized.
 
-            # Extract depth at wrist position
-            depth_value = float(depth_map[y_pixel, x_pixel])
+        Depth maps are at model resolution; wrist pixels (reported in video
+        coordinates) are rescaled onto that grid for the lookup.
 
-            # Create enhanced timestep
-            enhanced_ts = {
-                **ts,
+        Args:
+            depth_frames: (F,) sorted video frame index of each depth map
+            depth_maps: (F, h, w) uint8 depth maps at model resolution
+            depth_stats: (F, 4) per-frame (min, max, mean, std)
+        """
+        frame_indices = np.array([ts.get('frame_idx', i) for i, ts in enumerate(timesteps)], dtype=np.int64)
+        wrist_pos = np.array([ts['observations']['end_effector_pos'] for ts in timesteps], dtype=np.float64).reshape(-1, 3)
+
+        if len(depth_frames) == 0:
+            print(f"   Enhanced 0 timesteps")
+            return []
+
+        # Map each timestep to its depth map (drop timesteps with no depth)
+        depth_frame = frame_indices - frame_indices % self.stride
+        slot = np.minimum(np.searchsorted(depth_frames, depth_frame), len(depth_frames) - 1)
+        valid_ts = np.flatnonzero(depth_frames[slot] == depth_frame)
+        slot = slot[valid_ts]
+
+        # Convert normalized to pixel coordinates, clamped to valid range
+        x_pixels = np.clip((wrist_pos[valid_ts, 0] * width).astype(np.int64), 0, width - 1)
+        y_pixels = np.clip((wrist_pos[valid_ts, 1] * height).astype(np.int64), 0, height - 1)
+
+        # Same positions on the depth map grid
+        depth_height, depth_width = depth_maps.shape[1:]
+        x_depth = np.minimum(x_pixels * depth_width // width, depth_width - 1)
+        y_depth = np.minimum(y_pixels * depth_height // height, depth_height - 1)
+
+        # Extract (de-quantized) depth at wrist positions
+        stats = depth_stats[slot]
+        quantized = depth_maps[slot, y_depth, x_depth].astype(np.float64)
+        depth_values = stats[:, 0] + quantized / 255.0 * (stats[:, 1] - stats[:, 0])
+
+        enhanced = [
+            {
+                **timesteps[t],
                 'observations': {
-                    **ts['observations'],
+                    **timesteps[t]['observations'],
                     'depth_raw': depth_value,  # Raw depth from model
                     'depth_pixel_coords': [x_pixel, y_pixel],
                 },
                 'depth_map_stats': {
-                    'min': float(depth_map.min()),
-                    'max': float(depth_map.max()),
-                    'mean': float(depth_map.mean()),
-                    'std': float(depth_map.std())
+                    'min': d_min,
+                    'max': d_max,
+                    'mean': d_mean,
+                    'std': d_std
                 }
             }
-
-            enhanced.append(enhanced_ts)
+            for t, depth_value, x_pixel, y_pixel, (d_min, d_max, d_mean, d_std) in zip(
+                valid_ts.tolist(), depth_values.tolist(), x_pixels.tolist(), y_pixels.tolist(), stats.tolist()
+            )
+        ]
 
         print(f"   Enhanced {len(enhanced)} timesteps")
         return enhanced
 
-    def _analyze_depth(self, timesteps, depth_maps):
+    def _analyze_depth(self, timesteps, depth_stats):
         """
         Analyze depth distribution
+
+        Scene stats are pooled from the per-frame (min, max, mean, std)
+        recorded during inference; every frame has the same pixel count.
         """
         print(f"\n{'='*70}")
         print(f"DEPTH ANALYSIS")
@@ -199,13 +473,16 @@ class MetricDepthAdder:
         # Extract depth values
         wrist_depths = np.array([ts['observations']['depth_raw'] for ts in timesteps])
 
-        # Global depth stats
-        all_depths = np.concatenate([dm.flatten() for dm in depth_maps[:100]])  # Sample first 100 frames
+        # Global depth stats (pooled over all processed frames)
+        scene_min = depth_stats[:, 0].min()
+        scene_max = depth_stats[:, 1].max()
+        scene_mean = depth_stats[:, 2].mean()
+        scene_std = np.sqrt(max(0.0, (depth_stats[:, 3] ** 2 + depth_stats[:, 2] ** 2).mean() - scene_mean ** 2))
 
         print(f"📊 GLOBAL DEPTH STATISTICS:")
-        print(f"   Scene depth range: {all_depths.min():.3f} to {all_depths.max():.3f}")
-        print(f"   Scene depth mean: {all_depths.mean():.3f}")
-        print(f"   Scene depth std: {all_depths.std():.3f}")
+        print(f"   Scene depth range: {scene_min:.3f} to {scene_max:.3f}")
+        print(f"   Scene depth mean: {scene_mean:.3f}")
+        print(f"   Scene depth std: {scene_std:.3f}")
 
         print(f"\n🎯 WRIST DEPTH STATISTICS:")
         print(f"   Wrist depth range: {wrist_depths.min():.3f} to {wrist_depths.max():.3f}")
@@ -219,8 +496,8 @@ class MetricDepthAdder:
         print(f"   Max frame-to-frame change: {np.abs(depth_variation).max():.4f}")
 
         return {
-            'scene_depth_range': [float(all_depths.min()), float(all_depths.max())],
-            'scene_depth_mean': float(all_depths.mean()),
+            'scene_depth_range': [float(scene_min), float(scene_max)],
+            'scene_depth_mean': float(scene_mean),
             'wrist_depth_range': [float(wrist_depths.min()), float(wrist_depths.max())],
             'wrist_depth_mean': float(wrist_depths.mean()),
             'wrist_depth_std': float(wrist_depths.std()),
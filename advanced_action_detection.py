@@ -10,8 +10,197 @@ New capabilities:
 """
 
 import json
+import math
 import numpy as np
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+from scipy.ndimage import maximum_filter1d
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Angle thresholds, converted once at import
+MIN_TWIST_ROTATION_RAD = math.radians(40)  # At least 40 degrees (increased from 30)
+POUR_PITCH_THRESHOLD_RAD = math.radians(30)  # At least 30 degrees tilt
+
+# Linear action codes emitted by _walk_linear_candidates
+LINEAR_ACTIONS = ('push', 'pull', 'slide', 'lift', 'place')
+LINEAR_CONFIDENCES = (0.75, 0.75, 0.7, 0.75, 0.7)
+
+# Action type codes for the sort/merge table
+ACTION_TYPES = ('twist_open', 'twist_close', 'pour', 'push', 'pull', 'slide',
+                'lift', 'place', 'open', 'close')
+ACTION_CODES = {name: code for code, name in enumerate(ACTION_TYPES)}
+ACTION_DTYPE = np.dtype([('action_code', 'i1'), ('start_time', 'f8'), ('end_time', 'f8')])
+
+
+@dataclass
+class Orientations:
+    """
+    Per-frame hand orientation stored as parallel arrays (NaN where invalid)
+    """
+    roll: np.ndarray
+    pitch: np.ndarray
+    yaw: np.ndarray
+    palm_normal: np.ndarray
+    valid: np.ndarray
+    num_valid: int = 0
+
+
+def _load_json(path):
+    """
+    Parse a JSON file (orjson when available)
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _nearest_index(t, value):
+    """
+    Index of the sample in sorted t closest to value (earlier one on ties)
+    """
+    i = int(np.searchsorted(t, value))
+    if i == len(t) or (i > 0 and value - t[i - 1] <= t[i] - value):
+        # First of any repeated timestamps, as argmin would pick
+        return int(np.searchsorted(t, t[i - 1]))
+    return i
+
+
+def _action_table(actions):
+    """
+    Columnar ACTION_DTYPE view of action dicts (one row per action)
+    """
+    return np.array([(ACTION_CODES[a['action']], a['start_time'], a['end_time']) for a in actions],
+                    dtype=ACTION_DTYPE)
+
+
+def _run_ends(mask):
+    """
+    Index of the first False at or after each position (len(mask) if none)
+    """
+    breaks = np.flatnonzero(~mask)
+    return np.append(breaks, len(mask))[np.searchsorted(breaks, np.arange(len(mask)))]
+
+
+def _unwrap_inplace(angles):
+    """
+    np.unwrap for angles within [-pi, pi], written back into the input
+
+    Neighbouring samples then differ by less than 2*pi, so every jump needs
+    at most one period of correction and a running count of wraps suffices.
+    """
+    jumps = np.diff(angles)
+    wraps = np.cumsum((jumps < -np.pi).astype(np.int8) - (jumps > np.pi))
+    angles[1:] += (2 * np.pi) * wraps
+    return angles
+
+
+def _angular_rate(angles, inv_span):
+    """
+    Central-difference rate of change (one-sided at the ends), float32 output
+
+    inv_span holds 1 / (t[i+1] - t[i-1]) for the interior samples and the
+    one-sided 1 / dt at either end, as built by _inverse_spans.
+    """
+    rate = np.empty(len(angles), dtype=np.float32)
+    np.subtract(angles[2:], angles[:-2], out=rate[1:-1])
+    rate[0] = angles[1] - angles[0]
+    rate[-1] = angles[-1] - angles[-2]
+    rate *= inv_span
+    return rate
+
+
+def _inverse_spans(t):
+    """
+    Reciprocal time spans used by _angular_rate, computed once per time base
+    """
+    inv_span = np.empty(len(t), dtype=np.float64)
+    np.subtract(t[2:], t[:-2], out=inv_span[1:-1])
+    inv_span[0] = t[1] - t[0]
+    inv_span[-1] = t[-1] - t[-2]
+    return np.reciprocal(inv_span, out=inv_span)
+
+
+def _first_per_run(run_ends, accepted):
+    """
+    Positions of the first accepted candidate in each run
+
+    Candidates sharing a run end belong to the same run; once one of them
+    is accepted the scan resumes after the run, so later ones are skipped.
+    """
+    accepted_idx = np.flatnonzero(accepted)
+    _, first = np.unique(run_ends[accepted_idx], return_index=True)
+    return accepted_idx[first]
+
+
+def _walk_linear_candidates(candidates, push_ok, push_end, is_pull, slide_ok, slide_run,
+                            slide_end, lift_trigger, lift_run, lift_end, place_ok,
+                            place_run, n):
+    """
+    Resolve linear-action candidates in frame order
+
+    Push/pull wins over slide, slide over lift, lift over place. An accepted
+    action resumes the scan after its run; a rejected lift skips its run and
+    still gets the place check. Returns (codes, starts, ends) indexing
+    LINEAR_ACTIONS.
+    """
+    codes = np.empty(len(candidates), dtype=np.int8)
+    starts = np.empty(len(candidates), dtype=np.int64)
+    ends = np.empty(len(candidates), dtype=np.int64)
+    m = 0
+    i = 0
+
+    for c in candidates:
+        if c < i:
+            continue
+        if c >= n - 10:
+            break
+        i = c
+
+        if push_ok[i]:
+            codes[m] = 1 if is_pull[i] else 0
+            starts[m] = i
+            ends[m] = push_end[i]
+            m += 1
+            i = push_end[i]
+            continue
+
+        if slide_ok[i]:
+            codes[m] = 2
+            starts[m] = i
+            ends[m] = slide_end[i]
+            m += 1
+            i = slide_run[i]
+            continue
+
+        if lift_trigger[i]:
+            start = i
+            i = lift_run[start]
+            if lift_end[start] - start > 5:
+                codes[m] = 3
+                starts[m] = start
+                ends[m] = lift_end[start]
+                m += 1
+                continue
+
+        if place_ok[i]:
+            codes[m] = 4
+            starts[m] = i
+            ends[m] = min(place_run[i] + 10, n - 1)
+            m += 1
+            i = place_run[i] + 10
+            continue
+
+        i += 1
+
+    return codes[:m], starts[:m], ends[:m]
 
 
 class AdvancedActionDetector:
@@ -19,6 +208,9 @@ class AdvancedActionDetector:
     Detect all manipulation actions including rotation-based
     """
 
+    CONTAINER_CLASSES = frozenset(('refrigerator', 'oven', 'microwave', 'door'))
+    MIN_CONTAINER_CONFIDENCE = 0.5  # YOLOv8 confidence threshold
+
     def __init__(self):
         print("🔍 Advanced Action Detector (with Rotation)")
 
@@ -32,27 +224,34 @@ class AdvancedActionDetector:
 
         # Load data
         print(f"📂 Loading data...")
-        with open(metric_file, 'r') as f:
-            metric_data = json.load(f)
-
-        with open(extraction_file, 'r') as f:
-            extraction_data = json.load(f)
+        metric_data = _load_json(metric_file)
+        extraction_data = _load_json(extraction_file)
 
         timesteps = metric_data['timesteps']
         frames = extraction_data['frames']
 
-        # Extract trajectories
-        positions = np.array([ts['observations']['end_effector_pos_metric'] for ts in timesteps])
-        velocities = np.array([ts['kinematics']['velocity'] for ts in timesteps])
-        speeds = np.array([ts['kinematics']['speed'] for ts in timesteps])
-        openness = np.array([ts['observations']['gripper_openness'] for ts in timesteps])
-        timestamps = np.array([ts['timestamp'] for ts in timesteps])
-
-        # Extract orientations
-        orientations = self._extract_orientations(frames)
+        # Extract trajectories in one pass over the timesteps
+        n = len(timesteps)
+        positions = np.empty((n, 3), dtype=np.float32)
+        velocities = np.empty((n, 3), dtype=np.float32)
+        speeds = np.empty(n, dtype=np.float32)
+        openness = np.empty(n, dtype=np.float32)
+        timestamps = np.empty(n, dtype=np.float64)
+
+        for i, ts in enumerate(timesteps):
+            obs = ts['observations']
+            kin = ts['kinematics']
+            positions[i] = obs['end_effector_pos_metric']
+            velocities[i] = kin['velocity']
+            speeds[i] = kin['speed']
+            openness[i] = obs['gripper_openness']
+            timestamps[i] = ts['timestamp']
+
+        # Extract orientations and container detections
+        orientations, container_detections = self._scan_frames(frames)
 
         # Detect containers
-        containers = self._detect_containers(frames)
+        containers = self._detect_containers(container_detections, len(frames))
 
         # Detect all action types
         all_actions = []
@@ -76,11 +275,13 @@ class AdvancedActionDetector:
         )
         all_actions.extend(manipulation_actions)
 
-        # Sort by time
-        all_actions.sort(key=lambda x: x['start_time'])
+        # Sort by time (stable, so ties keep detector order)
+        table = _action_table(all_actions)
+        order = np.argsort(table['start_time'], kind='stable')
+        all_actions = [all_actions[k] for k in order]
 
         # Merge temporally close actions of same type
-        all_actions = self._merge_close_actions(all_actions)
+        all_actions = self._merge_close_actions(all_actions, table[order])
 
         # Filter to keep only primary twist actions (first open, last close)
         all_actions = self._filter_primary_twists(all_actions)
@@ -90,31 +291,58 @@ class AdvancedActionDetector:
 
         return all_actions
 
-    def _extract_orientations(self, frames):
-        """
-        Extract orientation data from frames
+    def _scan_frames(self, frames):
         """
-        orientations = []
+        Extract orientations and container detections in one pass over frames
 
-        for frame in frames:
-            if not frame['hands']['detected']:
-                orientations.append(None)
+        Returns:
+            (Orientations, {container_type: (frame_indices, timestamps, bboxes, confidences)})
+        """
+        n = len(frames)
+        roll = np.full(n, np.nan, dtype=np.float32)
+        pitch = np.full(n, np.nan, dtype=np.float32)
+        yaw = np.full(n, np.nan, dtype=np.float32)
+        palm_normal = np.full((n, 3), np.nan, dtype=np.float32)
+        valid = np.zeros(n, dtype=bool)
+        num_valid = 0
+
+        container_detections = defaultdict(lambda: ([], [], [], []))
+
+        for i, frame in enumerate(frames):
+            # Hand orientation
+            hand_data = frame['hands']
+            if hand_data['detected']:
+                hands = hand_data.get('hands', [])
+                if hands and 'orientation' in hands[0]:
+                    orient = hands[0]['orientation']
+                    roll[i] = orient['roll']
+                    pitch[i] = orient['pitch']
+                    yaw[i] = orient['yaw']
+                    palm_normal[i] = orient['palm_normal']
+                    valid[i] = True
+                    num_valid += 1
+
+            # Container detections above the confidence threshold
+            object_data = frame['objects']
+            if not object_data.get('detected'):
                 continue
 
-            hands = frame['hands'].get('hands', [])
-            if not hands or 'orientation' not in hands[0]:
-                orientations.append(None)
-                continue
+            for obj in object_data.get('objects', []):
+                obj_class = obj['class']
+                if obj_class not in self.CONTAINER_CLASSES:
+                    continue
 
-            orient = hands[0]['orientation']
-            orientations.append({
-                'roll': orient['roll'],
-                'pitch': orient['pitch'],
-                'yaw': orient['yaw'],
-                'palm_normal': np.array(orient['palm_normal'])
-            })
+                # Default to 1.0 if confidence is not present
+                obj_conf = obj.get('confidence', 1.0)
+                if obj_conf >= self.MIN_CONTAINER_CONFIDENCE:
+                    frame_list, ts_list, bbox_list, conf_list = container_detections[obj_class]
+                    frame_list.append(i)
+                    ts_list.append(frame['timestamp'])
+                    bbox_list.append(obj['bbox'])
+                    conf_list.append(obj_conf)
 
-        return orientations
+        orientations = Orientations(roll, pitch, yaw, palm_normal, valid, num_valid)
+        return orientations, container_detections
 
     def _detect_rotation_actions(self, positions, velocities, speeds,
                                  openness, timestamps, orientations, frames):
@@ -123,46 +351,42 @@ class AdvancedActionDetector:
         """
         actions = []
 
-        if not any(orientations):
+        if orientations.num_valid == 0:
             print("⚠️  No orientation data available")
             return actions
 
-        # Compute rotation rates
-        roll_angles = []
-        pitch_angles = []
-        valid_indices = []
-
-        for i, orient in enumerate(orientations):
-            if orient:
-                roll_angles.append(orient['roll'])
-                pitch_angles.append(orient['pitch'])
-                valid_indices.append(i)
-
-        if len(roll_angles) < 10:
+        if orientations.num_valid < 10:
             return actions
 
-        roll_angles = np.array(roll_angles)
-        pitch_angles = np.array(pitch_angles)
+        # Compute rotation rates
+        valid_indices = np.flatnonzero(orientations.valid)
+        roll_angles = orientations.roll[valid_indices]
+        pitch_angles = orientations.pitch[valid_indices]
 
-        # Unwrap angles (handle -180/+180 wraparound)
-        roll_angles = np.unwrap(np.radians(roll_angles))
-        pitch_angles = np.unwrap(np.radians(pitch_angles))
+        valid_times = timestamps[valid_indices]
+        valid_positions = positions[valid_indices]
 
-        # Compute rotation rates
-        roll_rate = np.gradient(roll_angles, timestamps[valid_indices])
-        pitch_rate = np.gradient(pitch_angles, timestamps[valid_indices])
+        # Unwrap angles (handle -180/+180 wraparound); the masked arrays
+        # are already copies, so convert and unwrap them in place
+        _unwrap_inplace(np.radians(roll_angles, out=roll_angles))
+        _unwrap_inplace(np.radians(pitch_angles, out=pitch_angles))
+
+        # Compute rotation rates (the 1/dt factors are shared by roll and pitch)
+        inv_span = _inverse_spans(valid_times)
+        roll_rate = _angular_rate(roll_angles, inv_span)
+        pitch_rate = _angular_rate(pitch_angles, inv_span)
 
         # TWIST DETECTION: High roll rate while grasping AND stationary
         twist_actions = self._detect_twist(
             roll_angles, roll_rate, openness[valid_indices],
-            timestamps[valid_indices], positions[valid_indices], frames, valid_indices
+            valid_times, valid_positions, frames, valid_indices
         )
         actions.extend(twist_actions)
 
         # POUR DETECTION: Sustained pitch tilt
         pour_actions = self._detect_pour(
-            pitch_angles, pitch_rate, positions[valid_indices],
-            timestamps[valid_indices], frames, valid_indices
+            pitch_angles, pitch_rate, valid_positions,
+            valid_times, frames, valid_indices
         )
         actions.extend(pour_actions)
 
@@ -180,63 +404,56 @@ class AdvancedActionDetector:
         # Thresholds
         TWIST_RATE_THRESHOLD = 2.0  # radians/second
         MIN_TWIST_DURATION = 0.3  # seconds (increased from 0.2)
-        MIN_ROTATION = np.radians(40)  # At least 40 degrees (increased from 30)
+        MIN_ROTATION = MIN_TWIST_ROTATION_RAD
         MAX_HAND_MOVEMENT = 0.3  # Hand must stay relatively stationary (meters)
 
-        i = 0
-        while i < len(roll_rate) - 10:
-            # High rotation rate while hand closed
-            if abs(roll_rate[i]) > TWIST_RATE_THRESHOLD and openness[i] < 0.3:
-                start = i
-                start_angle = roll_angles[i]
-                start_pos = positions[i]
+        n = len(roll_rate)
+        abs_rate = np.abs(roll_rate)
 
-                # Track twist direction
-                direction = 'clockwise' if roll_rate[i] > 0 else 'counter-clockwise'
+        # High rotation rate while hand closed
+        starts = np.flatnonzero((abs_rate[:max(n - 10, 0)] > TWIST_RATE_THRESHOLD) &
+                                (openness[:max(n - 10, 0)] < 0.3))
 
-                # Follow the twist
-                j = i
-                while j < len(roll_rate) and abs(roll_rate[j]) > TWIST_RATE_THRESHOLD * 0.5:
-                    j += 1
+        # Follow the twist
+        run_ends = _run_ends(abs_rate > TWIST_RATE_THRESHOLD * 0.5)[starts]
+        ends = np.minimum(run_ends, n - 1)
+        durations = timestamps[ends] - timestamps[starts]
+        rotation_amounts = np.abs(roll_angles[ends] - roll_angles[starts])
 
-                end = min(j, len(roll_rate) - 1)
-                end_angle = roll_angles[end]
-                end_pos = positions[end]
-                duration = timestamps[end] - timestamps[start]
-                rotation_amount = abs(end_angle - start_angle)
-
-                # Check hand movement during rotation
-                hand_movement = np.linalg.norm(end_pos - start_pos)
-
-                # Only count as twist if hand stayed relatively stationary
-                if (duration > MIN_TWIST_DURATION and
-                    rotation_amount > MIN_ROTATION and
-                    hand_movement < MAX_HAND_MOVEMENT):
-                    # Determine if opening or closing based on context
-                    global_frame_idx = valid_indices[start]
-                    obj = self._get_object_near_hand(frames[global_frame_idx])
-
-                    # Heuristic: counter-clockwise = opening, clockwise = closing (for bottles)
-                    if direction == 'counter-clockwise':
-                        action_type = 'twist_open'
-                    else:
-                        action_type = 'twist_close'
+        # Check hand movement during rotation
+        hand_movements = np.linalg.norm(positions[ends] - positions[starts], axis=1)
 
-                    actions.append({
-                        'action': action_type,
-                        'object': obj if obj else 'unknown',
-                        'start_time': timestamps[start],
-                        'end_time': timestamps[end],
-                        'duration': duration,
-                        'rotation_degrees': float(np.degrees(rotation_amount)),
-                        'direction': direction,
-                        'confidence': 0.85
-                    })
+        # Only count as twist if hand stayed relatively stationary
+        accepted = ((durations > MIN_TWIST_DURATION) &
+                    (rotation_amounts > MIN_ROTATION) &
+                    (hand_movements < MAX_HAND_MOVEMENT))
 
-                    i = j
-                    continue
+        for k in _first_per_run(run_ends, accepted):
+            start, end = starts[k], ends[k]
+
+            # Track twist direction
+            direction = 'clockwise' if roll_rate[start] > 0 else 'counter-clockwise'
+
+            # Determine if opening or closing based on context
+            global_frame_idx = valid_indices[start]
+            obj = self._get_object_near_hand(frames[global_frame_idx])
 
-            i += 1
+            # Heuristic: counter-clockwise = opening, clockwise = closing (for bottles)
+            if direction == 'counter-clockwise':
+                action_type = 'twist_open'
+            else:
+                action_type = 'twist_close'
+
+            actions.append({
+                'action': action_type,
+                'object': obj if obj else 'unknown',
+                'start_time': timestamps[start],
+                'end_time': timestamps[end],
+                'duration': durations[k],
+                'rotation_degrees': float(np.degrees(rotation_amounts[k])),
+                'direction': direction,
+                'confidence': 0.85
+            })
 
         return actions
 
@@ -247,48 +464,43 @@ class AdvancedActionDetector:
         actions = []
 
         # Thresholds
-        POUR_PITCH_THRESHOLD = np.radians(30)  # At least 30 degrees tilt
+        POUR_PITCH_THRESHOLD = POUR_PITCH_THRESHOLD_RAD
         MIN_POUR_DURATION = 0.5  # At least 0.5 seconds
         MAX_MOTION_SPEED = 0.5  # Hand mostly stationary
 
-        i = 0
-        while i < len(pitch_angles) - 15:  # Need at least 15 frames
-            pitch = pitch_angles[i]
-
-            # Hand tilted significantly
-            if pitch < -POUR_PITCH_THRESHOLD:  # Negative = tilted down for pouring
-                start = i
-
-                # Check if sustained
-                j = i
-                while j < len(pitch_angles) and pitch_angles[j] < -POUR_PITCH_THRESHOLD * 0.7:
-                    j += 1
-
-                end = min(j, len(pitch_angles) - 1)
-                duration = timestamps[end] - timestamps[start]
-
-                # Check if hand is relatively stationary (pouring, not moving)
-                if end > start + 1:
-                    motion_during = np.linalg.norm(positions[end] - positions[start]) / duration
-
-                    if duration > MIN_POUR_DURATION and motion_during < MAX_MOTION_SPEED:
-                        global_frame_idx = valid_indices[start]
-                        source_obj = self._get_object_near_hand(frames[global_frame_idx])
-
-                        actions.append({
-                            'action': 'pour',
-                            'object': source_obj if source_obj else 'unknown',
-                            'start_time': timestamps[start],
-                            'end_time': timestamps[end],
-                            'duration': duration,
-                            'tilt_degrees': float(np.degrees(abs(pitch_angles[start]))),
-                            'confidence': 0.8
-                        })
-
-                        i = j
-                        continue
-
-            i += 1
+        n = len(pitch_angles)
+
+        # Hand tilted significantly (need at least 15 frames after the start)
+        # Negative = tilted down for pouring
+        starts = np.flatnonzero(pitch_angles[:max(n - 15, 0)] < -POUR_PITCH_THRESHOLD)
+
+        # Check if sustained
+        run_ends = _run_ends(pitch_angles < -POUR_PITCH_THRESHOLD * 0.7)[starts]
+        ends = np.minimum(run_ends, n - 1)
+        durations = timestamps[ends] - timestamps[starts]
+
+        # Check if hand is relatively stationary (pouring, not moving)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            motion_during = np.linalg.norm(positions[ends] - positions[starts], axis=1) / durations
+
+        accepted = ((ends > starts + 1) &
+                    (durations > MIN_POUR_DURATION) &
+                    (motion_during < MAX_MOTION_SPEED))
+
+        for k in _first_per_run(run_ends, accepted):
+            start, end = starts[k], ends[k]
+            global_frame_idx = valid_indices[start]
+            source_obj = self._get_object_near_hand(frames[global_frame_idx])
+
+            actions.append({
+                'action': 'pour',
+                'object': source_obj if source_obj else 'unknown',
+                'start_time': timestamps[start],
+                'end_time': timestamps[end],
+                'duration': durations[k],
+                'tilt_degrees': float(np.degrees(abs(pitch_angles[start]))),
+                'confidence': 0.8
+            })
 
         return actions
 
@@ -315,204 +527,120 @@ class AdvancedActionDetector:
     def _detect_linear_manipulation(self, positions, velocities, speeds, openness, timestamps):
         """
         Detect manipulation actions: lift, place, push, pull, slide
+
+        Every detector is evaluated for all frames at once; the scan below only
+        visits frames where one of them fires, in the original priority order.
         """
         actions = []
 
-        i = 0
-        while i < len(speeds) - 10:
-            # PUSH/PULL: Depth motion (Z-axis) with hand contact
-            # KEY: Use NET DISPLACEMENT to determine direction (velocity can be noisy)
-            z_vel = velocities[i, 2] if len(velocities[i]) > 2 else 0
-            y_vel = velocities[i, 1]
-
-            # Detect significant depth motion (forward OR backward)
-            if abs(z_vel) > 0.5 and abs(y_vel) < 0.5 and speeds[i] > 0.5:
-                start = i
-                j = i
-
-                # Track sustained motion period
-                while j < len(velocities) - 1 and j < start + 90:  # Look ahead up to 3 seconds
-                    z_check = velocities[j, 2] if len(velocities[j]) > 2 else 0
-
-                    # Stop if motion stops for too long
-                    if abs(z_check) < 0.2 and speeds[j] < 0.3:
-                        # Check if motion stopped for 30 frames
-                        stopped_count = 0
-                        for k in range(j, min(j+30, len(velocities))):
-                            if abs(velocities[k, 2]) < 0.2 and speeds[k] < 0.3:
-                                stopped_count += 1
-                        if stopped_count > 20:
-                            break
-
-                    j += 1
-
-                end = min(j, len(velocities) - 1)
-                duration = timestamps[end] - timestamps[start]
-
-                # KEY: Use NET DISPLACEMENT to determine if PUSH or PULL
-                # This works with boundary detection to get correct direction
-                net_z_displacement = positions[end, 2] - positions[start, 2]
-
-                if duration > 0.5 and abs(net_z_displacement) > 0.1:
-                    # Determine action by NET displacement (not velocity)
-                    if net_z_displacement < 0:
-                        # Negative Z = Forward = PUSH
-                        action_type = 'push'
-                    else:
-                        # Positive Z = Backward = PULL
-                        action_type = 'pull'
-
-                    actions.append({
-                        'action': action_type,
-                        'object': 'unknown',
-                        'start_time': timestamps[start],
-                        'end_time': timestamps[end],
-                        'duration': duration,
-                        'confidence': 0.75,
-                        'net_displacement': float(net_z_displacement)
-                    })
-                    i = j
-                    continue
-
-            # SLIDE: Lateral motion (X-velocity dominant) with minimal vertical change
-            x_vel = velocities[i, 0]
-
-            if abs(x_vel) > 0.4 and abs(y_vel) < 0.3 and abs(z_vel) < 0.4:  # Primarily sideways
-                start = i
-                j = i
-
-                # Track sustained lateral motion
-                while j < len(velocities) and abs(velocities[j, 0]) > 0.2:
-                    j += 1
-
-                end = min(j, len(velocities) - 1)
-                duration = timestamps[end] - timestamps[start]
-
-                if duration > 0.3 and end - start > 5:
-                    actions.append({
-                        'action': 'slide',
-                        'object': 'unknown',
-                        'start_time': timestamps[start],
-                        'end_time': timestamps[end],
-                        'duration': duration,
-                        'confidence': 0.7
-                    })
-                    i = j
-                    continue
-
-            # LIFT: Upward motion while hand closed
-            if velocities[i, 1] < -0.5 and openness[i] < 0.3 and speeds[i] > 0.5:
-                start = i
-                while i < len(velocities) and velocities[i, 1] < -0.3:
-                    i += 1
-                end = min(i, len(velocities) - 1)
-
-                if end - start > 5:
-                    actions.append({
-                        'action': 'lift',
-                        'object': 'unknown',
-                        'start_time': timestamps[start],
-                        'end_time': timestamps[end],
-                        'duration': timestamps[end] - timestamps[start],
-                        'confidence': 0.75
-                    })
-                    continue
+        n = len(speeds)
+        idx = np.arange(n)
+
+        # Velocity components as contiguous columns, resolved once up front
+        # (2D velocities get a zero Z column, as the per-frame len() check used to)
+        columns = np.ascontiguousarray(velocities.T)
+        if len(columns) < 3:
+            columns = np.vstack((columns[:2], np.zeros((1, n), dtype=columns.dtype)))
+        vy = columns[1]
+
+        # Magnitudes are shared by the push/pull, slide and place conditions
+        abs_vx, abs_vy, abs_vz = np.abs(columns[:3])
+
+        # PUSH/PULL: Depth motion (Z-axis) with hand contact
+        # KEY: Use NET DISPLACEMENT to determine direction (velocity can be noisy)
+        push_trigger = (abs_vz > 0.5) & (abs_vy < 0.5) & (speeds > 0.5)
+
+        # Track sustained motion period: stop at the first still frame that is
+        # followed by more than 20 still frames out of 30, looking ahead up to 3 seconds
+        stopped = (abs_vz < 0.2) & (speeds < 0.3)
+        stopped_total = np.concatenate(([0], np.cumsum(stopped)))
+        stopped_count = stopped_total[np.minimum(idx + 30, n)] - stopped_total[:n]
+        push_end = np.minimum(_run_ends(~(stopped & (stopped_count > 20))),
+                              np.minimum(idx + 90, n - 1))
+        push_duration = timestamps[push_end] - timestamps
+
+        # KEY: Use NET DISPLACEMENT to determine if PUSH or PULL
+        # This works with boundary detection to get correct direction
+        net_z_displacement = positions[push_end, 2] - positions[:, 2]
+        push_ok = push_trigger & (push_duration > 0.5) & (np.abs(net_z_displacement) > 0.1)
+
+        # SLIDE: Lateral motion (X-velocity dominant) with minimal vertical change
+        slide_trigger = (abs_vx > 0.4) & (abs_vy < 0.3) & (abs_vz < 0.4)
+        slide_run = _run_ends(abs_vx > 0.2)
+        slide_end = np.minimum(slide_run, n - 1)
+        slide_ok = slide_trigger & (timestamps[slide_end] - timestamps > 0.3) & (slide_end - idx > 5)
+
+        # LIFT: Upward motion while hand closed
+        lift_trigger = (vy < -0.5) & (openness < 0.3) & (speeds > 0.5)
+        lift_run = _run_ends(vy < -0.3)
+        lift_end = np.minimum(lift_run, n - 1)
+
+        # PLACE: Downward motion then hand opens (relaxed for gentle placement)
+        # IMPORTANT: Only trigger if NOT also pushing (to avoid false positives)
+        place_trigger = (vy > 0.3) & (openness < 0.5) & (abs_vz < 0.4)
+        place_run = _run_ends(vy > 0.15)  # Gentler downward motion
+        # Check for opening in the 10 frames after downward motion
+        # (forward-looking rolling maximum: open_max10[j] = max(openness[j:j+10]))
+        open_max10 = maximum_filter1d(openness, size=10, origin=-5, mode='nearest')
+        place_at = np.minimum(place_run, n - 1)
+        place_ok = (place_trigger &
+                    (place_run < n - 10) &  # Look further ahead
+                    (open_max10[place_at] - openness[place_at] > 0.05))  # Any opening detected
+
+        candidates = np.flatnonzero(push_ok | slide_ok | lift_trigger | place_ok)
+        codes, starts, ends = _walk_linear_candidates(
+            candidates, push_ok, push_end, net_z_displacement >= 0, slide_ok, slide_run,
+            slide_end, lift_trigger, lift_run, lift_end, place_ok, place_run, n
+        )
 
-            # PLACE: Downward motion then hand opens (relaxed for gentle placement)
-            # IMPORTANT: Only trigger if NOT also pushing (to avoid false positives)
-            if velocities[i, 1] > 0.3 and openness[i] < 0.5:  # Relaxed thresholds
-                # Check that Z-velocity is NOT strongly negative (not pushing)
-                z_vel_check = velocities[i, 2] if len(velocities[i]) > 2 else 0
-
-                if abs(z_vel_check) < 0.4:  # Not pushing forward
-                    start = i
-                    j = i
-                    while j < len(velocities) and velocities[j, 1] > 0.15:  # Gentler downward motion
-                        j += 1
-
-                    # Check if hand opens after downward motion
-                    if j < len(openness) - 10:  # Look further ahead
-                        # Check for opening in next 10 frames
-                        max_opening = max(openness[j:j+10]) if j+10 < len(openness) else max(openness[j:])
-                        if max_opening - openness[j] > 0.05:  # Any opening detected
-                            actions.append({
-                                'action': 'place',
-                                'object': 'unknown',
-                                'start_time': timestamps[start],
-                                'end_time': timestamps[min(j+10, len(timestamps)-1)],
-                                'duration': timestamps[min(j+10, len(timestamps)-1)] - timestamps[start],
-                                'confidence': 0.7
-                            })
-                            i = j + 10
-                            continue
-
-            i += 1
+        for code, start, end in zip(codes, starts, ends):
+            action = {
+                'action': LINEAR_ACTIONS[code],
+                'object': 'unknown',
+                'start_time': timestamps[start],
+                'end_time': timestamps[end],
+                'duration': timestamps[end] - timestamps[start],
+                'confidence': LINEAR_CONFIDENCES[code]
+            }
+            if code <= 1:
+                action['net_displacement'] = float(net_z_displacement[start])
+            actions.append(action)
 
         return actions
 
-    def _detect_containers(self, frames):
+    def _detect_containers(self, container_detections, total_frames):
         """
         Identify container objects with robust filtering
 
         Requirements to avoid false positives:
         1. Container must be visible in multiple consecutive frames
-        2. Minimum confidence threshold
+        2. Minimum confidence threshold (applied in _scan_frames)
         3. Minimum percentage of video duration
         """
         containers = []
-        MIN_CONTAINER_CONFIDENCE = 0.5  # YOLOv8 confidence threshold
         MIN_CONTAINER_FRAMES = 20  # Must appear in at least 20 frames (~0.67s)
         MIN_PERCENTAGE = 0.10  # Must be visible for at least 10% of video
 
-        # First pass: collect all container detections
-        container_detections = {}  # {container_type: [(frame_idx, timestamp, bbox)]}
-
-        for frame_idx, frame in enumerate(frames):
-            if not frame['objects'].get('detected'):
-                continue
-
-            objects = frame['objects'].get('objects', [])
-
-            for obj in objects:
-                obj_class = obj['class']
-                obj_conf = obj.get('confidence', 1.0)  # Default to 1.0 if not present
-
-                if obj_class in ['refrigerator', 'oven', 'microwave', 'door']:
-                    # Check confidence threshold
-                    if obj_conf >= MIN_CONTAINER_CONFIDENCE:
-                        if obj_class not in container_detections:
-                            container_detections[obj_class] = []
-
-                        container_detections[obj_class].append({
-                            'frame': frame_idx,
-                            'timestamp': frame['timestamp'],
-                            'bbox': obj['bbox'],
-                            'confidence': obj_conf
-                        })
-
-        # Second pass: filter out sporadic detections
-        total_frames = len(frames)
-
-        for container_type, detections in container_detections.items():
-            num_detections = len(detections)
+        # Filter out sporadic detections
+        for container_type, (frame_list, ts_list, bbox_list, _) in container_detections.items():
+            num_detections = len(frame_list)
             percentage = num_detections / total_frames
 
             # Check if container is significantly present
             if num_detections >= MIN_CONTAINER_FRAMES and percentage >= MIN_PERCENTAGE:
                 # Check for temporal continuity (not just sporadic detections)
-                frame_indices = [d['frame'] for d in detections]
-                frame_gaps = [frame_indices[i+1] - frame_indices[i] for i in range(len(frame_indices)-1)]
-                avg_gap = sum(frame_gaps) / len(frame_gaps) if frame_gaps else 0
+                frame_gaps = np.diff(np.fromiter(frame_list, dtype=np.int32, count=num_detections))
+                avg_gap = float(frame_gaps.mean()) if frame_gaps.size else 0.0
 
                 # If average gap is small (<10 frames), it's likely a real container
                 if avg_gap < 10:
                     # Add all detections for this valid container
-                    for det in detections:
+                    for frame_idx, bbox, timestamp in zip(frame_list, bbox_list, ts_list):
                         containers.append({
                             'type': container_type,
-                            'frame': det['frame'],
-                            'bbox': det['bbox'],
-                            'timestamp': det['timestamp']
+                            'frame': frame_idx,
+                            'bbox': bbox,
+                            'timestamp': timestamp
                         })
 
                     print(f"   ✅ Valid container: {container_type} ({num_detections} frames, {percentage*100:.1f}%, avg gap {avg_gap:.1f})")
@@ -538,8 +666,8 @@ class AdvancedActionDetector:
         start_time = min(container_times)
         end_time = max(container_times)
 
-        start_idx = np.argmin(np.abs(timestamps - start_time))
-        end_idx = np.argmin(np.abs(timestamps - end_time))
+        start_idx = _nearest_index(timestamps, start_time)
+        end_idx = _nearest_index(timestamps, end_time)
 
         z_vels = velocities[start_idx:end_idx+1, 2]
         period_speeds = speeds[start_idx:end_idx+1]
@@ -595,9 +723,13 @@ class AdvancedActionDetector:
         Strategy: Keep FIRST twist_open and LAST twist_close
         (Intermediate twists are likely grip adjustments, not actual open/close)
         """
-        twist_opens = [a for a in actions if a['action'] == 'twist_open']
-        twist_closes = [a for a in actions if a['action'] == 'twist_close']
-        other_actions = [a for a in actions if a['action'] not in ['twist_open', 'twist_close']]
+        # Single-pass partition (keeps the original order within each group)
+        twist_opens = []
+        twist_closes = []
+        other_actions = []
+        buckets = {'twist_open': twist_opens, 'twist_close': twist_closes}
+        for action in actions:
+            buckets.get(action['action'], other_actions).append(action)
 
         filtered = []
 
@@ -627,10 +759,14 @@ class AdvancedActionDetector:
 
         return filtered
 
-    def _merge_close_actions(self, actions):
+    def _merge_close_actions(self, actions, table=None):
         """
         Merge actions of same type that are close in time
         Handles slow/interrupted motions (twist bottle slowly, etc.)
+
+        Args:
+            actions: Actions sorted by start time
+            table: Matching ACTION_DTYPE rows (built from actions if omitted)
         """
         if not actions:
             return actions
@@ -645,37 +781,34 @@ class AdvancedActionDetector:
             'close': 5.0
         }
 
-        merged = []
-        i = 0
+        if table is None:
+            table = _action_table(actions)
 
-        while i < len(actions):
-            current = actions[i]
-            action_type = current['action']
-            merge_window = MERGE_WINDOWS.get(action_type, 3.0)
+        codes = table['action_code']
+        windows = np.array([MERGE_WINDOWS.get(name, 3.0) for name in ACTION_TYPES])[codes]
 
-            # Look ahead for similar actions to merge
-            j = i + 1
-            while j < len(actions):
-                next_action = actions[j]
+        # Each action joins the previous one when it has the same type and starts
+        # within that type's window of the previous end (chains extend the end)
+        linked = ((codes[1:] == codes[:-1]) &
+                  (table['start_time'][1:] - table['end_time'][:-1] < windows[:-1]))
+        heads = np.flatnonzero(np.concatenate(([True], ~linked)))
+        tails = np.append(heads[1:], len(actions)) - 1
 
-                same_type = current['action'] == next_action['action']
-                close_in_time = (next_action['start_time'] - current['end_time']) < merge_window
+        merged = []
+        for head, tail in zip(heads, tails):
+            current = actions[head]
 
-                if same_type and close_in_time:
-                    # Merge: extend current action to include next action
-                    current['end_time'] = next_action['end_time']
-                    current['duration'] = current['end_time'] - current['start_time']
+            if tail > head:
+                # Merge: extend current action to include the rest of the chain
+                current['end_time'] = actions[tail]['end_time']
+                current['duration'] = current['end_time'] - current['start_time']
 
-                    # For rotation actions, accumulate rotation
-                    if 'rotation_degrees' in current and 'rotation_degrees' in next_action:
+                # For rotation actions, accumulate rotation
+                if 'rotation_degrees' in current:
+                    for next_action in actions[head + 1:tail + 1]:
                         current['rotation_degrees'] += next_action['rotation_degrees']
 
-                    j += 1
-                else:
-                    break
-
             merged.append(current)
-            i = j
 
         return merged
 
@@ -745,11 +878,62 @@ class AdvancedActionDetector:
         return narrative
 
 
+def _detect_one(pair):
+    """
+    Run a fresh detector on one (metric_file, extraction_file) pair
+    """
+    metric_file, extraction_file = pair
+    return AdvancedActionDetector().detect_actions(metric_file, extraction_file)
+
+
+def detect_batch(pairs, n_jobs=None):
+    """
+    Detect actions for many (metric_file, extraction_file) pairs in parallel
+
+    Args:
+        pairs: List of (metric_file, extraction_file) tuples
+        n_jobs: Worker processes (default: CPU count)
+
+    Returns:
+        List of action lists, in the same order as pairs
+    """
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+        return list(pool.map(_detect_one, pairs))
+
+
+def _save_actions(actions, metric_file):
+    """
+    Save detected actions as <metric stem>_advanced_actions.json
+    """
+    output_file = Path(metric_file).stem + '_advanced_actions.json'
+    if orjson is not None:
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps({'actions': actions},
+                                 option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        with open(output_file, 'w') as f:
+            json.dump({'actions': actions}, f, indent=2)
+
+    print(f"\n💾 Saved to: {output_file}")
+
+
 def main():
     import sys
 
+    if len(sys.argv) >= 3 and sys.argv[1] == '--batch':
+        # One "<metric_3d.json> <extraction.json>" pair per line
+        with open(sys.argv[2], 'r') as f:
+            pairs = [tuple(line.split()[:2]) for line in f
+                     if line.strip() and not line.startswith('#')]
+
+        n_jobs = int(sys.argv[3]) if len(sys.argv) > 3 else None
+        for (metric_file, _), actions in zip(pairs, detect_batch(pairs, n_jobs)):
+            _save_actions(actions, metric_file)
+        return
+
     if len(sys.argv) < 3:
         print("Usage: python advanced_action_detection.py <metric_3d.json> <extraction_with_orientation.json>")
+        print("       python advanced_action_detection.py --batch <pairs.txt> [n_jobs]")
         return
 
     metric_file = sys.argv[1]
@@ -759,11 +943,7 @@ def main():
     actions = detector.detect_actions(metric_file, extraction_file)
 
     # Save results
-    output_file = Path(metric_file).stem + '_advanced_actions.json'
-    with open(output_file, 'w') as f:
-        json.dump({'actions': actions}, f, indent=2)
-
-    print(f"\n💾 Saved to: {output_file}")
+    _save_actions(actions, metric_file)
 
 
 if __name__ == "__main__":
@@ -3,49 +3,93 @@ Analyze why twist close was not detected in Video #7
 """
 import json
 import numpy as np
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _load_json(path):
+    """
+    Parse a JSON file (orjson when available)
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+EXTRACTION_FILE = 'test_video_07_full_extraction_with_colors_with_orientation.json'
+METRIC_FILE = 'test_video_07_metric_3d.json'
+
+# Window arrays from a previous run (reused while newer than both inputs)
+CACHE_FILE = Path('.cache_' + Path(EXTRACTION_FILE).stem + '.npz')
+
+
+def _extract_window():
+    """
+    Roll, time, position and openness arrays for the 9-12s window
+    """
+    extraction = _load_json(EXTRACTION_FILE)
+    metric = _load_json(METRIC_FILE)
+
+    # Extract roll angles in 9-12s window (expected twist close time),
+    # with position and openness from the matching metric timestep
+    rolls, times, positions, openness_vals = [], [], [], []
+    for frame, ts in zip(extraction['frames'], metric['timesteps']):
+        t = frame['timestamp']
+        if not 9.0 <= t <= 12.0:
+            continue
+
+        # Only frames whose first hand carries an orientation
+        hands = frame['hands']
+        if not (hands['detected'] and hands['hands']):
+            continue
+        hand = hands['hands'][0]
+        if 'orientation' not in hand:
+            continue
+
+        obs = ts['observations']
+        rolls.append(hand['orientation']['roll'])
+        times.append(t)
+        positions.append(obs['end_effector_pos_metric'])
+        openness_vals.append(obs['gripper_openness'])
+
+    return np.array(rolls), np.array(times), np.array(positions), np.array(openness_vals)
+
+
+def _load_window():
+    """
+    Window arrays from the cache when it is up to date, else from the JSON
+    """
+    newest_input = max(Path(EXTRACTION_FILE).stat().st_mtime, Path(METRIC_FILE).stat().st_mtime)
+    if CACHE_FILE.exists() and CACHE_FILE.stat().st_mtime >= newest_input:
+        with np.load(CACHE_FILE) as cached:
+            return cached['rolls'], cached['times'], cached['positions'], cached['openness']
+
+    rolls, times, positions, openness_vals = _extract_window()
+    np.savez(CACHE_FILE, rolls=rolls, times=times, positions=positions, openness=openness_vals)
+    return rolls, times, positions, openness_vals
+
 
 # Load data
-with open('test_video_07_full_extraction_with_colors_with_orientation.json', 'r') as f:
-    extraction = json.load(f)
-
-with open('test_video_07_metric_3d.json', 'r') as f:
-    metric = json.load(f)
-
-# Extract roll angles in 9-12s window (expected twist close time)
-rolls = []
-times = []
-positions = []
-openness_vals = []
-
-for i, frame in enumerate(extraction['frames']):
-    t = frame['timestamp']
-    if 9.0 <= t <= 12.0:
-        if frame['hands']['detected'] and frame['hands']['hands']:
-            if 'orientation' in frame['hands']['hands'][0]:
-                roll = frame['hands']['hands'][0]['orientation']['roll']
-                rolls.append(roll)
-                times.append(t)
-
-                # Get position and openness from metric data
-                pos = metric['timesteps'][i]['observations']['end_effector_pos_metric']
-                op = metric['timesteps'][i]['observations']['gripper_openness']
-                positions.append(pos)
-                openness_vals.append(op)
+rolls, times, positions, openness_vals = _load_window()
 
 if len(rolls) < 10:
     print("Insufficient data in 9-12s window")
     exit()
 
-rolls = np.array(rolls)
-times = np.array(times)
-positions = np.array(positions)
-openness_vals = np.array(openness_vals)
-
 # Unwrap angles
 rolls_rad = np.unwrap(np.radians(rolls))
 
-# Compute roll rate
-roll_rate = np.gradient(rolls_rad, times)
+# Compute roll rate (central differences, one-sided at the ends)
+roll_rate = np.empty_like(rolls_rad)
+roll_rate[1:-1] = (rolls_rad[2:] - rolls_rad[:-2]) / (times[2:] - times[:-2])
+roll_rate[0] = (rolls_rad[1] - rolls_rad[0]) / (times[1] - times[0])
+roll_rate[-1] = (rolls_rad[-1] - rolls_rad[-2]) / (times[-1] - times[-2])
 
 print("=" * 80)
 print("TWIST CLOSE DETECTION ANALYSIS (Video #7, 9-12s window)")
@@ -68,12 +112,16 @@ print(f"  Minimum rotation: {np.degrees(MIN_ROTATION):.1f}°")
 print(f"  Maximum hand movement: {MAX_HAND_MOVEMENT}m")
 print(f"  Hand must be closed: openness <0.3")
 
-max_rate = np.abs(roll_rate).max()
+abs_rate = np.abs(roll_rate)
+max_rate = abs_rate.max()
 print(f"\nActual measurements:")
 print(f"  Max rotation rate: {max_rate:.3f} rad/s = {np.degrees(max_rate):.1f}°/s")
 
-# Find periods with high rotation
-high_rate_indices = np.where(np.abs(roll_rate) > TWIST_RATE_THRESHOLD)[0]
+# Find periods with high rotation (the max already settles the slow case)
+if max_rate > TWIST_RATE_THRESHOLD:
+    high_rate_indices = np.flatnonzero(abs_rate > TWIST_RATE_THRESHOLD)
+else:
+    high_rate_indices = np.empty(0, dtype=np.intp)
 print(f"  Frames above rate threshold: {len(high_rate_indices)}/{len(rolls)}")
 
 if len(high_rate_indices) == 0:
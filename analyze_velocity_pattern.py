@@ -3,36 +3,96 @@ ANALYZE VELOCITY PATTERNS
 Debug tool to understand why duplicate actions are detected
 """
 
+import io
 import json
+import sys
 import numpy as np
-import matplotlib
-matplotlib.use('Agg')  # Non-interactive backend
-import matplotlib.pyplot as plt
+from contextlib import redirect_stdout
 
-def analyze_velocity(metric_file):
+# Points per plotted trace (the PNG is ~2000 px wide at 150 dpi)
+PLOT_POINTS = 2000
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _load_json(path):
     """
-    Plot velocity over time to see patterns
+    Parse a JSON file (orjson when available)
     """
-    print("📊 Analyzing velocity patterns...")
+    with open(path, 'rb') as f:
+        data = f.read()
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
 
-    with open(metric_file, 'r') as f:
-        data = json.load(f)
 
-    timesteps = data['timesteps']
+def _lttb(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling of (x, y) to n_out points
 
-    # Extract data
-    timestamps = [ts['timestamp'] for ts in timesteps]
-    velocities = np.array([ts['kinematics']['velocity'] for ts in timesteps])
-    speeds = np.array([ts['kinematics']['speed'] for ts in timesteps])
+    Keeps the first and last samples; from each bucket in between it picks
+    the point spanning the largest triangle with the previous pick and the
+    mean of the next bucket, so peaks and threshold crossings survive.
+    """
+    n = len(x)
+    if n_out < 3 or n <= n_out:
+        return x, y
 
-    # Z velocity (depth - pull/push)
-    z_vel = velocities[:, 2]
+    edges = np.append(np.linspace(1, n - 1, n_out - 1).astype(int), n)
+    picks = np.empty(n_out, dtype=np.intp)
+    picks[0] = 0
+    picks[-1] = n - 1
+
+    prev = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        next_x = x[hi:edges[b + 2]].mean()
+        next_y = y[hi:edges[b + 2]].mean()
+
+        area = np.abs((x[prev] - next_x) * (y[lo:hi] - y[prev]) -
+                      (x[prev] - x[lo:hi]) * (next_y - y[prev]))
+        prev = lo + int(np.argmax(area))
+        picks[b + 1] = prev
+
+    return x[picks], y[picks]
+
+
+def _spans(x, mask):
+    """
+    (start, width) in x of each run of True in mask, for broken_barh
+    """
+    edges = np.diff(mask.astype(np.int8), prepend=0, append=0)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1) - 1
+    return list(zip(x[starts], x[ends] - x[starts]))
+
+
+def _plot_velocity(timestamps, z_vel, speeds, open_trigger, close_trigger):
+    """
+    Save the velocity / speed / detection-zone figure to velocity_analysis.png
+
+    matplotlib is imported here so runs that never plot don't pay for it.
+    """
+    import matplotlib
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg  # Non-interactive backend
 
-    # Create plot
-    fig, axes = plt.subplots(3, 1, figsize=(15, 10))
+    # Merge nearly collinear segments when rendering long traces
+    matplotlib.rcParams['path.simplify'] = True
+    matplotlib.rcParams['path.simplify_threshold'] = 1.0
+    matplotlib.rcParams['figure.max_open_warning'] = 0
+
+    # Create plot directly on an Agg canvas (no pyplot figure manager)
+    fig = Figure(figsize=(15, 10))
+    FigureCanvasAgg(fig)
+    axes = fig.subplots(3, 1, sharex=True)
 
     # Plot 1: Z velocity over time
-    axes[0].plot(timestamps, z_vel, 'b-', linewidth=0.5)
+    # (traces are LTTB-downsampled for drawing; statistics use the full arrays)
+    axes[0].plot(*_lttb(timestamps, z_vel, PLOT_POINTS), 'b-', linewidth=0.5)
     axes[0].axhline(y=-0.5, color='r', linestyle='--', label='OPEN threshold (-0.5)')
     axes[0].axhline(y=0.5, color='g', linestyle='--', label='CLOSE threshold (+0.5)')
     axes[0].axhline(y=0, color='k', linestyle='-', alpha=0.3)
@@ -42,7 +102,7 @@ def analyze_velocity(metric_file):
     axes[0].grid(True, alpha=0.3)
 
     # Plot 2: Speed over time
-    axes[1].plot(timestamps, speeds, 'purple', linewidth=0.5)
+    axes[1].plot(*_lttb(timestamps, speeds, PLOT_POINTS), 'purple', linewidth=0.5)
     axes[1].axhline(y=1.0, color='r', linestyle='--', label='OPEN speed threshold')
     axes[1].axhline(y=0.8, color='g', linestyle='--', label='CLOSE speed threshold')
     axes[1].set_ylabel('Speed (magnitude)')
@@ -50,13 +110,11 @@ def analyze_velocity(metric_file):
     axes[1].legend()
     axes[1].grid(True, alpha=0.3)
 
-    # Plot 3: Detection zones
-    axes[2].fill_between(timestamps, 0, 1,
-                         where=(z_vel < -0.5) & (speeds > 1.0),
-                         color='red', alpha=0.3, label='OPEN detected')
-    axes[2].fill_between(timestamps, 0, 1,
-                         where=(z_vel > 0.5) & (speeds > 0.8),
-                         color='green', alpha=0.3, label='CLOSE detected')
+    # Plot 3: Detection zones (one rectangle per triggered region)
+    axes[2].broken_barh(_spans(timestamps, open_trigger), (0, 1),
+                        color='red', alpha=0.3, label='OPEN detected')
+    axes[2].broken_barh(_spans(timestamps, close_trigger), (0, 1),
+                        color='green', alpha=0.3, label='CLOSE detected')
     axes[2].set_ylabel('Detection')
     axes[2].set_xlabel('Time (seconds)')
     axes[2].set_title('Action Detection Zones')
@@ -64,36 +122,69 @@ def analyze_velocity(metric_file):
     axes[2].set_ylim(0, 1)
     axes[2].grid(True, alpha=0.3)
 
-    plt.tight_layout()
-    plt.savefig('velocity_analysis.png', dpi=150)
+    fig.tight_layout()
+    fig.savefig('velocity_analysis.png', dpi=150)
+    fig.clear()  # Release artists right away
     print("✅ Saved: velocity_analysis.png")
 
-    # Print statistics
-    print(f"\n📈 STATISTICS:")
-    print(f"   Frames with Z-vel < -0.5 (OPEN trigger): {np.sum(z_vel < -0.5)}")
-    print(f"   Frames with Z-vel > +0.5 (CLOSE trigger): {np.sum(z_vel > 0.5)}")
-    print(f"   Frames with high speed (>1.0): {np.sum(speeds > 1.0)}")
 
-    # Count how many separate regions trigger OPEN
-    open_trigger = (z_vel < -0.5) & (speeds > 1.0)
-    transitions = np.diff(open_trigger.astype(int))
-    num_open_regions = np.sum(transitions == 1)
+def analyze_velocity(metric_file, plot=True):
+    """
+    Plot velocity over time to see patterns
+
+    Args:
+        metric_file: Path to metric_3d.json
+        plot: Save velocity_analysis.png (False prints statistics only)
+    """
+    print("📊 Analyzing velocity patterns...")
+
+    data = _load_json(metric_file)
+
+    timesteps = data['timesteps']
+
+    # Extract data
+    timestamps = np.array([ts['timestamp'] for ts in timesteps])
+    velocities = np.array([ts['kinematics']['velocity'] for ts in timesteps])
+    speeds = np.array([ts['kinematics']['speed'] for ts in timesteps])
+
+    # Z velocity (depth - pull/push)
+    z_vel = velocities[:, 2]
 
+    # Detection triggers (shared by the zone plot and the region counts)
+    open_trigger = (z_vel < -0.5) & (speeds > 1.0)
     close_trigger = (z_vel > 0.5) & (speeds > 0.8)
-    transitions = np.diff(close_trigger.astype(int))
-    num_close_regions = np.sum(transitions == 1)
 
-    print(f"\n🎯 DETECTION REGIONS:")
-    print(f"   Separate OPEN regions: {num_open_regions}")
-    print(f"   Separate CLOSE regions: {num_close_regions}")
-    print(f"\n💡 If you only opened once and closed once,")
-    print(f"   but we detect {num_open_regions} open regions and {num_close_regions} close regions,")
-    print(f"   then hand motion INSIDE fridge is triggering false detections!")
+    if plot:
+        _plot_velocity(timestamps, z_vel, speeds, open_trigger, close_trigger)
+
+    # Print statistics (buffered and written out in one call)
+    out = io.StringIO()
+    with redirect_stdout(out):
+        print(f"\n📈 STATISTICS:")
+        print(f"   Frames with Z-vel < -0.5 (OPEN trigger): {np.sum(z_vel < -0.5)}")
+        print(f"   Frames with Z-vel > +0.5 (CLOSE trigger): {np.sum(z_vel > 0.5)}")
+        print(f"   Frames with high speed (>1.0): {np.sum(speeds > 1.0)}")
+
+        # Count how many separate regions trigger OPEN/CLOSE (rising edges)
+        num_open_regions = int(np.count_nonzero(open_trigger[1:] & ~open_trigger[:-1]))
+        num_close_regions = int(np.count_nonzero(close_trigger[1:] & ~close_trigger[:-1]))
+
+        print(f"\n🎯 DETECTION REGIONS:")
+        print(f"   Separate OPEN regions: {num_open_regions}")
+        print(f"   Separate CLOSE regions: {num_close_regions}")
+        print(f"\n💡 If you only opened once and closed once,")
+        print(f"   but we detect {num_open_regions} open regions and {num_close_regions} close regions,")
+        print(f"   then hand motion INSIDE fridge is triggering false detections!")
+    sys.stdout.write(out.getvalue())
+
 
 if __name__ == "__main__":
-    import sys
-    if len(sys.argv) < 2:
-        print("Usage: python analyze_velocity_pattern.py <metric_3d.json>")
-        sys.exit(1)
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Analyze velocity patterns behind action detections')
+    parser.add_argument('metric_file', help='metric_3d.json to analyze')
+    parser.add_argument('--no-plot', action='store_true', help='Print statistics only (skip velocity_analysis.png)')
+
+    args = parser.parse_args()
 
-    analyze_velocity(sys.argv[1])
+    analyze_velocity(args.metric_file, plot=not args.no_plot)
@@ -5,10 +5,88 @@ Tell the user exactly what they did in the video based on extracted data
 This validates the pipeline by describing actions without seeing the video
 """
 
+import io
 import json
+import sys
 import numpy as np
+from collections import Counter
+from contextlib import redirect_stdout
+from functools import partial
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _load_json(path):
+    """
+    Parse a JSON file (orjson when available)
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _path_length(positions):
+    """
+    Total distance travelled along a (N, 3) trajectory
+    """
+    steps = np.diff(positions, axis=0)
+    return np.sqrt(np.einsum('ij,ij->i', steps, steps)).sum()
+
+
+def _nearest_indices(t, values):
+    """
+    Indices of the samples in sorted t closest to each value (earlier one on
+    ties, as argmin would pick)
+    """
+    idx = np.searchsorted(t, values)
+    prev = np.maximum(idx - 1, 0)
+    nxt = np.minimum(idx, len(t) - 1)
+    take_prev = (idx == len(t)) | ((idx > 0) & (values - t[prev] <= t[nxt] - values))
+    # First of any repeated timestamps
+    return np.where(take_prev, np.searchsorted(t, t[prev]), idx)
+
+
+def _phase_bounds(speeds, high, low):
+    """
+    (starts, ends) of action phases: a phase starts at the first frame above
+    `high` in a run of frames above `low` and ends where that run ends
+    """
+    n = len(speeds)
+    breaks = np.flatnonzero(speeds <= low)
+    above_high = np.flatnonzero(speeds > high)
+    run_ends = np.append(breaks, n)[np.searchsorted(breaks, above_high)]
+
+    first_in_run = np.ones(len(above_high), dtype=bool)
+    first_in_run[1:] = run_ends[1:] != run_ends[:-1]
+    return above_high[first_in_run], np.minimum(run_ends[first_in_run], n - 1)  # Clamp to valid index
+
+
+def _burst_bounds(speeds, threshold):
+    """
+    (starts, ends) of bursts above threshold lasting more than 10 frames
+
+    A burst ends at the first frame back at or below the threshold; one still
+    open at the end of the video is dropped.
+    """
+    above = (speeds > threshold).astype(np.int8)
+    edges = np.diff(above)
+
+    starts = np.flatnonzero(edges == 1) + 1
+    if above[:1].any():
+        starts = np.concatenate(([0], starts))
+    ends = np.flatnonzero(edges == -1) + 1
+    starts = starts[:len(ends)]
+
+    keep = ends - starts > 10  # At least 10 frames
+    return starts[keep], ends[keep]
+
+
 class VideoActivityAnalyzer:
     """
     Analyze extracted data to describe what happened in the video
@@ -20,18 +98,29 @@ class VideoActivityAnalyzer:
     def analyze(self, metric_file, extraction_file):
         """
         Analyze all data to describe the video activity
+
+        The report is collected in memory and written to stdout in one call.
+        """
+        out = io.StringIO()
+        try:
+            with redirect_stdout(out):
+                self._analyze(metric_file, extraction_file)
+        finally:
+            sys.stdout.write(out.getvalue())
+
+    def _analyze(self, metric_file, extraction_file):
+        """
+        Print the full activity report
         """
         print(f"{'='*70}")
         print(f"ANALYZING YOUR VIDEO ACTIVITY")
         print(f"{'='*70}\n")
 
         # Load metric data
-        with open(metric_file, 'r') as f:
-            metric_data = json.load(f)
+        metric_data = _load_json(metric_file)
 
         # Load full extraction for object data
-        with open(extraction_file, 'r') as f:
-            extraction_data = json.load(f)
+        extraction_data = _load_json(extraction_file)
 
         timesteps = metric_data['timesteps']
         frames = extraction_data['frames']
@@ -43,12 +132,24 @@ class VideoActivityAnalyzer:
         print(f"   Resolution: {metadata['width']}x{metadata['height']}")
         print(f"   Orientation: Portrait (phone video)\n")
 
-        # Extract data arrays
-        positions = np.array([ts['observations']['end_effector_pos_metric'] for ts in timesteps])
-        speeds = np.array([ts['kinematics']['speed'] for ts in timesteps])
-        gripper_openness = np.array([ts['observations']['gripper_openness'] for ts in timesteps])
-        gripper_commands = np.array([ts['actions']['gripper_command'] for ts in timesteps])
-        timestamps = np.array([ts['timestamp'] for ts in timesteps])
+        # Extract data arrays in one pass over the timesteps
+        n = len(timesteps)
+        positions = np.empty((n, 3), dtype=np.float32)
+        speeds = np.empty(n, dtype=np.float32)
+        gripper_openness = np.empty(n, dtype=np.float32)
+        gripper_commands = np.empty(n, dtype=np.int8)
+        timestamps = np.empty(n)
+
+        for i, ts in enumerate(timesteps):
+            obs = ts['observations']
+            positions[i] = obs['end_effector_pos_metric']
+            speeds[i] = ts['kinematics']['speed']
+            gripper_openness[i] = obs['gripper_openness']
+            gripper_commands[i] = ts['actions']['gripper_command']
+            timestamps[i] = ts['timestamp']
+
+        # Time -> closest frame index lookup shared by the report sections
+        frame_index = partial(_nearest_indices, timestamps)
 
         # Analyze scene
         print(f"🏠 SCENE ANALYSIS:")
@@ -56,7 +157,8 @@ class VideoActivityAnalyzer:
 
         # Analyze hand activity
         print(f"\n✋ HAND ACTIVITY ANALYSIS:")
-        self._analyze_hand_activity(positions, speeds, timestamps)
+        total_distance = _path_length(positions)
+        self._analyze_hand_activity(positions, speeds, timestamps, total_distance)
 
         # Analyze gripper behavior
         print(f"\n🤏 GRIPPER BEHAVIOR:")
@@ -72,30 +174,28 @@ class VideoActivityAnalyzer:
 
         # Timeline summary
         print(f"\n⏱️  TIMELINE SUMMARY:")
-        self._create_timeline(positions, speeds, gripper_openness, gripper_commands, timestamps)
+        self._create_timeline(positions, speeds, gripper_openness, gripper_commands, timestamps, frame_index)
 
         # Final description
         print(f"\n{'='*70}")
         print(f"WHAT YOU DID IN THIS VIDEO (My Best Interpretation)")
         print(f"{'='*70}\n")
-        self._generate_description(positions, speeds, gripper_openness, gripper_commands, timestamps, frames)
+        self._generate_description(positions, speeds, gripper_openness, gripper_commands, timestamps, frames,
+                                   total_distance)
 
     def _analyze_scene(self, frames):
         """
         Analyze the scene and objects
         """
         # Collect all detected objects
-        all_objects = {}
+        all_objects = Counter()
         for frame in frames:
-            if frame['objects'].get('detected') and 'objects' in frame['objects']:
-                for obj in frame['objects']['objects']:
-                    obj_class = obj['class']
-                    if obj_class not in all_objects:
-                        all_objects[obj_class] = 0
-                    all_objects[obj_class] += 1
+            objects = frame['objects']
+            if objects.get('detected'):
+                all_objects.update(obj['class'] for obj in objects.get('objects', ()))
 
         # Sort by frequency
-        objects_sorted = sorted(all_objects.items(), key=lambda x: x[1], reverse=True)
+        objects_sorted = all_objects.most_common()
 
         print(f"   Objects detected in scene:")
         for obj_name, count in objects_sorted:
@@ -108,13 +208,11 @@ class VideoActivityAnalyzer:
         if 'cup' in all_objects:
             print(f"   Task-relevant object: Cup detected (possible manipulation target)")
 
-    def _analyze_hand_activity(self, positions, speeds, timestamps):
+    def _analyze_hand_activity(self, positions, speeds, timestamps, total_distance):
         """
         Analyze hand movement patterns
         """
         # Movement statistics
-        total_distance = np.sum(np.linalg.norm(np.diff(positions, axis=0), axis=1))
-
         print(f"   Total hand travel distance: {total_distance:.2f} units")
         print(f"   Average speed: {speeds.mean():.3f} units/s")
         print(f"   Maximum speed: {speeds.max():.3f} units/s")
@@ -199,34 +297,27 @@ class VideoActivityAnalyzer:
         phases = []
 
         # Simple heuristic-based phase detection
-        i = 0
-        while i < len(speeds):
-            # High-speed movement = reaching/moving
-            if speeds[i] > speeds.mean() + speeds.std():
-                start = i
-                while i < len(speeds) and speeds[i] > speeds.mean():
-                    i += 1
-                end = min(i, len(speeds) - 1)  # Clamp to valid index
-
-                # Check if hand closed during this phase
-                openness_change = openness[end] - openness[start] if end > start else 0
-
-                if openness_change < -0.1:
-                    phase_type = "Reach and grasp"
-                elif openness_change > 0.1:
-                    phase_type = "Release and retract"
-                else:
-                    phase_type = "Quick movement"
+        mean_speed = speeds.mean()
+        starts, ends = _phase_bounds(speeds, mean_speed + speeds.std(), mean_speed)
 
-                duration = timestamps[end] - timestamps[start]
-                phases.append({
-                    'type': phase_type,
-                    'start': timestamps[start],
-                    'end': timestamps[end],
-                    'duration': duration
-                })
+        # Check if hand closed during each phase
+        openness_changes = np.where(ends > starts, openness[ends] - openness[starts], 0)
+        durations = timestamps[ends] - timestamps[starts]
+
+        for start, end, openness_change, duration in zip(starts, ends, openness_changes, durations):
+            if openness_change < -0.1:
+                phase_type = "Reach and grasp"
+            elif openness_change > 0.1:
+                phase_type = "Release and retract"
+            else:
+                phase_type = "Quick movement"
 
-            i += 1
+            phases.append({
+                'type': phase_type,
+                'start': timestamps[start],
+                'end': timestamps[end],
+                'duration': duration
+            })
 
         # Print detected phases
         if phases:
@@ -236,16 +327,20 @@ class VideoActivityAnalyzer:
         else:
             print(f"   Slow, continuous movement (no distinct action phases)")
 
-    def _create_timeline(self, positions, speeds, openness, commands, timestamps):
+    def _create_timeline(self, positions, speeds, openness, commands, timestamps, frame_index):
         """
         Create a second-by-second timeline
+
+        Args:
+            frame_index: Maps an array of times to their closest frame indices
         """
         duration = int(timestamps[-1]) + 1
 
-        for t in range(0, min(duration, 10), 2):  # Show every 2 seconds, max 10s
-            # Find frame closest to this time
-            idx = np.argmin(np.abs(timestamps - t))
+        # Show every 2 seconds, max 10s, at the frame closest to each time
+        targets = np.arange(0, min(duration, 10), 2)
+        indices = frame_index(targets)
 
+        for t, idx in zip(targets, indices):
             pos = positions[idx]
             speed = speeds[idx]
             hand_open = openness[idx]
@@ -257,12 +352,12 @@ class VideoActivityAnalyzer:
             print(f"   t={t:02d}s: Hand at ({pos[0]:.1f}, {pos[1]:.1f}, {pos[2]:.1f}), "
                   f"Speed: {speed_str}, Gripper: {hand_open:.2f} ({cmd_str})")
 
-    def _generate_description(self, positions, speeds, openness, commands, timestamps, frames):
+    def _generate_description(self, positions, speeds, openness, commands, timestamps, frames,
+                              total_distance):
         """
         Generate natural language description of the video
         """
         # Collect evidence
-        total_distance = np.sum(np.linalg.norm(np.diff(positions, axis=0), axis=1))
         mean_speed = speeds.mean()
         hand_state = "mostly closed" if openness.mean() < 0.3 else "mostly open" if openness.mean() > 0.7 else "partially open"
 
@@ -337,41 +432,23 @@ class VideoActivityAnalyzer:
 
     def _detect_bursts(self, speeds, threshold):
         """Detect bursts of high-speed movement"""
-        bursts = []
-        in_burst = False
-        start = 0
-
-        for i, speed in enumerate(speeds):
-            if not in_burst and speed > threshold:
-                in_burst = True
-                start = i
-            elif in_burst and speed <= threshold:
-                in_burst = False
-                if i - start > 10:  # At least 10 frames
-                    bursts.append((start, i))
-
-        return bursts
+        starts, ends = _burst_bounds(speeds, threshold)
+        return list(zip(starts, ends))
 
     def _detect_grasp_events(self, openness, commands, timestamps):
         """Detect grasp/release events"""
-        events = []
-
         # Look for significant openness changes
-        for i in range(1, len(openness)):
-            change = openness[i] - openness[i-1]
-            if abs(change) > 0.05:  # Significant change
-                events.append({
-                    'time': timestamps[i],
-                    'type': 'close' if change < 0 else 'open',
-                    'magnitude': abs(change)
-                })
+        changes = np.diff(openness)
+        significant = np.flatnonzero(np.abs(changes) > 0.05)
 
-        return events
+        return [{
+            'time': timestamps[i + 1],
+            'type': 'close' if changes[i] < 0 else 'open',
+            'magnitude': abs(changes[i])
+        } for i in significant]
 
 
 def main():
-    import sys
-
     if len(sys.argv) < 3:
         print("Usage: python analyze_video_activity.py <metric_3d.json> <full_extraction.json>")
         print("\nExample:")
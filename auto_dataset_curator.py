@@ -13,20 +13,118 @@ Workflow:
 6. Export to HDF5 dataset
 """
 
+import asyncio
 import json
+import os
+import sys
+import threading
+from collections import Counter
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError, as_completed
 from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+import numpy as np
 from youtube_downloader import YouTubeDownloader
 from video_quality_scorer import VideoQualityScorer
-import subprocess
 import time
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _load_json(path):
+    """Read a JSON file, with orjson when available"""
+    with open(path, 'rb') as f:
+        return orjson.loads(f.read()) if orjson is not None else json.load(f)
+
+
+def _save_json(path, data, indent=False):
+    """Write a JSON file, with orjson when available"""
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if indent else 0)
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=option))
+    else:
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2 if indent else None)
+
+
+def _load_jsonl(path):
+    """Read the records of a JSON Lines file, with orjson when available"""
+    loads = orjson.loads if orjson is not None else json.loads
+    with open(path, 'rb') as f:
+        return [loads(line) for line in f if line.strip()]
+
+
+def _append_jsonl(path, records):
+    """Append records to a JSON Lines file, with orjson when available"""
+    with open(path, 'ab') as f:
+        for record in records:
+            if orjson is not None:
+                f.write(orjson.dumps(record, option=orjson.OPT_SERIALIZE_NUMPY) + b'\n')
+            else:
+                f.write(json.dumps(record).encode() + b'\n')
+
+
+def _video_id(video_path):
+    """
+    YouTube ID of a downloaded video, read from the metadata saved next to it
+
+    Falls back to the file name when there is no metadata.
+    """
+    metadata_path = Path(video_path).with_suffix('.json')
+    if metadata_path.exists():
+        with open(metadata_path, 'r') as f:
+            url = json.load(f).get('url') or ''
+        video_ids = parse_qs(urlparse(url).query).get('v')
+        if video_ids:
+            return video_ids[0]
+        if url:
+            return url
+    return Path(video_path).name
+
+
+def _run_into_future(future, fn, *args):
+    """
+    Run fn(*args) and store its result or exception on future
+    """
+    try:
+        future.set_result(fn(*args))
+    except Exception as e:
+        future.set_exception(e)
+
+
+def _init_score_worker(n_threads):
+    """
+    Limit a scoring worker's OpenCV threads to its share of the CPU cores
+
+    Without this every worker sizes OpenCV's thread pool for the whole
+    machine and the workers thrash each other.
+    """
+    import cv2
+
+    cv2.setNumThreads(n_threads)
+
+
+def _score_one(video_path, quality_threshold):
+    """
+    Score one video with a fresh scorer (runs in a worker process)
+
+    Stages that can no longer lift the score to quality_threshold are skipped.
+    """
+    return video_path, VideoQualityScorer().score_video_staged(
+        video_path, early_reject_threshold=quality_threshold)
+
 
 class AutoDatasetCurator:
     """
     Automatically curate high-quality robot training dataset from YouTube
     """
 
-    def __init__(self, output_dir='curated_dataset', quality_threshold=70.0):
+    def __init__(self, output_dir='curated_dataset', quality_threshold=70.0, n_jobs=None,
+                 download_workers=4, target_accept_rate=None, threshold_step=5.0,
+                 in_process=False):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
 
@@ -37,18 +135,62 @@ class AutoDatasetCurator:
         self.data_dir.mkdir(exist_ok=True)
 
         self.quality_threshold = quality_threshold
-
-        self.downloader = YouTubeDownloader(output_dir=str(self.videos_dir))
-        self.scorer = VideoQualityScorer()
-
-        self.results_file = self.output_dir / 'curation_results.json'
+        self.n_jobs = n_jobs  # Scoring worker processes (None = CPU count)
+
+        # Adaptive threshold: nudge it after each batch toward target_accept_rate
+        # (None keeps the threshold fixed)
+        self.target_accept_rate = target_accept_rate
+        self.threshold_step = threshold_step
+
+        # Run the pipeline inside this process (one video at a time) instead of
+        # on unified_pipeline.py worker processes
+        self.in_process = in_process
+        self._pipeline = None  # Created on first use
+
+        # Worker command line, run with this interpreter rather than whatever
+        # 'python' is first on PATH
+        self._worker_cmd = [sys.executable, 'unified_pipeline.py', '--server',
+                            '--enable-vision', '--output-dir', str(self.data_dir)]
+
+        self.downloader = YouTubeDownloader(output_dir=str(self.videos_dir), max_workers=download_workers)
+
+        # Small summary (counters, queries) rewritten on save; per-video scores
+        # are appended to a JSONL log so a save only writes the new ones
+        self.results_file = self.output_dir / 'curation_summary.json'
+        self.scores_log_file = self.output_dir / 'curation_results.jsonl'
+        self.legacy_results_file = self.output_dir / 'curation_results.json'
         self.load_results()
 
+        # Resume an adaptive run from its last threshold and step (this
+        # replaces the quality_threshold passed in)
+        history = self.results.get('quality_threshold_history')
+        if target_accept_rate is not None and history:
+            self.quality_threshold = history[-1]['threshold']
+            self.threshold_step = history[-1]['step']
+            print(f"🎚️  Resuming adaptive threshold at {self.quality_threshold:.1f}/100 "
+                  f"(saved in {self.results_file}; given threshold {quality_threshold:.1f} ignored)")
+
     def load_results(self):
         """Load previous curation results"""
+        self._unsaved_scores = []  # Score records not yet appended to the log
+
         if self.results_file.exists():
-            with open(self.results_file, 'r') as f:
-                self.results = json.load(f)
+            self.results = _load_json(self.results_file)
+            self.results['quality_scores'] = []
+            self.results['curated_videos'] = []
+
+            if self.scores_log_file.exists():
+                for record in _load_jsonl(self.scores_log_file):
+                    accepted = record.pop('accepted')
+                    self.results['quality_scores'].append(record)
+                    if accepted:
+                        self.results['curated_videos'].append(record)
+        elif self.legacy_results_file.exists():
+            # Single-file results from older runs: carry the scores over to the log
+            self.results = _load_json(self.legacy_results_file)
+            curated = {(v['video'], v['query']) for v in self.results['curated_videos']}
+            self._unsaved_scores = [dict(s, accepted=(s['video'], s['query']) in curated)
+                                    for s in self.results['quality_scores']]
         else:
             self.results = {
                 'search_queries': [],
@@ -60,6 +202,16 @@ class AutoDatasetCurator:
                 'curated_videos': []
             }
 
+        # Set view of search_queries for constant-time membership checks
+        self._query_set = set(self.results['search_queries'])
+
+        # YouTube IDs of every video already analyzed, so repeats aren't
+        # rescored; rebuilt from the score log (seen_video_ids is only in
+        # summaries from older runs and no longer grows)
+        self._seen_ids = set(self.results.get('seen_video_ids', []))
+        self._seen_ids.update(record['video_id'] for record in self.results['quality_scores']
+                              if 'video_id' in record)
+
     def save_results(self):
         """Save curation results"""
         # Update statistics
@@ -68,10 +220,16 @@ class AutoDatasetCurator:
             if self.results['videos_analyzed'] > 0 else 0.0
         )
 
-        with open(self.results_file, 'w') as f:
-            json.dump(self.results, f, indent=2)
+        # Append only the scores recorded since the last save
+        if self._unsaved_scores:
+            _append_jsonl(self.scores_log_file, self._unsaved_scores)
+            self._unsaved_scores = []
 
-    def curate_from_search(self, search_query, max_videos=10, max_duration=30):
+        summary = {key: value for key, value in self.results.items()
+                   if key not in ('quality_scores', 'curated_videos')}
+        _save_json(self.results_file, summary, indent=True)
+
+    def curate_from_search(self, search_query, max_videos=10, max_duration=30, min_height=None):
         """
         Search YouTube, download, and curate videos
 
@@ -79,6 +237,7 @@ class AutoDatasetCurator:
             search_query: YouTube search query
             max_videos: Maximum videos to download
             max_duration: Maximum video duration (seconds)
+            min_height: Skip videos below this height before downloading (optional)
 
         Returns:
             List of accepted high-quality videos
@@ -92,7 +251,8 @@ class AutoDatasetCurator:
         print()
 
         # Record search query
-        if search_query not in self.results['search_queries']:
+        if search_query not in self._query_set:
+            self._query_set.add(search_query)
             self.results['search_queries'].append(search_query)
 
         # Search and download videos
@@ -102,7 +262,8 @@ class AutoDatasetCurator:
         downloaded_videos = self.downloader.search_and_download(
             search_query,
             max_results=max_videos,
-            max_duration=max_duration
+            max_duration=max_duration,
+            min_height=min_height
         )
 
         if not downloaded_videos:
@@ -110,8 +271,25 @@ class AutoDatasetCurator:
             return []
 
         print(f"✅ Downloaded {len(downloaded_videos)} candidate videos")
+
+        # Drop videos already analyzed under this or an earlier query
+        new_videos = []
+        video_ids = {}
+        for video_path in downloaded_videos:
+            video_id = _video_id(video_path)
+            if video_id not in self._seen_ids:
+                self._seen_ids.add(video_id)
+                video_ids[video_path] = video_id
+                new_videos.append(video_path)
+        if len(new_videos) < len(downloaded_videos):
+            print(f"⏭️  Skipping {len(downloaded_videos) - len(new_videos)} already analyzed videos")
+        downloaded_videos = new_videos
         print()
 
+        if not downloaded_videos:
+            print("⚠️  No new videos to analyze")
+            return []
+
         # Quality scoring
         print("🔍 STAGE 2: QUALITY ANALYSIS")
         print("-"*70)
@@ -119,19 +297,34 @@ class AutoDatasetCurator:
         accepted_videos = []
         rejected_videos = []
 
-        for video_path in downloaded_videos:
+        # Score videos in parallel; accept/reject bookkeeping stays in this process
+        scored = []
+        cpus = os.cpu_count() or 1
+        n_workers = min(self.n_jobs or cpus, len(downloaded_videos))
+        n_threads = max(1, cpus // n_workers)
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_score_worker,
+                                 initargs=(n_threads,)) as pool:
+            futures = [pool.submit(_score_one, video_path, self.quality_threshold)
+                       for video_path in downloaded_videos]
+            for future in as_completed(futures):
+                scored.append(future.result())
+
+        for video_path, quality_result in scored:
             print(f"\nAnalyzing: {Path(video_path).name}")
-
-            # Score video
-            quality_result = self.scorer.score_video(video_path)
             score = quality_result['score']
 
-            # Record score
-            self.results['quality_scores'].append({
+            # Record score (an early rejection's score is only the partial sum
+            # of the stages that ran)
+            record = {
                 'video': str(Path(video_path).name),
+                'video_id': video_ids[video_path],
                 'score': score,
                 'query': search_query
-            })
+            }
+            if quality_result.get('rejected_early'):
+                record['rejected_early'] = True
+                record['max_possible'] = quality_result['max_possible']
+            self.results['quality_scores'].append(record)
             self.results['videos_analyzed'] += 1
 
             # Decision
@@ -149,14 +342,24 @@ class AutoDatasetCurator:
                     'score': score,
                     'query': search_query
                 })
+                self._unsaved_scores.append(dict(self.results['quality_scores'][-1], accepted=True))
             else:
-                print(f"   ❌ REJECTED - Score: {score:.1f}/100 ({quality_result['rating']})")
+                if quality_result.get('rejected_early'):
+                    print(f"   ❌ REJECTED EARLY - At most {quality_result['max_possible']:.1f}/100")
+                else:
+                    print(f"   ❌ REJECTED - Score: {score:.1f}/100 ({quality_result['rating']})")
                 rejected_videos.append({
                     'path': str(video_path),
                     'score': score,
+                    'rejected_early': quality_result.get('rejected_early', False),
                     'reason': quality_result['recommendation']
                 })
                 self.results['videos_rejected'] += 1
+                self._unsaved_scores.append(dict(self.results['quality_scores'][-1], accepted=False))
+
+        # Move the threshold toward the target acceptance rate
+        if self.target_accept_rate is not None:
+            self._adapt_threshold(len(accepted_videos) / len(downloaded_videos), search_query)
 
         # Save results
         self.save_results()
@@ -180,13 +383,44 @@ class AutoDatasetCurator:
             print()
             print("❌ REJECTED VIDEOS:")
             for v in sorted(rejected_videos, key=lambda x: x['score'], reverse=True):
-                print(f"   ❌ {v['score']:.1f}/100 - {Path(v['path']).name}")
+                if v['rejected_early']:
+                    print(f"   ❌ rejected early - {Path(v['path']).name}")
+                else:
+                    print(f"   ❌ {v['score']:.1f}/100 - {Path(v['path']).name}")
 
         print("="*70)
         print()
 
         return accepted_videos
 
+    def _adapt_threshold(self, accept_rate, search_query):
+        """
+        One step of the online threshold update
+
+        Accepting more than the target raises the threshold, fewer lowers it;
+        the step shrinks by 10% each batch so the threshold settles.
+
+        Args:
+            accept_rate: Fraction of this batch that was accepted
+            search_query: Query of this batch (recorded in the history)
+        """
+        error = accept_rate - self.target_accept_rate
+        if error > 0:
+            self.quality_threshold = min(100.0, self.quality_threshold + self.threshold_step)
+        elif error < 0:
+            self.quality_threshold = max(0.0, self.quality_threshold - self.threshold_step)
+        self.threshold_step *= 0.9
+
+        self.results.setdefault('quality_threshold_history', []).append({
+            'query': search_query,
+            'accept_rate': accept_rate,
+            'threshold': self.quality_threshold,
+            'step': self.threshold_step
+        })
+
+        print(f"🎚️  Adaptive threshold: {self.quality_threshold:.1f}/100 "
+              f"(batch acceptance {accept_rate:.1%}, target {self.target_accept_rate:.1%})")
+
     def process_curated_videos(self, accepted_videos):
         """
         Process accepted videos through full pipeline
@@ -207,80 +441,202 @@ class AutoDatasetCurator:
         print(f"Processing {len(accepted_videos)} high-quality videos through full pipeline")
         print()
 
+        if self.in_process:
+            processed_results = self._process_in_process(accepted_videos)
+        else:
+            # Run the pipelines concurrently, at most one worker per core
+            processed_results = asyncio.run(self._process_all(accepted_videos))
+
+        # Summary
+        successful = sum(1 for r in processed_results if r['processed'])
+        print("="*70)
+        print("PROCESSING SUMMARY")
+        print("="*70)
+        print(f"Videos processed: {len(processed_results)}")
+        print(f"Successful: {successful}")
+        print(f"Failed: {len(processed_results) - successful}")
+        print("="*70)
+
+        return processed_results
+
+    def _process_in_process(self, accepted_videos):
+        """
+        Process accepted videos one at a time with an in-process UnifiedPipeline
+
+        No interpreter is started per video, and pipeline output is printed
+        inline. A run past the 5 minute timeout is reported as such, but its
+        thread cannot be stopped: it is left to finish in the background (as
+        a daemon, so it doesn't hold up exit) and its pipeline is abandoned.
+        """
+        from unified_pipeline import UnifiedPipeline
+
         processed_results = []
 
         for i, video_info in enumerate(accepted_videos, 1):
             video_path = video_info['path']
-            video_name = Path(video_path).stem
-            output_name = self.data_dir / video_name
+
+            if self._pipeline is None:
+                self._pipeline = UnifiedPipeline(
+                    enable_vision=True,
+                    enable_reconciliation=True,
+                    output_dir=str(self.data_dir)
+                )
 
             print(f"[{i}/{len(accepted_videos)}] Processing: {Path(video_path).name}")
             print(f"   Quality score: {video_info['score']:.1f}/100")
 
-            try:
-                # Run unified pipeline
-                cmd = [
-                    'python', 'unified_pipeline.py',
-                    str(video_path),
-                    str(output_name) + '.mp4',
-                    '--enable-vision'
-                ]
-
-                result = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    text=True,
-                    timeout=300  # 5 minute timeout per video
-                )
+            result = {
+                'video': str(Path(video_path).name),
+                'quality_score': video_info['score'],
+                'processed': False
+            }
+
+            # Own daemon thread per video so a hung run doesn't hold up the
+            # next one (or interpreter exit)
+            future = Future()
+            threading.Thread(
+                target=_run_into_future,
+                args=(future, self._pipeline.process, str(video_path)),
+                daemon=True
+            ).start()
 
-                if result.returncode == 0:
+            try:
+                if future.result(timeout=300) is not None:  # 5 minute timeout per video
                     print(f"   ✅ Successfully processed")
-                    processed_results.append({
-                        'video': str(Path(video_path).name),
-                        'quality_score': video_info['score'],
-                        'processed': True,
-                        'output_dir': str(self.data_dir)
-                    })
+                    result['processed'] = True
+                    result['output_dir'] = str(self.data_dir)
                 else:
-                    print(f"   ⚠️  Processing failed: {result.stderr[:200]}")
-                    processed_results.append({
-                        'video': str(Path(video_path).name),
-                        'quality_score': video_info['score'],
-                        'processed': False,
-                        'error': result.stderr[:500]
-                    })
-
-            except subprocess.TimeoutExpired:
+                    print(f"   ⚠️  Processing failed: Pipeline failed")
+                    result['error'] = 'Pipeline failed'
+            except TimeoutError:
                 print(f"   ⏱️  Processing timeout (>5 minutes)")
-                processed_results.append({
-                    'video': str(Path(video_path).name),
-                    'quality_score': video_info['score'],
-                    'processed': False,
-                    'error': 'Timeout'
-                })
+                result['error'] = 'Timeout'
+                # The hung run still uses this pipeline; the next video gets a fresh one
+                self._pipeline = None
             except Exception as e:
                 print(f"   ❌ Error: {e}")
-                processed_results.append({
-                    'video': str(Path(video_path).name),
-                    'quality_score': video_info['score'],
-                    'processed': False,
-                    'error': str(e)
-                })
+                result['error'] = str(e)
 
+            processed_results.append(result)
             print()
 
-        # Summary
-        successful = sum(1 for r in processed_results if r['processed'])
-        print("="*70)
-        print("PROCESSING SUMMARY")
-        print("="*70)
-        print(f"Videos processed: {len(processed_results)}")
-        print(f"Successful: {successful}")
-        print(f"Failed: {len(processed_results) - successful}")
-        print("="*70)
-
         return processed_results
 
+    async def _process_all(self, accepted_videos):
+        """
+        Process all accepted videos on up to CPU-count persistent pipeline workers
+
+        Each worker is one `unified_pipeline.py --server` process fed a job at
+        a time, so interpreter and import startup is paid once per worker
+        rather than once per video.
+        """
+        total = len(accepted_videos)
+        jobs = asyncio.Queue()
+        for job in enumerate(accepted_videos, 1):
+            jobs.put_nowait(job)
+
+        results = [None] * total
+        log_file = self.data_dir / 'pipeline_workers.log'
+
+        with open(log_file, 'ab') as log:
+            async def worker():
+                proc = None
+                while not jobs.empty():
+                    i, video_info = jobs.get_nowait()
+                    if proc is None:
+                        proc = await asyncio.create_subprocess_exec(
+                            *self._worker_cmd,
+                            stdin=asyncio.subprocess.PIPE,
+                            stdout=asyncio.subprocess.PIPE,
+                            stderr=log  # Pipeline progress output
+                        )
+                    results[i - 1], proc = await self._process_one(proc, i, total, video_info)
+
+                if proc is not None:
+                    proc.stdin.close()
+                    await proc.wait()
+
+            await asyncio.gather(*(worker() for _ in range(min(os.cpu_count() or 1, total))))
+
+        return results
+
+    async def _process_one(self, proc, i, total, video_info):
+        """
+        Send one accepted video to a pipeline worker and wait for its reply
+
+        Returns:
+            (processed video result dict, worker to reuse or None if it was stopped)
+        """
+        video_path = video_info['path']
+
+        result = {
+            'video': str(Path(video_path).name),
+            'quality_score': video_info['score'],
+            'processed': False
+        }
+
+        # Per-video report is printed once the worker replies so lines don't interleave
+        lines = [f"[{i}/{total}] Processing: {Path(video_path).name}",
+                 f"   Quality score: {video_info['score']:.1f}/100"]
+
+        try:
+            try:
+                proc.stdin.write((json.dumps({'video': str(video_path)}) + '\n').encode())
+                await proc.stdin.drain()
+            except ConnectionError:
+                # Worker died since its last job; the next job starts a new one
+                if proc.returncode is None:
+                    proc.kill()
+                returncode = await proc.wait()
+                proc = None
+                raise RuntimeError(f"Pipeline worker exited (code {returncode})")
+
+            try:
+                line = await asyncio.wait_for(
+                    proc.stdout.readline(),
+                    timeout=300  # 5 minute timeout per video
+                )
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+                proc = None
+                raise
+
+            if not line:
+                returncode = await proc.wait()
+                proc = None
+                raise RuntimeError(f"Pipeline worker exited (code {returncode})")
+
+            try:
+                reply = json.loads(line)
+            except ValueError:
+                # Out of sync with the worker: later replies would belong to
+                # the wrong videos, so don't reuse it
+                proc.kill()
+                await proc.wait()
+                proc = None
+                raise RuntimeError(f"Unexpected worker output: {line.decode(errors='replace')[:200]!r}")
+
+            if reply['success']:
+                lines.append(f"   ✅ Successfully processed")
+                result['processed'] = True
+                result['output_dir'] = str(self.data_dir)
+            else:
+                lines.append(f"   ⚠️  Processing failed: {reply['error'][:200]}")
+                result['error'] = reply['error'][:500]
+
+        except asyncio.TimeoutError:
+            lines.append(f"   ⏱️  Processing timeout (>5 minutes)")
+            result['error'] = 'Timeout'
+        except Exception as e:
+            lines.append(f"   ❌ Error: {e}")
+            result['error'] = str(e)
+
+        print('\n'.join(lines))
+        print()
+
+        return result, proc
+
     def print_statistics(self):
         """Print overall curation statistics"""
         print()
@@ -292,17 +648,23 @@ class AutoDatasetCurator:
         print(f"Rejected: {self.results['videos_rejected']}")
         print()
 
-        if self.results['quality_scores']:
-            scores = [s['score'] for s in self.results['quality_scores']]
-            print(f"Average quality score: {sum(scores)/len(scores):.1f}/100")
-            print(f"Highest score: {max(scores):.1f}/100")
-            print(f"Lowest score: {min(scores):.1f}/100")
+        # Early rejections only have a partial score, so they stay out of the averages
+        full_scores = [s['score'] for s in self.results['quality_scores']
+                       if not s.get('rejected_early')]
+        n_early = len(self.results['quality_scores']) - len(full_scores)
+        if full_scores:
+            scores = np.fromiter(full_scores, dtype=np.float64, count=len(full_scores))
+            print(f"Average quality score: {scores.mean():.1f}/100")
+            print(f"Highest score: {scores.max():.1f}/100")
+            print(f"Lowest score: {scores.min():.1f}/100")
+        if n_early:
+            print(f"Rejected early (not fully scored): {n_early}")
 
         print()
         print(f"Search queries used: {len(self.results['search_queries'])}")
+        query_counts = Counter(v['query'] for v in self.results['curated_videos'])
         for query in self.results['search_queries']:
-            count = sum(1 for v in self.results['curated_videos'] if v['query'] == query)
-            print(f"   - '{query}': {count} videos")
+            print(f"   - '{query}': {query_counts[query]} videos")
 
         print("="*70)
 
@@ -320,19 +682,34 @@ def main():
                        help='Maximum videos per query (default: 10)')
     parser.add_argument('--max-duration', type=int, default=30,
                        help='Maximum video duration (default: 30s)')
+    parser.add_argument('--min-height', type=int, default=None,
+                       help='Minimum video height in pixels, checked before download')
     parser.add_argument('--threshold', type=float, default=70.0,
                        help='Quality threshold (default: 70)')
     parser.add_argument('--output-dir', default='curated_dataset',
                        help='Output directory (default: curated_dataset)')
     parser.add_argument('--process', action='store_true',
                        help='Process accepted videos through full pipeline')
+    parser.add_argument('--jobs', type=int, default=None,
+                       help='Parallel scoring workers (default: CPU count)')
+    parser.add_argument('--download-workers', type=int, default=4,
+                       help='Concurrent YouTube downloads (default: 4)')
+    parser.add_argument('--in-process', action='store_true',
+                       help='With --process: run the pipeline inside this process instead of worker processes')
+    parser.add_argument('--target-accept-rate', type=float, default=None,
+                       help='Adapt the threshold toward this acceptance rate, e.g. 0.2; resumes from the '
+                            'threshold saved in --output-dir, overriding --threshold (default: fixed threshold)')
 
     args = parser.parse_args()
 
     # Create curator
     curator = AutoDatasetCurator(
         output_dir=args.output_dir,
-        quality_threshold=args.threshold
+        quality_threshold=args.threshold,
+        n_jobs=args.jobs,
+        download_workers=args.download_workers,
+        target_accept_rate=args.target_accept_rate,
+        in_process=args.in_process
     )
 
     # Process each search query
@@ -346,7 +723,8 @@ def main():
         accepted = curator.curate_from_search(
             query,
             max_videos=args.max_per_query,
-            max_duration=args.max_duration
+            max_duration=args.max_duration,
+            min_height=args.min_height
         )
 
         all_accepted_videos.extend(accepted)
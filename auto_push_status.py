@@ -4,11 +4,22 @@ Continuously updates web dashboard and pushes to GitHub
 Allows phone monitoring via GitHub Pages
 """
 
+import hashlib
+import re
 import time
 import subprocess
 from pathlib import Path
 from web_dashboard_generator import WebDashboardGenerator
 
+# "Last Updated" stamps differ on every render; ignore them when comparing
+TIMESTAMP_PATTERN = re.compile(rb'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}')
+
+
+def dashboard_hash(path):
+    """Hash of the dashboard HTML, ignoring its generation timestamps"""
+    content = Path(path).read_bytes()
+    return hashlib.sha256(TIMESTAMP_PATTERN.sub(b'', content)).hexdigest()
+
 
 def git_commit_and_push(message="Update mining status"):
     """Commit and push changes to GitHub"""
@@ -46,13 +57,21 @@ def git_commit_and_push(message="Update mining status"):
 
 
 def main():
-    """Main loop - update and push every 2 minutes"""
+    """Main loop - update and push every few minutes (only when the dashboard changed)"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Keep the GitHub Pages mining dashboard up to date')
+    parser.add_argument('--interval', type=int, default=600,
+                       help='Seconds between updates (default: 600)')
+    args = parser.parse_args()
+
     generator = WebDashboardGenerator()
+    minutes = args.interval / 60
 
     print("=" * 70)
     print("🚀 AUTO-PUSH STATUS TO GITHUB")
     print("=" * 70)
-    print("This will update your GitHub Pages dashboard every 2 minutes")
+    print(f"This will update your GitHub Pages dashboard every {minutes:g} minutes")
     print("View from phone: https://YOUR_USERNAME.github.io/YOUR_REPO/")
     print()
     print("Press Ctrl+C to stop")
@@ -60,6 +79,7 @@ def main():
     print()
 
     iteration = 0
+    last_hash = None
 
     try:
         while True:
@@ -70,13 +90,18 @@ def main():
             output_file = generator.save()
             print(f"   ✅ Generated: {output_file}")
 
-            # Push to GitHub
-            from datetime import datetime
-            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            git_commit_and_push(f"Update mining status - {timestamp}")
-
-            print(f"   ⏰ Next update in 2 minutes...")
-            time.sleep(120)  # 2 minutes
+            # Push to GitHub (skip the git round-trips when nothing changed)
+            content_hash = dashboard_hash(output_file)
+            if content_hash == last_hash:
+                print("   No dashboard changes, skipping push")
+            else:
+                from datetime import datetime
+                timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                if git_commit_and_push(f"Update mining status - {timestamp}"):
+                    last_hash = content_hash
+
+            print(f"   ⏰ Next update in {minutes:g} minutes...")
+            time.sleep(args.interval)
 
     except KeyboardInterrupt:
         print("\n\n👋 Auto-push stopped")
@@ -6,22 +6,35 @@ Enables scaling to 100s-1000s of videos for robot training.
 """
 
 import json
+import os
+from contextlib import nullcontext
+from fnmatch import fnmatchcase
+from collections import Counter
 from pathlib import Path
-from unified_pipeline import UnifiedPipeline
+import numpy as np
+from unified_pipeline import UnifiedPipeline, redirect_stdout_fd
 from core.export.hdf5_exporter import HDF5Exporter
 import time
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 class BatchProcessor:
     """
     Process multiple videos in batch and create unified dataset
     """
 
-    def __init__(self, enable_vision=True, output_dir='batch_output'):
+    def __init__(self, enable_vision=True, output_dir='batch_output', quiet=False):
         self.enable_vision = enable_vision
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
 
+        # Progress bar instead of per-video output (pipeline output goes to pipeline.log)
+        self.quiet = quiet
+
         self.pipeline = UnifiedPipeline(
             enable_vision=enable_vision,
             output_dir=str(self.output_dir / 'individual')
@@ -58,16 +71,29 @@ class BatchProcessor:
             'start_time': time.time()
         }
 
+        if self.quiet:
+            from tqdm import tqdm
+
+            log = open(self.output_dir / 'pipeline.log', 'a')
+            progress = tqdm(video_files, unit='video')
+            say = progress.write  # Keeps failures above the bar
+        else:
+            log = None
+            progress = video_files
+            say = print
+
         # Process each video
-        for i, video_file in enumerate(video_files, 1):
+        for i, video_file in enumerate(progress, 1):
             video_path = Path(video_file)
 
-            print(f"\n[{i}/{len(video_files)}] Processing: {video_path.name}")
-            print("-" * 70)
+            if not self.quiet:
+                print(f"\n[{i}/{len(video_files)}] Processing: {video_path.name}")
+                print("-" * 70)
 
             try:
-                # Run pipeline
-                result = self.pipeline.process(str(video_path))
+                # Run pipeline (fd-level so extraction subprocesses are logged too)
+                with redirect_stdout_fd(log) if log else nullcontext():
+                    result = self.pipeline.process(str(video_path))
 
                 if result:
                     # Extract demo data
@@ -82,14 +108,18 @@ class BatchProcessor:
                     results['demos'].append(demo_data)
                     results['processed'] += 1
 
-                    print(f"✅ Success: {demo_data['action']} ({demo_data['confidence']:.0%})")
+                    if self.quiet:
+                        progress.set_postfix(action=demo_data['action'],
+                                             confidence=f"{demo_data['confidence']:.0%}")
+                    else:
+                        print(f"✅ Success: {demo_data['action']} ({demo_data['confidence']:.0%})")
                 else:
                     results['failed'] += 1
                     results['errors'].append({
                         'video': video_path.name,
                         'error': 'Pipeline returned None'
                     })
-                    print(f"❌ Failed: Pipeline returned None")
+                    say(f"❌ Failed: {video_path.name}: Pipeline returned None")
 
             except Exception as e:
                 results['failed'] += 1
@@ -97,7 +127,11 @@ class BatchProcessor:
                     'video': video_path.name,
                     'error': str(e)
                 })
-                print(f"❌ Error: {e}")
+                say(f"❌ Error: {video_path.name}: {e}")
+
+        if self.quiet:
+            progress.close()
+            log.close()
 
         # Create unified HDF5 dataset
         if results['demos']:
@@ -121,11 +155,16 @@ class BatchProcessor:
 
         # Save results JSON
         results_file = self.output_dir / 'batch_results.json'
-        with open(results_file, 'w') as f:
-            # Make copy without non-serializable data
-            save_results = {k: v for k, v in results.items() if k != 'demos'}
-            save_results['demo_count'] = len(results['demos'])
-            json.dump(save_results, f, indent=2)
+        # Make copy without non-serializable data
+        save_results = {k: v for k, v in results.items() if k != 'demos'}
+        save_results['demo_count'] = len(results['demos'])
+        if orjson is not None:
+            with open(results_file, 'wb') as f:
+                f.write(orjson.dumps(save_results,
+                                     option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+        else:
+            with open(results_file, 'w') as f:
+                json.dump(save_results, f, indent=2)
 
         print(f"\n💾 Results saved: {results_file}")
 
@@ -145,14 +184,21 @@ class BatchProcessor:
         """
         video_dir = Path(video_dir)
 
-        # Find all matching videos
-        video_files = list(video_dir.glob(pattern))
-
         # Also check for .mov files if pattern was .mp4
-        if pattern == '*.mp4':
-            video_files.extend(video_dir.glob('*.mov'))
-
-        video_files = sorted(video_files)
+        patterns = [pattern, '*.mov'] if pattern == '*.mp4' else [pattern]
+
+        if any('**' in p or '/' in p or os.sep in p for p in patterns):
+            # Patterns with directory parts (e.g. 'sub/*.mp4', '**/*.mp4') need glob
+            video_files = sorted({path for p in patterns for path in video_dir.glob(p)
+                                  if path.is_file()})
+        else:
+            # Find all matching videos in a single directory pass
+            with os.scandir(video_dir) as entries:
+                video_files = sorted(
+                    Path(entry.path) for entry in entries
+                    if any(fnmatchcase(entry.name, p) for p in patterns)
+                    and entry.is_file()
+                )
 
         print(f"📁 Found {len(video_files)} videos in {video_dir}")
         print()
@@ -177,18 +223,16 @@ class BatchProcessor:
 
         if results['demos']:
             # Action distribution
-            actions = [d['action'] for d in results['demos']]
-            action_counts = {}
-            for action in actions:
-                action_counts[action] = action_counts.get(action, 0) + 1
+            action_counts = Counter(d['action'] for d in results['demos'])
 
             print("Action Distribution:")
-            for action, count in sorted(action_counts.items(), key=lambda x: -x[1]):
+            for action, count in action_counts.most_common():
                 print(f"  {action.upper()}: {count} ({count/len(results['demos'])*100:.0%})")
             print()
 
             # Average confidence
-            avg_conf = sum(d['confidence'] for d in results['demos']) / len(results['demos'])
+            avg_conf = np.fromiter((d['confidence'] for d in results['demos']),
+                                   dtype=np.float64, count=len(results['demos'])).mean()
             print(f"Average Confidence: {avg_conf:.0%}")
             print()
 
@@ -221,13 +265,16 @@ def main():
     parser.add_argument('--dataset', default='robot_dataset.hdf5', help='Output dataset name')
     parser.add_argument('--pattern', default='*.mp4', help='File pattern (for directory input)')
     parser.add_argument('--no-vision', action='store_true', help='Disable vision stream')
+    parser.add_argument('--quiet', action='store_true',
+                       help='Show a progress bar; send pipeline output to pipeline.log')
 
     args = parser.parse_args()
 
     # Create processor
     processor = BatchProcessor(
         enable_vision=not args.no_vision,
-        output_dir=args.output
+        output_dir=args.output,
+        quiet=args.quiet
     )
 
     # Check if input is directory or file list
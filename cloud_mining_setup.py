@@ -12,19 +12,31 @@ Benefits:
 - Query via MCP tools
 """
 
-from pymongo import MongoClient
+from concurrent.futures import ThreadPoolExecutor
+from gridfs import GridFSBucket
+from pymongo import InsertOne, MongoClient
+from pymongo.errors import BulkWriteError
 from datetime import datetime
 import json
 from pathlib import Path
 import os
 
+try:
+    import zstandard  # noqa: F401
+    COMPRESSORS = 'zstd,zlib'
+except ImportError:
+    COMPRESSORS = 'zlib'  # pymongo warns when asked for zstd without zstandard
+
 
 class CloudMiningSetup:
     """
     Setup MongoDB Atlas connection for cloud data mining
     """
 
-    def __init__(self, mongo_uri=None):
+    # upload_mining_batch inserts sample documents in bulk writes of this size
+    BATCH_DOCUMENTS = 50
+
+    def __init__(self, mongo_uri=None, upload_workers=8, max_pool_size=32):
         """
         Args:
             mongo_uri: MongoDB Atlas connection string
@@ -35,7 +47,12 @@ class CloudMiningSetup:
                       2. Sign up (free tier = 512MB)
                       3. Create cluster
                       4. Get connection string
+            upload_workers: HDF5 files streamed to GridFS concurrently
+            max_pool_size: Connection pool size (keep >= upload_workers)
         """
+        # Network-bound, so threads (MongoClient is thread-safe and pooled)
+        self.upload_workers = upload_workers
+
         # Try environment variable first
         if mongo_uri is None:
             mongo_uri = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/')
@@ -44,7 +61,15 @@ class CloudMiningSetup:
         self.is_cloud = 'mongodb+srv' in mongo_uri or 'cloud.mongodb.com' in mongo_uri
 
         try:
-            self.client = MongoClient(mongo_uri)
+            self.client = MongoClient(
+                mongo_uri,
+                maxPoolSize=max_pool_size,
+                waitQueueTimeoutMS=10000,
+                compressors=COMPRESSORS,
+                zlibCompressionLevel=6,
+                retryWrites=True,
+                w=1  # Mined samples don't need replica acknowledgement
+            )
             self.db = self.client['data_mining_empire']
 
             # Test connection
@@ -58,6 +83,10 @@ class CloudMiningSetup:
             self.video_metadata = self.db['video_metadata']
             self.mining_stats = self.db['mining_statistics']
 
+            # HDF5 files are streamed to GridFS in chunks; robot_data documents
+            # reference them by hdf5_file_id
+            self.fs = GridFSBucket(self.db, bucket_name='robot_hdf5')
+
         except Exception as e:
             print(f"⚠️  MongoDB connection failed: {e}")
             print("\n💡 TO USE CLOUD STORAGE:")
@@ -84,23 +113,40 @@ class CloudMiningSetup:
         if not self.client:
             return None
 
-        hdf5_path = Path(hdf5_path)
+        document = self._build_document(hdf5_path, json_path, video_metadata)
 
-        # Read HDF5 file
-        with open(hdf5_path, 'rb') as f:
-            hdf5_data = f.read()
+        # Upload to cloud
+        try:
+            result = self.robot_data.insert_one(document)
+        except Exception:
+            self.fs.delete(document['hdf5_file_id'])
+            raise
+
+        print(f"☁️  Uploaded to cloud: {document['filename']} ({document['size_bytes']/1024:.1f} KB)")
+
+        return result.inserted_id
+
+    def _build_document(self, hdf5_path, json_path=None, video_metadata=None):
+        """
+        Build the MongoDB document for one robot training sample, streaming
+        its HDF5 file to GridFS
+
+        Returns:
+            dict with the GridFS file id and any metadata
+        """
+        hdf5_path = Path(hdf5_path)
 
         # Create document
         document = {
             'type': 'robot_training',
             'filename': hdf5_path.name,
-            'hdf5_data': hdf5_data,  # Store binary data
-            'size_bytes': len(hdf5_data),
+            'size_bytes': hdf5_path.stat().st_size,
             'uploaded_at': datetime.now(),
             'source': 'youtube_mining'
         }
 
-        # Add JSON metadata if provided
+        # Add JSON metadata if provided (before the upload, so a bad JSON
+        # file can't leave an unreferenced GridFS file behind)
         if json_path and Path(json_path).exists():
             with open(json_path, 'r') as f:
                 document['metadata'] = json.load(f)
@@ -109,12 +155,42 @@ class CloudMiningSetup:
         if video_metadata:
             document['video_metadata'] = video_metadata
 
-        # Upload to cloud
-        result = self.robot_data.insert_one(document)
+        # Stream HDF5 file to GridFS (never held in memory as a whole);
+        # the document references it by id
+        with open(hdf5_path, 'rb') as f:
+            document['hdf5_file_id'] = self.fs.upload_from_stream(hdf5_path.name, f)
 
-        print(f"☁️  Uploaded to cloud: {hdf5_path.name} ({len(hdf5_data)/1024:.1f} KB)")
+        return document
 
-        return result.inserted_id
+    def _bulk_insert(self, documents):
+        """
+        Insert documents in one unordered bulk write
+
+        Returns:
+            (uploaded count, uploaded bytes)
+        """
+        failed = set()
+        try:
+            self.robot_data.bulk_write(
+                [InsertOne(document) for document in documents], ordered=False)
+        except BulkWriteError as e:
+            # Unordered: the other documents were still inserted
+            for error in e.details['writeErrors']:
+                failed.add(error['index'])
+                print(f"❌ Failed to upload {documents[error['index']]['filename']}: {error['errmsg']}")
+        except Exception as e:
+            print(f"❌ Failed to upload {len(documents)} files: {e}")
+            failed = set(range(len(documents)))
+
+        # Don't leave HDF5 files behind for documents that weren't inserted
+        for i in failed:
+            self.fs.delete(documents[i]['hdf5_file_id'])
+
+        uploaded = [document for i, document in enumerate(documents) if i not in failed]
+        for document in uploaded:
+            print(f"☁️  Uploaded to cloud: {document['filename']} ({document['size_bytes']/1024:.1f} KB)")
+
+        return len(uploaded), sum(document['size_bytes'] for document in uploaded)
 
     def upload_mining_batch(self, data_dir='data_mine/permanent_data'):
         """
@@ -146,22 +222,40 @@ class CloudMiningSetup:
         uploaded = 0
         total_size = 0
 
-        for hdf5_file in hdf5_files:
+        def build(hdf5_file):
             # Find corresponding JSON
             json_file = json_dir / f"{hdf5_file.stem}_reconciled.json"
 
             try:
-                doc_id = self.upload_robot_sample(
+                return self._build_document(
                     hdf5_file,
                     json_path=json_file if json_file.exists() else None
                 )
-
-                if doc_id:
-                    uploaded += 1
-                    total_size += hdf5_file.stat().st_size
-
             except Exception as e:
                 print(f"❌ Failed to upload {hdf5_file.name}: {e}")
+                return None
+
+        # Group documents into bulk writes (one round-trip per batch)
+        batch = []
+
+        # Several GridFS uploads in flight at once
+        with ThreadPoolExecutor(max_workers=self.upload_workers) as pool:
+            for document in pool.map(build, hdf5_files):
+                if document is None:
+                    continue
+
+                batch.append(document)
+
+                if len(batch) >= self.BATCH_DOCUMENTS:
+                    batch_uploaded, batch_size = self._bulk_insert(batch)
+                    uploaded += batch_uploaded
+                    total_size += batch_size
+                    batch = []
+
+        if batch:
+            batch_uploaded, batch_size = self._bulk_insert(batch)
+            uploaded += batch_uploaded
+            total_size += batch_size
 
         print()
         print("="*70)
@@ -169,26 +263,45 @@ class CloudMiningSetup:
         print(f"📦 Total size: {total_size/1024/1024:.2f} MB")
         print("="*70)
 
+    def download_robot_sample(self, document, output_path):
+        """
+        Write the HDF5 file of a robot_data document back to disk
+
+        Args:
+            document: Document from robot_data (hdf5_file_id, or inline
+                      hdf5_data for documents uploaded before GridFS)
+            output_path: Where to write the HDF5 file
+        """
+        with open(output_path, 'wb') as f:
+            if 'hdf5_file_id' in document:
+                self.fs.download_to_stream(document['hdf5_file_id'], f)
+            else:
+                f.write(document['hdf5_data'])
+
     def get_mining_statistics(self):
         """Get statistics from cloud database"""
         if not self.client:
             return {}
 
         stats = {
-            'robot_samples': self.robot_data.count_documents({}),
+            'robot_samples': 0,
             'total_size_mb': 0,
             'storage_location': 'CLOUD ☁️' if self.is_cloud else 'LOCAL',
         }
 
-        # Calculate total size
+        # Count and total size in one pass, reading only size_bytes (older
+        # documents still carry their HDF5 data inline)
         pipeline = [
+            {'$project': {'_id': 0, 'size_bytes': 1}},
             {'$group': {
                 '_id': None,
+                'count': {'$sum': 1},
                 'total_size': {'$sum': '$size_bytes'}
             }}
         ]
         result = list(self.robot_data.aggregate(pipeline))
         if result:
+            stats['robot_samples'] = result[0]['count']
             stats['total_size_mb'] = result[0]['total_size'] / 1024 / 1024
 
         return stats
@@ -234,11 +347,13 @@ def main():
                        help='Show cloud mining status')
     parser.add_argument('--mongo-uri',
                        help='MongoDB connection URI (or set MONGODB_URI env var)')
+    parser.add_argument('--workers', type=int, default=8,
+                       help='Concurrent file uploads for --upload (default: 8)')
 
     args = parser.parse_args()
 
     # Create cloud setup
-    cloud = CloudMiningSetup(mongo_uri=args.mongo_uri)
+    cloud = CloudMiningSetup(mongo_uri=args.mongo_uri, upload_workers=args.workers)
 
     if args.upload:
         cloud.upload_mining_batch()
@@ -12,12 +12,69 @@ import json
 import numpy as np
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _orientation_frames(points):
+    """
+    Hand coordinate frames and Euler angles for many hands at once
+
+    Args:
+        points: (N, 4, 3) array of wrist, middle/index/pinky MCP positions
+
+    Returns:
+        (x_axis, y_axis, z_axis, roll, pitch, yaw) - (N, 3) axes, (N,) angles in radians
+    """
+    wrist = points[:, 0]
+    middle_mcp = points[:, 1]  # Middle finger base
+    index_mcp = points[:, 2]   # Index finger base
+    pinky_mcp = points[:, 3]   # Pinky finger base
+
+    # Compute hand coordinate frame
+    # X-axis: wrist → middle finger (forward)
+    x_axis = middle_mcp - wrist
+    x_axis = x_axis / (np.linalg.norm(x_axis, axis=1, keepdims=True) + 1e-8)
+
+    # Y-axis: index → pinky (across palm)
+    y_axis_raw = pinky_mcp - index_mcp
+
+    # Z-axis: normal to palm (using cross product)
+    z_axis = np.cross(x_axis, y_axis_raw)
+    z_axis = z_axis / (np.linalg.norm(z_axis, axis=1, keepdims=True) + 1e-8)
+
+    # Re-orthogonalize Y-axis
+    y_axis = np.cross(z_axis, x_axis)
+    y_axis = y_axis / (np.linalg.norm(y_axis, axis=1, keepdims=True) + 1e-8)
+
+    # Compute Euler angles (roll, pitch, yaw)
+    # Roll: rotation around X-axis (wrist->finger direction)
+    # Pitch: tilt up/down
+    # Yaw: rotation left/right
+
+    # Pitch: angle of x_axis from horizontal plane
+    pitch = np.arcsin(-x_axis[:, 1])  # Negative because Y is down in image
+
+    # Yaw: horizontal rotation
+    yaw = np.arctan2(x_axis[:, 0], -x_axis[:, 2])
+
+    # Roll: rotation of hand around its forward axis
+    # Project y_axis onto plane perpendicular to x_axis
+    roll = np.arctan2(y_axis[:, 1], y_axis[:, 2])
+
+    return x_axis, y_axis, z_axis, roll, pitch, yaw
+
 
 class HandOrientationComputer:
     """
     Compute hand orientation from 21 landmarks
     """
 
+    # Landmarks that define the hand frame, in the order of the point arrays
+    KEY_LANDMARKS = ['WRIST', 'MIDDLE_FINGER_MCP', 'INDEX_FINGER_MCP', 'PINKY_MCP']
+
     def __init__(self):
         print("🔧 Hand Orientation Computer")
 
@@ -31,15 +88,19 @@ class HandOrientationComputer:
 
         # Load extraction
         print(f"📂 Loading: {extraction_file}")
-        with open(extraction_file, 'r') as f:
-            data = json.load(f)
+        if orjson is not None:
+            data = orjson.loads(Path(extraction_file).read_bytes())
+        else:
+            with open(extraction_file, 'r') as f:
+                data = json.load(f)
 
         frames = data['frames']
         print(f"   Frames: {len(frames)}\n")
 
-        # Compute orientation for each frame
+        # Gather the key points of the first hand in each frame
         print("🔄 Computing orientations...")
-        orientations_added = 0
+        hands_with_points = []
+        points = []
 
         for frame_idx, frame in enumerate(frames):
             if frame_idx % 100 == 0:
@@ -52,27 +113,51 @@ class HandOrientationComputer:
             if not hands:
                 continue
 
-            # Compute orientation for first hand
             hand = hands[0]
-            landmarks = hand['landmarks']
+            hand_points = self._key_points(hand['landmarks'])
 
-            orientation = self._compute_orientation(landmarks)
+            if hand_points is not None:
+                hands_with_points.append(hand)
+                points.append(hand_points)
 
-            if orientation:
+        # Compute all orientations at once
+        if points:
+            orientations = self._compute_orientations(np.array(points))
+            for hand, orientation in zip(hands_with_points, orientations):
                 hand['orientation'] = orientation
-                orientations_added += 1
+
+        orientations_added = len(hands_with_points)
 
         print(f"\n✅ Added orientation to {orientations_added} frames\n")
 
         # Save results
         output_file = Path(extraction_file).stem + '_with_orientation.json'
-        with open(output_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        if orjson is not None:
+            Path(output_file).write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(output_file, 'w') as f:
+                json.dump(data, f, indent=2)
 
         print(f"💾 Saved to: {output_file}\n")
 
         return output_file
 
+    def _key_points(self, landmarks):
+        """
+        Wrist, middle/index/pinky MCP coordinates as a (4, 3) array
+
+        Returns:
+            None if a landmark is missing or malformed
+        """
+        try:
+            points = [[landmarks[name]['x'], landmarks[name]['y'], landmarks[name]['z']]
+                      for name in self.KEY_LANDMARKS]
+            if any(value is None for point in points for value in point):
+                return None
+            return np.array(points, dtype=float)
+        except (KeyError, TypeError, ValueError):
+            return None
+
     def _compute_orientation(self, landmarks):
         """
         Compute hand orientation from landmarks
@@ -85,78 +170,42 @@ class HandOrientationComputer:
                 'yaw': float     # Rotation left/right (degrees)
             }
         """
-        try:
-            # Key points for orientation
-            wrist = np.array([
-                landmarks['WRIST']['x'],
-                landmarks['WRIST']['y'],
-                landmarks['WRIST']['z']
-            ])
-
-            middle_mcp = np.array([  # Middle finger base
-                landmarks['MIDDLE_FINGER_MCP']['x'],
-                landmarks['MIDDLE_FINGER_MCP']['y'],
-                landmarks['MIDDLE_FINGER_MCP']['z']
-            ])
-
-            index_mcp = np.array([  # Index finger base
-                landmarks['INDEX_FINGER_MCP']['x'],
-                landmarks['INDEX_FINGER_MCP']['y'],
-                landmarks['INDEX_FINGER_MCP']['z']
-            ])
-
-            pinky_mcp = np.array([  # Pinky finger base
-                landmarks['PINKY_MCP']['x'],
-                landmarks['PINKY_MCP']['y'],
-                landmarks['PINKY_MCP']['z']
-            ])
-
-            # Compute hand coordinate frame
-            # X-axis: wrist → middle finger (forward)
-            x_axis = middle_mcp - wrist
-            x_axis = x_axis / (np.linalg.norm(x_axis) + 1e-8)
-
-            # Y-axis: index → pinky (across palm)
-            y_axis_raw = pinky_mcp - index_mcp
-
-            # Z-axis: normal to palm (using cross product)
-            z_axis = np.cross(x_axis, y_axis_raw)
-            z_axis = z_axis / (np.linalg.norm(z_axis) + 1e-8)
-
-            # Re-orthogonalize Y-axis
-            y_axis = np.cross(z_axis, x_axis)
-            y_axis = y_axis / (np.linalg.norm(y_axis) + 1e-8)
-
-            # Palm normal is Z-axis
-            palm_normal = z_axis
-
-            # Compute Euler angles (roll, pitch, yaw)
-            # Roll: rotation around X-axis (wrist->finger direction)
-            # Pitch: tilt up/down
-            # Yaw: rotation left/right
-
-            # Pitch: angle of x_axis from horizontal plane
-            pitch = np.arcsin(-x_axis[1])  # Negative because Y is down in image
-
-            # Yaw: horizontal rotation
-            yaw = np.arctan2(x_axis[0], -x_axis[2])
-
-            # Roll: rotation of hand around its forward axis
-            # Project y_axis onto plane perpendicular to x_axis
-            roll = np.arctan2(y_axis[1], y_axis[2])
-
-            return {
-                'palm_normal': palm_normal.tolist(),
-                'x_axis': x_axis.tolist(),  # Forward (wrist->fingers)
-                'y_axis': y_axis.tolist(),  # Across palm
-                'z_axis': z_axis.tolist(),  # Out of palm
-                'roll': float(np.degrees(roll)),
-                'pitch': float(np.degrees(pitch)),
-                'yaw': float(np.degrees(yaw))
-            }
-
-        except (KeyError, TypeError, ZeroDivisionError) as e:
+        points = self._key_points(landmarks)
+        if points is None:
             return None
+        return self._compute_orientations(points[np.newaxis])[0]
+
+    def _compute_orientations(self, points):
+        """
+        Compute hand orientations for many hands at once
+
+        Args:
+            points: (N, 4, 3) array of wrist, middle/index/pinky MCP positions
+
+        Returns:
+            List of N orientation dicts (see _compute_orientation)
+        """
+        x_axis, y_axis, z_axis, roll, pitch, yaw = _orientation_frames(
+            np.ascontiguousarray(points, dtype=np.float64))
+
+        # Palm normal is Z-axis
+        palm_normal = z_axis
+
+        return [
+            {
+                'palm_normal': normal,
+                'x_axis': x,  # Forward (wrist->fingers)
+                'y_axis': y,  # Across palm
+                'z_axis': z,  # Out of palm
+                'roll': r,
+                'pitch': p,
+                'yaw': w
+            }
+            for normal, x, y, z, r, p, w in zip(
+                palm_normal.tolist(), x_axis.tolist(), y_axis.tolist(), z_axis.tolist(),
+                np.degrees(roll).tolist(), np.degrees(pitch).tolist(), np.degrees(yaw).tolist()
+            )
+        ]
 
 
 def main():
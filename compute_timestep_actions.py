@@ -9,7 +9,23 @@ Output: Timestep-based robot actions with deltas, velocity, gripper commands
 import json
 import numpy as np
 from pathlib import Path
-from scipy.ndimage import gaussian_filter1d
+from scipy.signal import savgol_filter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _json_default(value):
+    """
+    json.dump fallback for the NumPy values in the results (orjson writes
+    them natively with OPT_SERIALIZE_NUMPY)
+    """
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
 
 class TimestepActionComputer:
     """
@@ -22,6 +38,11 @@ class TimestepActionComputer:
     def process(self, extraction_file):
         """
         Convert comprehensive extraction to timestep-based actions
+
+        The computed values in 'timesteps' (smoothed positions, kinematics,
+        delta actions) are float32 NumPy rows and scalars, not Python floats:
+        write them with orjson's OPT_SERIALIZE_NUMPY, or json.dump with
+        default=_json_default.
         """
         print(f"\n{'='*70}")
         print(f"PHASE 1: COMPUTING TIMESTEP ACTIONS")
@@ -29,8 +50,11 @@ class TimestepActionComputer:
 
         # Load extracted data
         print(f"📂 Loading: {extraction_file}")
-        with open(extraction_file, 'r') as f:
-            data = json.load(f)
+        if orjson is not None:
+            data = orjson.loads(Path(extraction_file).read_bytes())
+        else:
+            with open(extraction_file, 'r') as f:
+                data = json.load(f)
 
         metadata = data['metadata']
         frames = data['frames']
@@ -45,11 +69,11 @@ class TimestepActionComputer:
 
         # Smooth trajectories
         print(f"\n🎯 SMOOTHING TRAJECTORIES...")
-        smoothed = self._smooth_trajectories(trajectories)
+        smoothed = self._smooth_trajectories(trajectories, metadata['fps'])
 
         # Compute derivatives
         print(f"\n⚡ COMPUTING VELOCITIES & ACCELERATIONS...")
-        derivatives = self._compute_derivatives(smoothed, metadata['fps'])
+        derivatives = self._compute_derivatives(smoothed)
 
         # Compute delta actions
         print(f"\n🎮 COMPUTING DELTA ACTIONS...")
@@ -68,7 +92,9 @@ class TimestepActionComputer:
 
         # Analyze results
         print(f"\n📈 ANALYZING RESULTS...")
-        analysis = self._analyze_results(timestep_data, metadata)
+        analysis = self._analyze_results(
+            smoothed, derivatives, delta_actions, gripper_commands, metadata
+        )
 
         return {
             'metadata': metadata,
@@ -106,6 +132,8 @@ class TimestepActionComputer:
             else:
                 hand_openness.append(np.nan)
 
+        # Raw values keep the input's precision (they're written out as *_raw);
+        # _smooth_trajectories works in float32
         wrist_pos = np.array(wrist_pos)
         wrist_visibility = np.array(wrist_visibility)
         hand_openness = np.array(hand_openness)
@@ -117,6 +145,11 @@ class TimestepActionComputer:
         print(f"   Valid wrist positions: {np.sum(wrist_visibility > 0.5)}/{len(frames)}")
         print(f"   Valid hand openness: {np.sum(~np.isnan(hand_openness))}/{len(frames)}")
 
+        if np.isnan(wrist_pos).all():
+            print(f"   ⚠️  No wrist detected - positions and velocities will be NaN")
+        if np.isnan(hand_openness).all():
+            print(f"   ⚠️  No hand detected - openness will be NaN (gripper holds)")
+
         return {
             'wrist_pos': wrist_pos,
             'wrist_visibility': wrist_visibility,
@@ -128,76 +161,66 @@ class TimestepActionComputer:
     def _interpolate_missing(self, data):
         """
         Interpolate missing values (NaN) in trajectory
-        """
-        if len(data.shape) == 1:
-            # 1D data (e.g., hand openness)
-            mask = np.isnan(data)
-            if np.all(mask):
-                return data  # All NaN, can't interpolate
-
-            indices = np.arange(len(data))
-            valid_indices = indices[~mask]
-            valid_values = data[~mask]
-
-            if len(valid_values) > 0:
-                data[mask] = np.interp(indices[mask], valid_indices, valid_values)
-        else:
-            # 2D data (e.g., wrist position)
-            for i in range(data.shape[1]):
-                mask = np.isnan(data[:, i])
-                if np.all(mask):
-                    continue
 
-                indices = np.arange(len(data))
-                valid_indices = indices[~mask]
-                valid_values = data[~mask, i]
+        1D data (e.g., hand openness) is handled as a single column of 2D
+        data (e.g., wrist position). All-NaN columns are left as they are.
+        """
+        columns = data.reshape(len(data), -1)
+        indices = np.arange(len(data))
+        missing = np.isnan(columns)
 
-                if len(valid_values) > 0:
-                    data[mask, i] = np.interp(indices[mask], valid_indices, valid_values)
+        # Only columns with both gaps and valid values need work
+        for i in np.flatnonzero(missing.any(axis=0) & ~missing.all(axis=0)):
+            mask = missing[:, i]
+            columns[mask, i] = np.interp(indices[mask], indices[~mask], columns[~mask, i])
 
-        return data
+        return columns.reshape(data.shape)
 
-    def _smooth_trajectories(self, trajectories):
+    def _smooth_trajectories(self, trajectories, fps):
         """
-        Apply Gaussian smoothing to reduce noise
+        Apply Savitzky-Golay smoothing to reduce noise
+
+        The same local polynomial fits also give the wrist velocity and
+        acceleration, so no finite differences of noisy positions are needed.
         """
-        sigma = 2.0  # Smoothing parameter
-
-        smoothed = {}
-
-        # Smooth wrist position (per axis)
-        wrist_smooth = np.zeros_like(trajectories['wrist_pos'])
-        for i in range(3):
-            wrist_smooth[:, i] = gaussian_filter1d(
-                trajectories['wrist_pos'][:, i],
-                sigma=sigma
-            )
-        smoothed['wrist_pos'] = wrist_smooth
-
-        # Smooth hand openness
-        smoothed['hand_openness'] = gaussian_filter1d(
-            trajectories['hand_openness'],
-            sigma=sigma
-        )
+        n = len(trajectories['wrist_pos'])
+        window_length = max(1, min(17, n if n % 2 else n - 1))  # Odd, at most the trajectory length
+        polyorder = min(3, window_length - 1)
+        dt = 1.0 / fps
+
+        # float32 (MediaPipe's own precision) halves the memory traffic of
+        # smoothing and derivatives
+        wrist_pos = trajectories['wrist_pos'].astype(np.float32)
+        hand_openness = trajectories['hand_openness'].astype(np.float32)
+
+        def savgol(data, deriv=0):
+            # savgol_filter rejects NaN; columns that were never detected
+            # (left all-NaN by _interpolate_missing) stay NaN
+            columns = data.reshape(n, -1)
+            result = np.full(columns.shape, np.nan, dtype=columns.dtype)
+            valid = ~np.isnan(columns).any(axis=0)
+            if n and valid.any():
+                result[:, valid] = savgol_filter(columns[:, valid], window_length, polyorder,
+                                                 deriv=deriv, delta=dt, axis=0)
+            return result.reshape(data.shape)
+
+        smoothed = {
+            'wrist_pos': savgol(wrist_pos),
+            'wrist_velocity': savgol(wrist_pos, deriv=1),
+            'wrist_acceleration': savgol(wrist_pos, deriv=2),
+            'hand_openness': savgol(hand_openness)
+        }
 
-        print(f"   Applied Gaussian smoothing (σ={sigma})")
+        print(f"   Applied Savitzky-Golay smoothing (window={window_length}, order={polyorder})")
 
         return smoothed
 
-    def _compute_derivatives(self, smoothed, fps):
+    def _compute_derivatives(self, smoothed):
         """
-        Compute velocity and acceleration
+        Collect velocity and acceleration, and compute speed
         """
-        dt = 1.0 / fps
-
-        # Velocity (first derivative)
-        velocity = np.diff(smoothed['wrist_pos'], axis=0) / dt
-        # Pad to match length
-        velocity = np.vstack([velocity, velocity[-1:]])
-
-        # Acceleration (second derivative)
-        acceleration = np.diff(velocity, axis=0) / dt
-        acceleration = np.vstack([acceleration, acceleration[-1:]])
+        velocity = smoothed['wrist_velocity']
+        acceleration = smoothed['wrist_acceleration']
 
         # Speed (magnitude of velocity)
         speed = np.linalg.norm(velocity, axis=1)
@@ -268,60 +291,78 @@ class TimestepActionComputer:
         """
         Build final timestep-based format
         """
-        timesteps = []
+        # Raw input values are converted to Python floats; computed float32
+        # columns stay NumPy rows/scalars so orjson writes them at float32
+        # precision (0.1, not the widened 0.10000000149011612). The stdlib
+        # json fallback (_json_default) writes them as float64 digits instead
+        columns = zip(
+            trajectories['frame_indices'].tolist(),
+            trajectories['timestamps'].tolist(),
+            smoothed['wrist_pos'],
+            trajectories['wrist_pos'].tolist(),
+            smoothed['hand_openness'],
+            trajectories['hand_openness'].tolist(),
+            trajectories['wrist_visibility'].tolist(),
+            derivatives['velocity'],
+            derivatives['acceleration'],
+            derivatives['speed'],
+            delta_actions['delta_pos'],
+            delta_actions['delta_openness'],
+            gripper_commands.astype(int).tolist()
+        )
 
-        for i in range(len(frames)):
-            timestep = {
+        timesteps = [
+            {
                 # Metadata
                 'timestep': i,
-                'frame_idx': int(trajectories['frame_indices'][i]),
-                'timestamp': float(trajectories['timestamps'][i]),
+                'frame_idx': frame_idx,
+                'timestamp': timestamp,
 
                 # Observations (state)
                 'observations': {
-                    'end_effector_pos': smoothed['wrist_pos'][i].tolist(),
-                    'end_effector_pos_raw': trajectories['wrist_pos'][i].tolist(),
-                    'gripper_openness': float(smoothed['hand_openness'][i]),
-                    'gripper_openness_raw': float(trajectories['hand_openness'][i]),
-                    'wrist_visibility': float(trajectories['wrist_visibility'][i]),
+                    'end_effector_pos': pos,
+                    'end_effector_pos_raw': pos_raw,
+                    'gripper_openness': openness,
+                    'gripper_openness_raw': openness_raw,
+                    'wrist_visibility': visibility,
                 },
 
                 # Kinematics
                 'kinematics': {
-                    'velocity': derivatives['velocity'][i].tolist(),
-                    'acceleration': derivatives['acceleration'][i].tolist(),
-                    'speed': float(derivatives['speed'][i])
+                    'velocity': velocity,
+                    'acceleration': acceleration,
+                    'speed': speed
                 },
 
                 # Actions (control commands)
                 'actions': {
-                    'delta_pos': delta_actions['delta_pos'][i].tolist(),
-                    'delta_openness': float(delta_actions['delta_openness'][i]),
-                    'gripper_command': int(gripper_commands[i]),  # -1, 0, or 1
+                    'delta_pos': delta_pos,
+                    'delta_openness': delta_openness,
+                    'gripper_command': gripper_command,  # -1, 0, or 1
                 }
             }
-
-            timesteps.append(timestep)
+            for i, (frame_idx, timestamp, pos, pos_raw, openness, openness_raw, visibility,
+                    velocity, acceleration, speed, delta_pos, delta_openness,
+                    gripper_command) in enumerate(columns)
+        ]
 
         print(f"   Built {len(timesteps)} timesteps")
 
         return timesteps
 
-    def _analyze_results(self, timestep_data, metadata):
+    def _analyze_results(self, smoothed, derivatives, delta_actions, gripper_commands, metadata):
         """
-        Analyze the computed timestep data
+        Analyze the computed timestep data (from the arrays it was built from)
         """
         print(f"\n{'='*70}")
         print(f"TIMESTEP DATA ANALYSIS")
         print(f"{'='*70}\n")
 
-        # Extract arrays for analysis
-        positions = np.array([t['observations']['end_effector_pos'] for t in timestep_data])
-        velocities = np.array([t['kinematics']['velocity'] for t in timestep_data])
-        speeds = np.array([t['kinematics']['speed'] for t in timestep_data])
-        delta_positions = np.array([t['actions']['delta_pos'] for t in timestep_data])
-        gripper_cmds = np.array([t['actions']['gripper_command'] for t in timestep_data])
-        openness = np.array([t['observations']['gripper_openness'] for t in timestep_data])
+        positions = smoothed['wrist_pos']
+        speeds = derivatives['speed']
+        delta_positions = delta_actions['delta_pos']
+        gripper_cmds = gripper_commands
+        openness = smoothed['hand_openness']
 
         print(f"📊 POSITION STATISTICS:")
         print(f"   X range: {positions[:, 0].min():.3f} to {positions[:, 0].max():.3f}")
@@ -352,7 +393,7 @@ class TimestepActionComputer:
         print(f"   Low-speed frames: {len(speeds) - high_speed_frames} ({(len(speeds)-high_speed_frames)/len(speeds)*100:.1f}%)")
 
         return {
-            'total_timesteps': len(timestep_data),
+            'total_timesteps': len(speeds),
             'duration_sec': float(metadata['duration']),
             'fps': float(metadata['fps']),
             'position_range': {
@@ -397,8 +438,12 @@ def main():
     print(f"\n💾 SAVING RESULTS...")
     print(f"   Output: {output_file}")
 
-    with open(output_file, 'w') as f:
-        json.dump(results, f, indent=2)
+    if orjson is not None:
+        Path(output_file).write_bytes(
+            orjson.dumps(results, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        with open(output_file, 'w') as f:
+            json.dump(results, f, indent=2, default=_json_default)
 
     print(f"\n✅ PHASE 1 COMPLETE")
     print(f"\n{'='*70}")
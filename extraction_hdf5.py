@@ -0,0 +1,174 @@
+"""
+EXTRACTION TO HDF5
+Store the numeric part of a full extraction as arrays instead of JSON text
+
+Layout (N = frames):
+- timestamps            (N,)          float64
+- pose/detected         (N,)          uint8
+- pose/keypoints        (N, 33, 4)    float32  x, y, z, visibility (NaN if not detected)
+- hands/detected        (N, 2)        uint8    up to two hands per frame
+- hands/is_right        (N, 2)        uint8
+- hands/landmarks       (N, 2, 21, 3) float32  (NaN if not detected)
+- hands/openness        (N, 2)        float32
+- hands/orientation     (N, 2, 3)     float32  roll, pitch, yaw in degrees (if computed)
+
+Video metadata is kept as a JSON string in the 'metadata' attribute.
+Objects and colors stay in the JSON extraction.
+"""
+
+import json
+import numpy as np
+import h5py
+from pathlib import Path
+
+
+# MediaPipe landmark order
+POSE_LANDMARKS = [
+    'NOSE', 'LEFT_EYE_INNER', 'LEFT_EYE', 'LEFT_EYE_OUTER', 'RIGHT_EYE_INNER',
+    'RIGHT_EYE', 'RIGHT_EYE_OUTER', 'LEFT_EAR', 'RIGHT_EAR', 'MOUTH_LEFT',
+    'MOUTH_RIGHT', 'LEFT_SHOULDER', 'RIGHT_SHOULDER', 'LEFT_ELBOW', 'RIGHT_ELBOW',
+    'LEFT_WRIST', 'RIGHT_WRIST', 'LEFT_PINKY', 'RIGHT_PINKY', 'LEFT_INDEX',
+    'RIGHT_INDEX', 'LEFT_THUMB', 'RIGHT_THUMB', 'LEFT_HIP', 'RIGHT_HIP',
+    'LEFT_KNEE', 'RIGHT_KNEE', 'LEFT_ANKLE', 'RIGHT_ANKLE', 'LEFT_HEEL',
+    'RIGHT_HEEL', 'LEFT_FOOT_INDEX', 'RIGHT_FOOT_INDEX'
+]
+
+HAND_LANDMARKS = [
+    'WRIST', 'THUMB_CMC', 'THUMB_MCP', 'THUMB_IP', 'THUMB_TIP',
+    'INDEX_FINGER_MCP', 'INDEX_FINGER_PIP', 'INDEX_FINGER_DIP', 'INDEX_FINGER_TIP',
+    'MIDDLE_FINGER_MCP', 'MIDDLE_FINGER_PIP', 'MIDDLE_FINGER_DIP', 'MIDDLE_FINGER_TIP',
+    'RING_FINGER_MCP', 'RING_FINGER_PIP', 'RING_FINGER_DIP', 'RING_FINGER_TIP',
+    'PINKY_MCP', 'PINKY_PIP', 'PINKY_DIP', 'PINKY_TIP'
+]
+
+MAX_HANDS = 2
+
+
+def extraction_arrays(data):
+    """
+    Pack the frames of an extraction dict into NumPy arrays
+
+    Args:
+        data: Extraction as loaded from *_full_extraction*.json
+
+    Returns:
+        dict of dataset name -> array (see module docstring)
+    """
+    frames = data['frames']
+    n = len(frames)
+
+    arrays = {
+        'timestamps': np.array([frame['timestamp'] for frame in frames], dtype=np.float64),
+        'pose/detected': np.zeros(n, dtype=np.uint8),
+        'pose/keypoints': np.full((n, len(POSE_LANDMARKS), 4), np.nan, dtype=np.float32),
+        'hands/detected': np.zeros((n, MAX_HANDS), dtype=np.uint8),
+        'hands/is_right': np.zeros((n, MAX_HANDS), dtype=np.uint8),
+        'hands/landmarks': np.full((n, MAX_HANDS, len(HAND_LANDMARKS), 3), np.nan, dtype=np.float32),
+        'hands/openness': np.full((n, MAX_HANDS), np.nan, dtype=np.float32),
+    }
+    orientation = np.full((n, MAX_HANDS, 3), np.nan, dtype=np.float32)
+    has_orientation = False
+
+    for i, frame in enumerate(frames):
+        pose = frame.get('pose', {})
+        if pose.get('detected'):
+            arrays['pose/detected'][i] = 1
+            landmarks = pose['landmarks']
+            arrays['pose/keypoints'][i] = [
+                [landmarks[name]['x'], landmarks[name]['y'], landmarks[name]['z'],
+                 landmarks[name]['visibility']]
+                for name in POSE_LANDMARKS
+            ]
+
+        hands = frame.get('hands', {})
+        if not hands.get('detected'):
+            continue
+
+        for h, hand in enumerate(hands.get('hands', [])[:MAX_HANDS]):
+            landmarks = hand['landmarks']
+            arrays['hands/detected'][i, h] = 1
+            arrays['hands/is_right'][i, h] = hand.get('label') == 'Right'
+            arrays['hands/landmarks'][i, h] = [
+                [landmarks[name]['x'], landmarks[name]['y'], landmarks[name]['z']]
+                for name in HAND_LANDMARKS
+            ]
+            if hand.get('openness') is not None:
+                arrays['hands/openness'][i, h] = hand['openness']
+            if 'orientation' in hand:
+                has_orientation = True
+                orientation[i, h] = [hand['orientation']['roll'],
+                                     hand['orientation']['pitch'],
+                                     hand['orientation']['yaw']]
+
+    if has_orientation:
+        arrays['hands/orientation'] = orientation
+
+    return arrays
+
+
+def frames_to_hdf5(data, path):
+    """
+    Write the numeric part of an extraction to an HDF5 file
+
+    Args:
+        data: Extraction dict (metadata + frames)
+        path: Output .h5 path
+    """
+    with h5py.File(path, 'w') as f:
+        f.attrs['metadata'] = json.dumps(data.get('metadata', {}), default=str)
+        for name, array in extraction_arrays(data).items():
+            f.create_dataset(name, data=array, chunks=True, compression='lzf', shuffle=True)
+
+
+def load_extraction_arrays(path):
+    """
+    Read an extraction HDF5 file back into NumPy arrays
+
+    Returns:
+        (arrays dict, metadata dict)
+    """
+    arrays = {}
+
+    def read(name, item):
+        if isinstance(item, h5py.Dataset):
+            arrays[name] = item[()]
+
+    with h5py.File(path, 'r') as f:
+        metadata = json.loads(f.attrs['metadata'])
+        f.visititems(read)
+
+    return arrays, metadata
+
+
+def main():
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Usage: python extraction_hdf5.py <full_extraction.json> [output.h5]")
+        print("\nExample:")
+        print("  python extraction_hdf5.py test_video_full_extraction_with_colors_with_orientation.json")
+        return
+
+    extraction_file = Path(sys.argv[1])
+
+    if not extraction_file.exists():
+        print(f"❌ File not found: {extraction_file}")
+        return
+
+    output_file = Path(sys.argv[2]) if len(sys.argv) > 2 else extraction_file.with_suffix('.h5')
+
+    print(f"📂 Loading: {extraction_file}")
+    with open(extraction_file, 'r') as f:
+        data = json.load(f)
+
+    frames_to_hdf5(data, output_file)
+
+    json_mb = extraction_file.stat().st_size / 1024 / 1024
+    h5_mb = output_file.stat().st_size / 1024 / 1024
+    print(f"💾 Saved to: {output_file}")
+    print(f"   Frames: {len(data['frames'])}")
+    print(f"   Size: {json_mb:.1f} MB JSON → {h5_mb:.1f} MB HDF5")
+
+
+if __name__ == "__main__":
+    main()
@@ -102,10 +102,10 @@ class RateLimitManager:
             json.dump(history_data, f, indent=2)
 
     def get_downloads_in_window(self, hours=1):
-        """Count downloads in last N hours"""
+        """Count downloads in last N hours (including ones still in progress)"""
         cutoff = datetime.now() - timedelta(hours=hours)
         return sum(1 for r in self.download_history
-                  if r['timestamp'] > cutoff and r['success'])
+                  if r['timestamp'] > cutoff and r['success'] is not False)
 
     def can_download(self):
         """
@@ -151,13 +151,13 @@ class RateLimitManager:
             min_delay = self.config['min_delay_seconds']
 
             if time_since_last < min_delay:
-                wait_seconds = int(min_delay - time_since_last)
+                wait_seconds = int(min_delay - time_since_last) + 1  # Round up: 0 means "can't proceed"
                 return False, f"Too soon after last download (min delay: {min_delay}s)", wait_seconds
 
         # Check consecutive errors
         recent_errors = sum(
             1 for r in list(self.download_history)[-10:]
-            if not r['success']
+            if r['success'] is False
         )
         if recent_errors >= self.config['max_consecutive_errors']:
             cooldown = self.config['error_cooldown_minutes'] * 60
@@ -165,21 +165,42 @@ class RateLimitManager:
 
         return True, "OK", 0
 
-    def record_download(self, success=True, error_code=None):
+    def reserve_download(self):
+        """
+        Record the start of a download before it runs
+
+        Concurrent downloaders see it in can_download right away, so their
+        starts stay min_delay_seconds apart and in-progress downloads count
+        towards the hourly/daily limits. Pass the returned record to
+        record_download once the download finishes.
+
+        Returns:
+            Pending history record (success is None until recorded)
+        """
+        record = {
+            'timestamp': datetime.now(),
+            'success': None,
+            'error_code': None
+        }
+        self.download_history.append(record)
+        return record
+
+    def record_download(self, success=True, error_code=None, record=None):
         """
         Record a download attempt
 
         Args:
             success: Whether download succeeded
             error_code: HTTP error code if failed (e.g., 403, 429)
+            record: Pending record from reserve_download to complete
+                    (a new record is added if not given)
         """
-        record = {
-            'timestamp': datetime.now(),
-            'success': success,
-            'error_code': error_code
-        }
+        if record is None:
+            record = {'timestamp': datetime.now()}
+            self.download_history.append(record)
 
-        self.download_history.append(record)
+        record['success'] = success
+        record['error_code'] = error_code
         self.config['total_downloads'] += 1
 
         if not success:
@@ -189,7 +210,7 @@ class RateLimitManager:
             if error_code in [403, 429]:  # Forbidden or Too Many Requests
                 consecutive_bans = sum(
                     1 for r in list(self.download_history)[-5:]
-                    if not r['success'] and r.get('error_code') in [403, 429]
+                    if r['success'] is False and r.get('error_code') in [403, 429]
                 )
 
                 if consecutive_bans >= 3:
@@ -233,7 +254,7 @@ class RateLimitManager:
         # Check recent errors
         recent_errors = sum(
             1 for r in list(self.download_history)[-10:]
-            if not r['success']
+            if r['success'] is False
         )
         if recent_errors > 0:
             delay *= (1 + recent_errors)  # Increase delay based on errors
@@ -16,7 +16,9 @@ Philosophy: Quality data through coherent, validated processing
 """
 
 import json
+import os
 import numpy as np
+from contextlib import contextmanager
 from pathlib import Path
 import sys
 
@@ -26,7 +28,8 @@ class UnifiedPipeline:
     Coherent video processing pipeline with dual-stream detection
     """
 
-    def __init__(self, enable_vision=False, enable_reconciliation=True, output_dir='output'):
+    def __init__(self, enable_vision=False, enable_reconciliation=True, output_dir='output',
+                 color_workers=None):
         """
         Initialize unified pipeline
 
@@ -34,8 +37,11 @@ class UnifiedPipeline:
             enable_vision: Enable vision stream (requires API)
             enable_reconciliation: Enable reconciliation junction
             output_dir: Directory for output files
+            color_workers: Worker processes for add_color_analysis.py
+                           (None = its default, CPU count)
         """
         self.enable_vision = enable_vision
+        self.color_workers = color_workers
         self.enable_reconciliation = enable_reconciliation
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
@@ -280,7 +286,10 @@ class UnifiedPipeline:
             # Step 2: Add colors
             print("  Running add_color_analysis.py...")
             extraction_json = f"{video_name}_full_extraction.json"
-            subprocess.run([sys.executable, 'add_color_analysis.py', video_file, extraction_json], check=True)
+            color_cmd = [sys.executable, 'add_color_analysis.py', video_file, extraction_json]
+            if self.color_workers:
+                color_cmd += ['--workers', str(self.color_workers)]
+            subprocess.run(color_cmd, check=True)
 
             # Step 3: Add orientation
             print("  Running compute_hand_orientation.py...")
@@ -673,21 +682,85 @@ class UnifiedPipeline:
         return robot_data
 
 
+@contextmanager
+def redirect_stdout_fd(target):
+    """
+    Point file descriptor 1 at target for the duration of the block
+
+    Unlike contextlib.redirect_stdout this also captures the output of
+    child processes (the stage 1 extraction scripts inherit fd 1).
+
+    Args:
+        target: Open file object with a real file descriptor
+
+    Yields:
+        Text file object writing to the original stdout
+    """
+    sys.stdout.flush()
+    saved_fd = os.dup(1)
+    os.dup2(target.fileno(), 1)
+    original = os.fdopen(saved_fd, 'w', closefd=False)
+    try:
+        yield original
+    finally:
+        sys.stdout.flush()
+        original.flush()
+        os.dup2(saved_fd, 1)
+        os.close(saved_fd)
+
+
+def serve(enable_vision=False, output_dir='output'):
+    """
+    Persistent worker: process one JSON job per stdin line
+
+    Each job is {"video": path}; each reply is one JSON line on stdout,
+    {"video": path, "success": bool} plus "error" on failure. Pipeline
+    progress output (including extraction subprocesses) goes to stderr
+    so stdout carries only replies.
+    """
+    with redirect_stdout_fd(sys.stderr) as replies:
+        pipeline = UnifiedPipeline(
+            enable_vision=enable_vision,
+            enable_reconciliation=True,
+            output_dir=output_dir,
+            color_workers=1  # Several server workers run side by side
+        )
+
+        for line in sys.stdin:
+            if not line.strip():
+                continue
+            job = json.loads(line)
+            reply = {'video': job['video'], 'success': False}
+
+            try:
+                result = pipeline.process(job['video'])
+                if result:
+                    reply['success'] = True
+                else:
+                    reply['error'] = 'Pipeline failed'
+            except Exception as e:
+                reply['error'] = str(e)
+
+            sys.stdout.flush()
+            replies.write(json.dumps(reply) + '\n')
+            replies.flush()
+
+
 def main():
     """
     Command-line interface
     """
     if len(sys.argv) < 2:
         print("Usage: python unified_pipeline.py <video_file> [--enable-vision] [--output-dir DIR]")
+        print("       python unified_pipeline.py --server [--enable-vision] [--output-dir DIR]")
         print()
         print("Example:")
         print("  python unified_pipeline.py video.mp4")
         print("  python unified_pipeline.py video.mp4 --enable-vision")
         print("  python unified_pipeline.py video.mp4 --output-dir results/")
+        print("  python unified_pipeline.py --server < jobs.jsonl   # one {\"video\": path} per line")
         return
 
-    video_file = sys.argv[1]
-
     # Parse options
     enable_vision = '--enable-vision' in sys.argv
 
@@ -697,6 +770,12 @@ def main():
         if idx + 1 < len(sys.argv):
             output_dir = sys.argv[idx + 1]
 
+    if sys.argv[1] == '--server':
+        serve(enable_vision=enable_vision, output_dir=output_dir)
+        return
+
+    video_file = sys.argv[1]
+
     # Create pipeline
     pipeline = UnifiedPipeline(
         enable_vision=enable_vision,
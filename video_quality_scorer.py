@@ -29,6 +29,15 @@ class VideoQualityScorer:
     Threshold: >70 = Good for robot training
     """
 
+    # Breakdown order in reports, and the most each category can add
+    MAX_SCORES = {
+        'pose_detection': 50,
+        'hand_detection': 20,
+        'lighting': 15,
+        'action_consistency': 10,
+        'duration': 5
+    }
+
     def __init__(self):
         self.mp_pose = mp.solutions.pose
         self.mp_hands = mp.solutions.hands
@@ -45,6 +54,30 @@ class VideoQualityScorer:
         Returns:
             dict with score and detailed breakdown
         """
+        return self.score_video_staged(video_path, sample_duration, sample_interval,
+                                       early_reject_threshold=None)
+
+    def score_video_staged(self, video_path, sample_duration=5.0, sample_interval=0.5,
+                           early_reject_threshold=70.0):
+        """
+        Quality score computed cheapest stage first, stopping early on hopeless videos
+
+        Stages run as duration -> lighting -> pose (+ action consistency) ->
+        hands. After each one, if the score could no longer reach
+        early_reject_threshold even with full marks on the remaining stages,
+        the video is rejected without running them.
+
+        Args:
+            video_path: Path to video file
+            sample_duration: How many seconds to sample (default: 5s)
+            sample_interval: Sample every N seconds (default: 0.5s = 2 fps)
+            early_reject_threshold: Score the video must still be able to reach
+                (None = always run every stage)
+
+        Returns:
+            dict with score and detailed breakdown; early rejections also carry
+            'rejected_early' and 'max_possible' (best score the video could have had)
+        """
         video_path = Path(video_path)
 
         print(f"🔍 Analyzing: {video_path.name}")
@@ -65,6 +98,39 @@ class VideoQualityScorer:
         width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
         height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
 
+        metadata = {
+            'duration': duration,
+            'resolution': f"{width}x{height}",
+            'fps': fps,
+            'frames_sampled': 0
+        }
+        breakdown = {}
+
+        def hopeless():
+            # Best case: full marks on every stage not scored yet
+            max_possible = sum(data['score'] for data in breakdown.values()) + sum(
+                max_score for category, max_score in self.MAX_SCORES.items()
+                if category not in breakdown)
+            return early_reject_threshold is not None and max_possible < early_reject_threshold
+
+        # Stage 1: Optimal Duration (0-5 points) - metadata only
+        if 5 <= duration <= 20:
+            duration_score = 5
+        elif 3 <= duration <= 30:
+            duration_score = 3
+        else:
+            duration_score = 1
+
+        breakdown['duration'] = {
+            'seconds': duration,
+            'score': duration_score,
+            'max': 5
+        }
+
+        if hopeless():
+            cap.release()
+            return self._build_result(video_path, metadata, breakdown, complete=False)
+
         # Sample frames
         frame_interval = int(fps * sample_interval)
         max_frames = int(fps * sample_duration)
@@ -89,59 +155,10 @@ class VideoQualityScorer:
                 'breakdown': {}
             }
 
-        # Analyze sampled frames
-        pose_detections = []
-        hand_detections = []
-        brightness_values = []
-
-        with self.mp_pose.Pose(
-            static_image_mode=True,
-            min_detection_confidence=0.5
-        ) as pose, self.mp_hands.Hands(
-            static_image_mode=True,
-            max_num_hands=2,
-            min_detection_confidence=0.5
-        ) as hands:
-
-            for frame in sampled_frames:
-                # Convert BGR to RGB
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-                # Pose detection
-                pose_result = pose.process(frame_rgb)
-                pose_detections.append(pose_result.pose_landmarks is not None)
-
-                # Hand detection
-                hand_result = hands.process(frame_rgb)
-                hand_detections.append(hand_result.multi_hand_landmarks is not None)
-
-                # Lighting analysis
-                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                brightness = np.mean(gray)
-                brightness_values.append(brightness)
-
-        # Calculate scores
-        breakdown = {}
-
-        # 1. Pose Detection Rate (0-50 points)
-        pose_rate = sum(pose_detections) / len(pose_detections)
-        pose_score = pose_rate * 50
-        breakdown['pose_detection'] = {
-            'rate': pose_rate,
-            'score': pose_score,
-            'max': 50
-        }
-
-        # 2. Hand Detection Rate (0-20 points)
-        hand_rate = sum(hand_detections) / len(hand_detections)
-        hand_score = hand_rate * 20
-        breakdown['hand_detection'] = {
-            'rate': hand_rate,
-            'score': hand_score,
-            'max': 20
-        }
+        metadata['frames_sampled'] = len(sampled_frames)
 
-        # 3. Lighting Quality (0-15 points)
+        # Stage 2: Lighting Quality (0-15 points)
+        brightness_values = [np.mean(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)) for frame in sampled_frames]
         mean_brightness = np.mean(brightness_values)
         brightness_std = np.std(brightness_values)
 
@@ -169,7 +186,29 @@ class VideoQualityScorer:
             'max': 15
         }
 
-        # 4. Single Action Indicator (0-10 points)
+        if hopeless():
+            return self._build_result(video_path, metadata, breakdown, complete=False)
+
+        # Convert BGR to RGB once for both detectors
+        frames_rgb = [cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) for frame in sampled_frames]
+
+        # Stage 3: Pose Detection Rate (0-50 points)
+        with self.mp_pose.Pose(
+            static_image_mode=True,
+            min_detection_confidence=0.5
+        ) as pose:
+            pose_detections = [pose.process(frame_rgb).pose_landmarks is not None
+                               for frame_rgb in frames_rgb]
+
+        pose_rate = sum(pose_detections) / len(pose_detections)
+        pose_score = pose_rate * 50
+        breakdown['pose_detection'] = {
+            'rate': pose_rate,
+            'score': pose_score,
+            'max': 50
+        }
+
+        # Single Action Indicator (0-10 points)
         # If pose detection is consistent (either high or low throughout),
         # likely single continuous action
         pose_consistency = 1 - np.std(pose_detections)
@@ -180,28 +219,38 @@ class VideoQualityScorer:
             'max': 10
         }
 
-        # 5. Optimal Duration (0-5 points)
-        if 5 <= duration <= 20:
-            duration_score = 5
-        elif 3 <= duration <= 30:
-            duration_score = 3
-        else:
-            duration_score = 1
+        if hopeless():
+            return self._build_result(video_path, metadata, breakdown, complete=False)
 
-        breakdown['duration'] = {
-            'seconds': duration,
-            'score': duration_score,
-            'max': 5
+        # Stage 4: Hand Detection Rate (0-20 points)
+        with self.mp_hands.Hands(
+            static_image_mode=True,
+            max_num_hands=2,
+            min_detection_confidence=0.5
+        ) as hands:
+            hand_detections = [hands.process(frame_rgb).multi_hand_landmarks is not None
+                               for frame_rgb in frames_rgb]
+
+        hand_rate = sum(hand_detections) / len(hand_detections)
+        hand_score = hand_rate * 20
+        breakdown['hand_detection'] = {
+            'rate': hand_rate,
+            'score': hand_score,
+            'max': 20
         }
 
+        return self._build_result(video_path, metadata, breakdown, complete=True)
+
+    def _build_result(self, video_path, metadata, breakdown, complete):
+        """
+        Assemble the score result from the stages that ran
+        """
+        # Report categories in the usual order
+        breakdown = {category: breakdown[category] for category in self.MAX_SCORES
+                     if category in breakdown}
+
         # Total score
-        total_score = (
-            pose_score +
-            hand_score +
-            lighting_score +
-            action_score +
-            duration_score
-        )
+        total_score = sum(data['score'] for data in breakdown.values())
 
         # Quality rating
         if total_score >= 80:
@@ -222,16 +271,17 @@ class VideoQualityScorer:
             'score': round(total_score, 1),
             'rating': rating,
             'emoji': emoji,
-            'metadata': {
-                'duration': duration,
-                'resolution': f"{width}x{height}",
-                'fps': fps,
-                'frames_sampled': len(sampled_frames)
-            },
+            'metadata': metadata,
             'breakdown': breakdown,
             'recommendation': self._get_recommendation(total_score, breakdown)
         }
 
+        if not complete:
+            result['rejected_early'] = True
+            result['max_possible'] = round(total_score + sum(
+                max_score for category, max_score in self.MAX_SCORES.items()
+                if category not in breakdown), 1)
+
         return result
 
     def _get_recommendation(self, score, breakdown):
@@ -240,12 +290,13 @@ class VideoQualityScorer:
             return "✅ RECOMMENDED - Process this video for robot training data"
 
         # Identify main issues
+        # (stages skipped by an early rejection are missing from breakdown)
         issues = []
-        if breakdown['pose_detection']['rate'] < 0.5:
+        if 'pose_detection' in breakdown and breakdown['pose_detection']['rate'] < 0.5:
             issues.append("Low pose detection - person not visible or bad angle")
-        if breakdown['hand_detection']['rate'] < 0.3:
+        if 'hand_detection' in breakdown and breakdown['hand_detection']['rate'] < 0.3:
             issues.append("Low hand detection - hands not clearly visible")
-        if breakdown['lighting']['score'] < 8:
+        if 'lighting' in breakdown and breakdown['lighting']['score'] < 8:
             issues.append("Poor lighting - too dark or inconsistent")
 
         if issues:
@@ -8,7 +8,9 @@ Handles quality selection, clipping, and metadata extraction.
 import yt_dlp
 import os
 import json
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 
@@ -17,10 +19,15 @@ class YouTubeDownloader:
     Download and prepare YouTube videos for robot data pipeline
     """
 
-    def __init__(self, output_dir='youtube_videos', use_rate_limiting=True, use_deduplication=True):
+    def __init__(self, output_dir='youtube_videos', use_rate_limiting=True, use_deduplication=True,
+                 max_workers=1):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
 
+        # Concurrent downloads in search_and_download (network-bound, so threads)
+        self.max_workers = max_workers
+        self._rate_lock = threading.Lock()  # Rate limiter state is shared by download threads
+
         # Initialize rate limiter
         self.use_rate_limiting = use_rate_limiting
         if use_rate_limiting:
@@ -58,24 +65,14 @@ class YouTubeDownloader:
             print(f"Clip: {start_time}s - {end_time}s")
         print()
 
-        # Check rate limits
-        if self.rate_limiter:
-            can_download, reason, wait_time = self.rate_limiter.can_download()
-
-            if not can_download:
-                print(f"⚠️  RATE LIMIT: {reason}")
-                if wait_time > 0:
-                    print(f"   Waiting {wait_time}s ({wait_time/60:.1f} minutes)...")
-                    time.sleep(wait_time)
-                else:
-                    print(f"   ERROR: Cannot proceed - {reason}")
-                    return None
-
-            # Recommended delay before this download
-            delay = self.rate_limiter.get_recommended_delay()
-            if delay > self.rate_limiter.config['min_delay_seconds']:
-                print(f"⏱️  Rate limiting: Waiting {delay}s before download...")
-                time.sleep(delay)
+        # Check rate limits and reserve this download's slot under one lock,
+        # so concurrent starts stay spaced out and count towards the limits
+        reservation = None
+        with self._rate_lock:
+            if not self._wait_for_rate_limit():
+                return None
+            if self.rate_limiter:
+                reservation = self.rate_limiter.reserve_download()
 
         # Configure yt-dlp options
         # DATA-DRIVEN FIX: YouTube sometimes restricts video formats
@@ -89,6 +86,7 @@ class YouTubeDownloader:
             # Bypass restrictions
             'cookiesfrombrowser': ('chrome',),  # Use browser cookies if available
             'extractor_args': {'youtube': {'player_client': ['android']}},  # Use Android client
+            'concurrent_fragment_downloads': 4,  # Fetch DASH fragments in parallel
         }
 
         # Add download sections if clipping
@@ -139,7 +137,8 @@ class YouTubeDownloader:
 
                 # Record successful download
                 if self.rate_limiter:
-                    self.rate_limiter.record_download(success=True)
+                    with self._rate_lock:
+                        self.rate_limiter.record_download(success=True, record=reservation)
 
                 return video_path
 
@@ -155,10 +154,41 @@ class YouTubeDownloader:
                     error_code = 403
                 elif '429' in error_str:
                     error_code = 429
-                self.rate_limiter.record_download(success=False, error_code=error_code)
+                with self._rate_lock:
+                    self.rate_limiter.record_download(success=False, error_code=error_code,
+                                                      record=reservation)
 
             return None
 
+    def _wait_for_rate_limit(self):
+        """
+        Sleep as the rate limiter requires before the next download
+
+        Returns:
+            False if downloading cannot proceed at all
+        """
+        if not self.rate_limiter:
+            return True
+
+        can_download, reason, wait_time = self.rate_limiter.can_download()
+
+        if not can_download:
+            print(f"⚠️  RATE LIMIT: {reason}")
+            if wait_time > 0:
+                print(f"   Waiting {wait_time}s ({wait_time/60:.1f} minutes)...")
+                time.sleep(wait_time)
+            else:
+                print(f"   ERROR: Cannot proceed - {reason}")
+                return False
+
+        # Recommended delay before this download
+        delay = self.rate_limiter.get_recommended_delay()
+        if delay > self.rate_limiter.config['min_delay_seconds']:
+            print(f"⏱️  Rate limiting: Waiting {delay}s before download...")
+            time.sleep(delay)
+
+        return True
+
     def download_playlist(self, playlist_url, max_videos=5, max_duration_per_video=30):
         """
         Download multiple videos from a playlist
@@ -223,14 +253,61 @@ class YouTubeDownloader:
             print(f"❌ Error downloading playlist: {e}")
             return downloaded_videos
 
-    def search_and_download(self, query, max_results=3, max_duration=30):
+    def search_metadata(self, query, max_results=3):
+        """
+        Search YouTube without downloading anything
+
+        Args:
+            query: Search query
+            max_results: Number of search results
+
+        Returns:
+            List of search result entries (id, title, duration, ...)
+        """
+        ydl_opts = {
+            'format': 'best[ext=mp4][height<=720]',
+            'quiet': True,
+            'extract_flat': True,
+            'default_search': 'ytsearch',
+        }
+
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            search_results = ydl.extract_info(f"ytsearch{max_results}:{query}", download=False)
+
+        return search_results['entries']
+
+    def _video_height(self, video_url):
+        """
+        Height of the best format a video offers, looked up without downloading
+
+        Returns:
+            Height in pixels, or None if it could not be determined
+        """
+        ydl_opts = {
+            'quiet': True,
+            'no_warnings': True,
+            'skip_download': True,
+            'extractor_args': {'youtube': {'player_client': ['android']}},
+        }
+
+        try:
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                return ydl.extract_info(video_url, download=False).get('height')
+        except Exception:
+            return None
+
+    def search_and_download(self, query, max_results=3, max_duration=30, min_height=None):
         """
         Search YouTube and download top results
 
+        Candidates are filtered on search metadata (duplicates, duration and,
+        if min_height is set, resolution) before anything is downloaded.
+
         Args:
             query: Search query (e.g., "opening refrigerator door")
             max_results: Number of videos to download
             max_duration: Maximum video duration (seconds)
+            min_height: Minimum video height in pixels (optional)
 
         Returns:
             List of downloaded video paths
@@ -242,59 +319,64 @@ class YouTubeDownloader:
         print(f"Max results: {max_results}")
         print()
 
-        ydl_opts = {
-            'format': 'best[ext=mp4][height<=720]',
-            'quiet': True,
-            'extract_flat': True,
-            'default_search': 'ytsearch',
-        }
-
-        search_query = f"ytsearch{max_results}:{query}"
         downloaded_videos = []
 
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                print(f"🔍 Searching for: {query}")
-                search_results = ydl.extract_info(search_query, download=False)
-
-                videos = search_results['entries']
-                print(f"Found {len(videos)} videos")
-                print()
-
-                for i, video in enumerate(videos, 1):
-                    if not video:
+            print(f"🔍 Searching for: {query}")
+            videos = self.search_metadata(query, max_results=max_results)
+
+            print(f"Found {len(videos)} videos")
+            print()
+
+            candidates = []
+            for i, video in enumerate(videos, 1):
+                if not video:
+                    continue
+
+                video_url = f"https://www.youtube.com/watch?v={video['id']}"
+                video_title = video.get('title', 'Unknown')
+                print(f"[{i}/{len(videos)}] {video_title}")
+
+                # Check deduplication first
+                if self.dedup:
+                    should_process, reason = self.dedup.should_process(video_url, video_title)
+                    if not should_process:
+                        print(f"   ⏭️  Skipping ({reason})")
+                        print()
                         continue
 
-                    video_url = f"https://www.youtube.com/watch?v={video['id']}"
-                    video_title = video.get('title', 'Unknown')
-                    print(f"[{i}/{len(videos)}] {video_title}")
-
-                    # Check deduplication first
-                    if self.dedup:
-                        should_process, reason = self.dedup.should_process(video_url, video_title)
-                        if not should_process:
-                            print(f"   ⏭️  Skipping ({reason})")
-                            print()
-                            continue
-
-                    # Check duration
-                    if video.get('duration', 0) > max_duration:
-                        print(f"   ⏭️  Skipping (too long: {video['duration']}s)")
+                # Check duration
+                if (video.get('duration') or 0) > max_duration:
+                    print(f"   ⏭️  Skipping (too long: {video['duration']}s)")
+                    print()
+                    continue
+
+                # Check resolution (one metadata request, still no download)
+                if min_height:
+                    height = self._video_height(video_url)
+                    if height is not None and height < min_height:
+                        print(f"   ⏭️  Skipping (low resolution: {height}p)")
                         print()
                         continue
 
-                    video_path = self.download(video_url)
-                    if video_path:
-                        downloaded_videos.append(video_path)
-                        # Mark as processed after successful download
-                        if self.dedup:
-                            self.dedup.mark_processed(video_url, video_title)
+                candidates.append((video_url, video_title))
 
-                print("="*70)
-                print(f"✅ Downloaded {len(downloaded_videos)} videos")
-                print("="*70)
+            # Download the remaining candidates concurrently
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                video_paths = list(pool.map(self.download, [url for url, _ in candidates]))
 
-                return downloaded_videos
+            for (video_url, video_title), video_path in zip(candidates, video_paths):
+                if video_path:
+                    downloaded_videos.append(video_path)
+                    # Mark as processed after successful download
+                    if self.dedup:
+                        self.dedup.mark_processed(video_url, video_title)
+
+            print("="*70)
+            print(f"✅ Downloaded {len(downloaded_videos)} videos")
+            print("="*70)
+
+            return downloaded_videos
 
         except Exception as e:
             print(f"❌ Error searching/downloading: {e}")
@@ -315,18 +397,21 @@ def main():
     parser.add_argument('--end', type=int, help='Clip end time (seconds)')
     parser.add_argument('--max-results', type=int, default=3, help='Max search results')
     parser.add_argument('--max-duration', type=int, default=30, help='Max video duration (seconds)')
+    parser.add_argument('--min-height', type=int, help='Min video height in pixels (for --search)')
     parser.add_argument('--output', default='youtube_videos', help='Output directory')
+    parser.add_argument('--workers', type=int, default=1, help='Concurrent downloads for --search')
 
     args = parser.parse_args()
 
-    downloader = YouTubeDownloader(output_dir=args.output)
+    downloader = YouTubeDownloader(output_dir=args.output, max_workers=args.workers)
 
     if args.search:
         # Search and download
         videos = downloader.search_and_download(
             args.url,
             max_results=args.max_results,
-            max_duration=args.max_duration
+            max_duration=args.max_duration,
+            min_height=args.min_height
         )
     elif args.playlist:
         # Download playlist